@@ -1,5 +1,7 @@
 from fastapi import APIRouter
-from app.api.endpoints import stock
+from app.api.endpoints import stock, screener, chart
 
 api_router = APIRouter()
-api_router.include_router(stock.router, prefix="/stock", tags=["stock"]) 
\ No newline at end of file
+api_router.include_router(stock.router, prefix="/stock", tags=["stock"])
+api_router.include_router(screener.router, prefix="/screener", tags=["screener"])
+api_router.include_router(chart.router, prefix="/chart", tags=["chart"])
@@ -0,0 +1,139 @@
+import zlib
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli 为可选依赖，未安装时只使用 gzip
+    brotli = None
+
+class _Compressor:
+    """流式压缩器，统一 gzip 与 brotli 的接口"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits=31 输出带 gzip 头的数据
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish() if self.encoding == "br" else self._compressor.flush()
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    根据 Accept-Encoding 选择压缩算法，优先 brotli
+
+    Args:
+        accept_encoding: 请求头 Accept-Encoding 的值
+
+    Returns:
+        Optional[str]: br/gzip，客户端都不接受时返回 None
+    """
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        accepted.add(name.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+class CompressionMiddleware:
+    """
+    响应压缩中间件（gzip/brotli）
+
+    小于 minimum_size 的响应、已设置 Content-Encoding 的响应以及 304 等无响应体的情况不压缩。
+
+    Args:
+        app: ASGI 应用
+        minimum_size: 压缩的最小响应体字节数
+        gzip_level: gzip 压缩级别
+        brotli_quality: brotli 压缩质量（0-11，越高越慢）
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            encoding = choose_encoding(Headers(scope=scope).get("Accept-Encoding", ""))
+            if encoding:
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                await _CompressionResponder(self.app, compressor, self.minimum_size)(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, compressor: _Compressor, minimum_size: int):
+        self.app = app
+        self.compressor = compressor
+        self.minimum_size = minimum_size
+        self.send: Send = None
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def _set_headers(self, content_length: Optional[int]) -> None:
+        headers = MutableHeaders(raw=self.initial_message["headers"])
+        headers["Content-Encoding"] = self.compressor.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if content_length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(content_length)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # 确定是否压缩之前先不发送响应头
+            self.initial_message = message
+            self.passthrough = "content-encoding" in Headers(raw=message["headers"])
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.passthrough:
+            if not self.started:
+                self.started = True
+                await self.send(self.initial_message)
+            await self.send(message)
+        elif not self.started:
+            self.started = True
+            if len(body) < self.minimum_size and not more_body:
+                self.passthrough = True
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+            data = self.compressor.compress(body)
+            if not more_body:
+                data += self.compressor.finish()
+                self._set_headers(len(data))
+            else:
+                self._set_headers(None)
+            await self.send(self.initial_message)
+            await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+        else:
+            data = self.compressor.compress(body)
+            if not more_body:
+                data += self.compressor.finish()
+            await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.api.responses import rows_response
+from datetime import date
+
+router = APIRouter()
+
+class ChartSeries(BaseModel):
+    """多只股票对齐后的图表序列模型"""
+    dataset: str
+    dates: List[date]
+    series: Dict[str, Dict[str, List[Optional[float]]]]
+
+# 序列读取涉及数据库查询和磁盘/Redis 读写，定义为同步接口在线程池中执行，不阻塞事件循环
+@router.get("/series", response_model=ChartSeries)
+def get_chart_series(
+    codes: str = Query(..., description="股票代码，逗号分隔"),
+    dataset: str = "valuations",
+    metrics: str = Query("pe_ttm", description="指标列，逗号分隔"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+):
+    """
+    获取多只股票对齐到共同日期轴的指标序列，用于叠加对比图
+
+    日期只返回一次，每只股票的每个指标为与日期等长的数组（缺失为 null）。数据来自采集完成后
+    预计算的压缩序列，不逐行查询数据库。
+
+    Args:
+        codes: 股票代码，逗号分隔
+        dataset: 数据集，valuations（月度估值）或 financials（财务指标）
+        metrics: 指标列，逗号分隔
+        start_date: 开始日期（可选）
+        end_date: 结束日期（可选）
+
+    Returns:
+        ChartSeries: 对齐后的序列
+
+    Raises:
+        HTTPException: 当参数无效或查询出错时抛出
+    """
+    stock_codes = list(dict.fromkeys(code.strip() for code in codes.split(",") if code.strip()))
+    if not stock_codes or len(stock_codes) > settings.CHART_MAX_CODES:
+        raise HTTPException(status_code=400, detail=f"股票数量需在 1 到 {settings.CHART_MAX_CODES} 之间")
+    # 图表服务依赖 numpy，首次请求时才导入，缩短 API 进程启动时间
+    from app.services.chart_service import ChartService
+
+    try:
+        service = ChartService()
+        result = service.overlay(
+            dataset,
+            stock_codes,
+            [metric.strip() for metric in metrics.split(",") if metric.strip()],
+            start_date,
+            end_date,
+        )
+        return rows_response(result)
+
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        service.__del__()
@@ -0,0 +1,191 @@
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+from typing import List, Optional
+from app.services.stock_service import StockService
+from app.api.responses import rows_response
+from datetime import date
+
+# 选股查询是同步的数据库调用，接口定义为同步函数在线程池中执行，不阻塞事件循环
+router = APIRouter()
+
+class DividendStreakStock(BaseModel):
+    """连续分红选股结果模型"""
+    code: str
+    name: str
+    industry: Optional[str] = None
+    streak: int
+    last_year: int
+    cash_per_share: float
+
+class AsOfStock(BaseModel):
+    """时点选股结果模型：截至指定日期已披露的最新一期财务指标和当日估值"""
+    code: str
+    name: str
+    industry: Optional[str] = None
+    report_date: date
+    published_date: date
+    net_profit: Optional[int] = None
+    net_profit_growth: Optional[float] = None
+    total_revenue: Optional[int] = None
+    total_revenue_growth: Optional[float] = None
+    eps: Optional[float] = None
+    bps: Optional[float] = None
+    roe: Optional[float] = None
+    gross_profit_margin: Optional[float] = None
+    debt_ratio: Optional[float] = None
+    valuation_date: Optional[date] = None
+    pe_ttm: Optional[float] = None
+    pb: Optional[float] = None
+    ps_ttm: Optional[float] = None
+    dividend_yield_ttm: Optional[float] = None
+
+@router.get("/dividend-streak", response_model=List[DividendStreakStock])
+def screen_dividend_streak(
+    min_years: int = Query(5, ge=1),
+    year: Optional[int] = None,
+    min_cash_per_share: Optional[float] = None,
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """
+    筛选连续 N 年现金分红的股票，基于预先计算的年度分红统计，不请求数据源
+
+    Args:
+        min_years: 最少连续分红年数
+        year: 连续分红需持续到的年份（可选，默认上一年；当年已分红的股票同样满足）
+        min_cash_per_share: 最近一年每股分红下限（可选）
+        limit: 返回记录数量限制（默认100条，最多1000条）
+
+    Returns:
+        List[DividendStreakStock]: 按连续年数倒序的股票列表
+
+    Raises:
+        HTTPException: 当查询出错时抛出
+    """
+    try:
+        service = StockService()
+        params = {
+            "min_years": min_years,
+            "year": year or date.today().year - 1,
+            "limit": limit,
+        }
+        condition = ""
+        if min_cash_per_share is not None:
+            condition = "AND y.cash_per_share >= :min_cash_per_share"
+            params["min_cash_per_share"] = min_cash_per_share
+
+        # 每只股票取截至最近一年的统计，连续年数已在采集时计算
+        sql = f"""
+        SELECT
+            b.code,
+            b.name,
+            b.industry,
+            y.streak,
+            y.year AS last_year,
+            y.cash_per_share
+        FROM stock_dividend_yearly y
+        JOIN stock_basic b ON b.code = y.stock_code
+        WHERE y.year = (SELECT MAX(year) FROM stock_dividend_yearly WHERE stock_code = y.stock_code)
+            AND y.year >= :year
+            AND y.streak >= :min_years
+            {condition}
+        ORDER BY y.streak DESC, b.code
+        LIMIT :limit
+        """
+        result = service.execute_sql_cached(
+            sql, params, [("stock_dividend_yearly", None), ("stock_basic", None)]
+        )
+        return rows_response(result)
+
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        service.__del__()
+
+@router.get("/as-of", response_model=List[AsOfStock])
+def screen_as_of(
+    as_of: date,
+    industry: Optional[str] = None,
+    max_pe_ttm: Optional[float] = None,
+    min_roe: Optional[float] = None,
+    max_debt_ratio: Optional[float] = None,
+    limit: int = Query(100, ge=1, le=10000)
+):
+    """
+    按历史日期选股，只使用当时已经披露的数据，回测时不会引入未来信息
+
+    每只股票取截至 as_of 已披露的最新一期财务指标（基于预先计算的时点有效区间表）和
+    as_of 当日或之前最近一次的估值。
+
+    Args:
+        as_of: 时点日期
+        industry: 所属行业（可选）
+        max_pe_ttm: 市盈率(TTM)上限（可选）
+        min_roe: 净资产收益率下限（可选）
+        max_debt_ratio: 资产负债率上限（可选）
+        limit: 返回记录数量限制（可选，默认100条，最多10000条）
+
+    Returns:
+        List[AsOfStock]: 按股票代码排序的股票列表
+
+    Raises:
+        HTTPException: 当查询出错时抛出
+    """
+    try:
+        service = StockService()
+        conditions = ["p.valid_from <= :as_of", "p.valid_to > :as_of"]
+        params = {"as_of": as_of, "limit": limit}
+        if industry:
+            conditions.append("b.industry = :industry")
+            params["industry"] = industry
+        if max_pe_ttm is not None:
+            conditions.append("v.pe_ttm <= :max_pe_ttm")
+            params["max_pe_ttm"] = max_pe_ttm
+        if min_roe is not None:
+            conditions.append("f.roe >= :min_roe")
+            params["min_roe"] = min_roe
+        if max_debt_ratio is not None:
+            conditions.append("f.debt_ratio <= :max_debt_ratio")
+            params["max_debt_ratio"] = max_debt_ratio
+
+        # 每只股票在 as_of 时恰有一个有效区间；估值按 (stock_code, date) 索引取最近一条
+        sql = f"""
+        SELECT
+            b.code,
+            b.name,
+            b.industry,
+            f.report_date,
+            p.valid_from AS published_date,
+            f.net_profit,
+            f.net_profit_growth,
+            f.total_revenue,
+            f.total_revenue_growth,
+            f.eps,
+            f.bps,
+            f.roe,
+            f.gross_profit_margin,
+            f.debt_ratio,
+            v.date AS valuation_date,
+            v.pe_ttm,
+            v.pb,
+            v.ps_ttm,
+            v.dividend_yield_ttm
+        FROM stock_financial_validity p
+        JOIN stock_financials f ON f.id = p.id
+        JOIN stock_basic b ON b.code = p.stock_code
+        LEFT JOIN stock_valuations v ON v.stock_code = p.stock_code
+            AND v.date = (SELECT MAX(date) FROM stock_valuations WHERE stock_code = p.stock_code AND date <= :as_of)
+        WHERE {' AND '.join(conditions)}
+        ORDER BY b.code
+        LIMIT :limit
+        """
+        result = service.execute_sql_cached(
+            sql,
+            params,
+            [("stock_financials", None), ("stock_financial_validity", None), ("stock_valuations", None), ("stock_basic", None)],
+        )
+        return rows_response(result)
+
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        service.__del__()
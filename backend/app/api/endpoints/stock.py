@@ -1,9 +1,15 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 from app.services.stock_service import StockService
+from app.api.http_cache import conditional_response
+from app.api.responses import FastJSONResponse, rows_response
+from app.cache.results import has_nocache_hint, sql_cache, sql_cache_key
+from app.api.pagination import NEXT_CURSOR_HEADER, decode_cursor, paginate
 from datetime import date
 
+# 接口中的数据库查询都是同步调用，接口定义为同步函数，由 FastAPI 在线程池中执行而不阻塞事件循环；
+# 相同查询的并发请求由 api_cache 合并为一次数据库查询，等待的请求也只占用线程池中的线程
 router = APIRouter()
 
 class SQLQuery(BaseModel):
@@ -19,6 +25,11 @@ class StockInfo(BaseModel):
     market: Optional[str] = None
     listing_date: Optional[date] = None
 
+class StockListPage(BaseModel):
+    """股票列表分页模型"""
+    items: List[StockInfo]
+    next_cursor: Optional[str] = None
+
 class FinancialIndicator(BaseModel):
     """财务指标模型"""
     # 基本信息
@@ -66,8 +77,90 @@ class StockValuation(BaseModel):
     ps_ttm: Optional[float] = None
     dividend_yield_ttm: Optional[float] = None
 
+class StockDividend(BaseModel):
+    """分红记录模型"""
+    announce_date: date
+    bonus_shares: Optional[float] = None
+    transfer_shares: Optional[float] = None
+    cash_dividend: Optional[float] = None
+    progress: Optional[str] = None
+    ex_dividend_date: Optional[date] = None
+    record_date: Optional[date] = None
+    bonus_listing_date: Optional[date] = None
+
+class StockDividendYearly(BaseModel):
+    """年度分红统计模型"""
+    year: int
+    payout_count: int
+    cash_per_share: float
+    streak: int
+
+@router.get("/list", response_model=StockListPage)
+def list_stocks(
+    industry: Optional[str] = None,
+    market: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None
+):
+    """
+    分页获取股票列表（按股票代码排序）
+    
+    Args:
+        industry: 所属行业（可选）
+        market: 市场类型（可选）
+        limit: 每页条数（默认100条，最多1000条）
+        cursor: 分页游标（可选），取自上一页的 next_cursor
+        
+    Returns:
+        StockListPage: 当前页股票和下一页游标（没有下一页时为空）
+        
+    Raises:
+        HTTPException: 当游标无效或查询出错时抛出
+    """
+    try:
+        service = StockService()
+        
+        # 构建查询条件
+        conditions = ["1 = 1"]
+        params = {"limit": limit + 1}
+        if industry:
+            conditions.append("industry = :industry")
+            params["industry"] = industry
+        if market:
+            conditions.append("market = :market")
+            params["market"] = market
+            
+        # 按股票代码键集分页，游标只能用于相同筛选条件的查询
+        scope = f"list:{industry or ''}:{market or ''}"
+        if cursor:
+            (last_code,) = decode_cursor(cursor, scope)
+            conditions.append("code > :cursor_code")
+            params["cursor_code"] = last_code
+            
+        sql = f"""
+        SELECT 
+            code,
+            name,
+            industry,
+            market,
+            listing_date
+        FROM stock_basic 
+        WHERE {' AND '.join(conditions)}
+        ORDER BY code
+        LIMIT :limit
+        """
+        items, next_cursor = paginate(
+            service.execute_sql_cached(sql, params, [("stock_basic", None)]), limit, scope, ["code"]
+        )
+        return rows_response({"items": items, "next_cursor": next_cursor})
+        
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        service.__del__()
+
 @router.get("/{stock_code}/basic", response_model=StockInfo)
-async def get_stock_info(stock_code: str):
+def get_stock_info(stock_code: str):
     """
     获取股票基本信息
     
@@ -92,12 +185,12 @@ async def get_stock_info(stock_code: str):
         FROM stock_basic 
         WHERE code = :code
         """
-        result = service.execute_sql(sql, {"code": stock_code})
+        result = service.execute_sql_cached(sql, {"code": stock_code}, [("stock_basic", stock_code)])
         
         if not result:
             raise HTTPException(status_code=404, detail=f"股票 {stock_code} 不存在")
             
-        return result[0]
+        return rows_response(result[0])
         
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -105,11 +198,15 @@ async def get_stock_info(stock_code: str):
         service.__del__()
 
 @router.get("/{stock_code}/financials", response_model=List[FinancialIndicator])
-async def get_stock_financials(
+def get_stock_financials(
+    request: Request,
+    response: Response,
     stock_code: str,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    limit: Optional[int] = 10
+    limit: int = Query(10, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    as_of: Optional[date] = None
 ):
     """
     获取股票历史财务指标
@@ -118,10 +215,12 @@ async def get_stock_financials(
         stock_code: 股票代码
         start_date: 开始日期（可选）
         end_date: 结束日期（可选）
-        limit: 返回记录数量限制（可选，默认10条）
+        limit: 每页条数（默认10条，最多1000条）
+        cursor: 分页游标（可选），取自上一页响应头 X-Next-Cursor
+        as_of: 时点日期（可选），只返回截至该日已披露的报告期，用于回测
         
     Returns:
-        List[FinancialIndicator]: 财务指标列表
+        List[FinancialIndicator]: 财务指标列表（带 ETag/Last-Modified，数据未变化时返回 304）
         
     Raises:
         HTTPException: 当查询出错时抛出
@@ -129,6 +228,15 @@ async def get_stock_financials(
     try:
         service = StockService()
         
+        # 数据未变化时直接返回 304
+        # 时点查询还依赖有效区间表（补算区间只发布该表的变更通知）
+        dependencies = ["stock_financial_validity"] if as_of else []
+        not_modified = conditional_response(
+            request, response, service, "stock_financials", stock_code, extra_tables=dependencies
+        )
+        if not_modified:
+            return not_modified
+        
         # 构建查询条件
         conditions = ["stock_code = :code"]
         params = {"code": stock_code}
@@ -139,6 +247,18 @@ async def get_stock_financials(
         if end_date:
             conditions.append("report_date <= :end_date")
             params["end_date"] = end_date
+        if as_of:
+            conditions.append(
+                "id IN (SELECT id FROM stock_financial_validity WHERE stock_code = :code AND valid_from <= :as_of)"
+            )
+            params["as_of"] = as_of
+            
+        # 按 (stock_code, report_date) 键集分页，深翻页与首页代价相同
+        scope = f"financials:{stock_code}"
+        if cursor:
+            (last_date,) = decode_cursor(cursor, scope)
+            conditions.append("report_date < :cursor_date")
+            params["cursor_date"] = date.fromisoformat(last_date)
             
         # 构建 SQL
         sql = f"""
@@ -178,10 +298,19 @@ async def get_stock_financials(
         ORDER BY report_date DESC
         LIMIT :limit
         """
-        params["limit"] = limit
+        params["limit"] = limit + 1
         
-        result = service.execute_sql(sql, params)
-        return result
+        result, next_cursor = paginate(
+            service.execute_sql_cached(
+                sql, params, [("stock_financials", stock_code), *((table, stock_code) for table in dependencies)]
+            ),
+            limit,
+            scope,
+            ["report_date"],
+        )
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return rows_response(result, response)
         
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -189,11 +318,14 @@ async def get_stock_financials(
         service.__del__()
 
 @router.get("/{stock_code}/valuations", response_model=List[StockValuation])
-async def get_stock_valuations(
+def get_stock_valuations(
+    request: Request,
+    response: Response,
     stock_code: str,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    limit: Optional[int] = 10
+    limit: int = Query(10, ge=1, le=1000),
+    cursor: Optional[str] = None
 ):
     """
     获取股票历史估值指标
@@ -202,10 +334,11 @@ async def get_stock_valuations(
         stock_code: 股票代码
         start_date: 开始日期（可选）
         end_date: 结束日期（可选）
-        limit: 返回记录数量限制（可选，默认10条）
+        limit: 每页条数（默认10条，最多1000条）
+        cursor: 分页游标（可选），取自上一页响应头 X-Next-Cursor
         
     Returns:
-        List[StockValuation]: 估值指标列表
+        List[StockValuation]: 估值指标列表（带 ETag/Last-Modified，数据未变化时返回 304）
         
     Raises:
         HTTPException: 当查询出错时抛出
@@ -213,6 +346,11 @@ async def get_stock_valuations(
     try:
         service = StockService()
         
+        # 数据未变化时直接返回 304
+        not_modified = conditional_response(request, response, service, "stock_valuations", stock_code)
+        if not_modified:
+            return not_modified
+        
         # 构建查询条件
         conditions = ["stock_code = :code"]
         params = {"code": stock_code}
@@ -224,6 +362,13 @@ async def get_stock_valuations(
             conditions.append("date <= :end_date")
             params["end_date"] = end_date
             
+        # 按 (stock_code, date) 键集分页，深翻页与首页代价相同
+        scope = f"valuations:{stock_code}"
+        if cursor:
+            (last_date,) = decode_cursor(cursor, scope)
+            conditions.append("date < :cursor_date")
+            params["cursor_date"] = date.fromisoformat(last_date)
+            
         # 构建 SQL
         sql = f"""
         SELECT 
@@ -237,10 +382,107 @@ async def get_stock_valuations(
         ORDER BY date DESC
         LIMIT :limit
         """
-        params["limit"] = limit
+        params["limit"] = limit + 1
+        
+        result, next_cursor = paginate(
+            service.execute_sql_cached(sql, params, [("stock_valuations", stock_code)]), limit, scope, ["date"]
+        )
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return rows_response(result, response)
+        
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        service.__del__()
+
+@router.get("/{stock_code}/dividends", response_model=List[StockDividend])
+def get_stock_dividends(
+    request: Request,
+    response: Response,
+    stock_code: str,
+    limit: int = Query(20, ge=1, le=1000)
+):
+    """
+    获取股票历史分红记录
+    
+    Args:
+        stock_code: 股票代码
+        limit: 返回记录数量限制（默认20条，最多1000条）
+        
+    Returns:
+        List[StockDividend]: 按公告日期倒序的分红记录
+        
+    Raises:
+        HTTPException: 当查询出错时抛出
+    """
+    try:
+        service = StockService()
+        
+        # 数据未变化时直接返回 304
+        not_modified = conditional_response(request, response, service, "stock_dividends", stock_code)
+        if not_modified:
+            return not_modified
+            
+        sql = """
+        SELECT 
+            announce_date,
+            bonus_shares,
+            transfer_shares,
+            cash_dividend,
+            progress,
+            ex_dividend_date,
+            record_date,
+            bonus_listing_date
+        FROM stock_dividends 
+        WHERE stock_code = :code
+        ORDER BY announce_date DESC
+        LIMIT :limit
+        """
+        result = service.execute_sql_cached(
+            sql, {"code": stock_code, "limit": limit}, [("stock_dividends", stock_code)]
+        )
+        return rows_response(result, response)
+        
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        service.__del__()
+
+@router.get("/{stock_code}/dividends/yearly", response_model=List[StockDividendYearly])
+def get_stock_dividends_yearly(request: Request, response: Response, stock_code: str):
+    """
+    获取股票年度分红统计（每年现金分红次数、每股分红合计、截至当年连续分红年数）
+    
+    Args:
+        stock_code: 股票代码
         
-        result = service.execute_sql(sql, params)
-        return result
+    Returns:
+        List[StockDividendYearly]: 按年份倒序的年度统计
+        
+    Raises:
+        HTTPException: 当查询出错时抛出
+    """
+    try:
+        service = StockService()
+        
+        # 数据未变化时直接返回 304
+        not_modified = conditional_response(request, response, service, "stock_dividend_yearly", stock_code)
+        if not_modified:
+            return not_modified
+            
+        sql = """
+        SELECT 
+            year,
+            payout_count,
+            cash_per_share,
+            streak
+        FROM stock_dividend_yearly 
+        WHERE stock_code = :code
+        ORDER BY year DESC
+        """
+        result = service.execute_sql_cached(sql, {"code": stock_code}, [("stock_dividend_yearly", stock_code)])
+        return rows_response(result, response)
         
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -248,12 +490,17 @@ async def get_stock_valuations(
         service.__del__()
 
 @router.post("/execute-sql", response_model=List[Dict[str, Any]])
-async def execute_sql(query: SQLQuery):
+def execute_sql(query: SQLQuery, request: Request):
     """
     执行 SQL 查询并返回结果
     
+    只读取版本化数据表的 SELECT 查询会缓存压缩后的结果，直到所依赖的表被采集进程更新；
+    响应头 X-Cache 为 HIT/MISS。请求头 Cache-Control: no-cache 跳过读取缓存，no-store 不写入缓存，
+    SQL 中带 /* nocache */ 或 -- nocache 时不使用缓存。
+    
     Args:
         query: SQL 查询请求，包含 SQL 语句和可选的参数
+        request: 请求对象，用于读取缓存控制头
         
     Returns:
         List[Dict[str, Any]]: 查询结果列表
@@ -261,11 +508,25 @@ async def execute_sql(query: SQLQuery):
     Raises:
         HTTPException: 当查询执行出错时抛出
     """
+    cache_control = request.headers.get("cache-control", "").lower()
+    key = None
+    if sql_cache.ttl > 0 and not has_nocache_hint(query.sql):
+        key = sql_cache_key(query.sql, query.params)
+    if key is not None and "no-cache" not in cache_control:
+        cached = sql_cache.get(key)
+        if cached is not None:
+            return Response(cached, media_type="application/json", headers={"X-Cache": "HIT"})
+
+    service = StockService()
     try:
-        service = StockService()
-        result = service.execute_sql(query.sql)
-        return result
+        result = service.execute_sql(query.sql, query.params)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
     finally:
-        service.__del__() 
\ No newline at end of file
+        service.__del__()
+    if key is None:
+        return rows_response(result)
+    response = FastJSONResponse(result, headers={"X-Cache": "MISS"})
+    if "no-store" not in cache_control:
+        sql_cache.put(key, response.body)
+    return response
@@ -0,0 +1,91 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional, Sequence, Tuple
+from fastapi import Request, Response
+from app.core.config import settings
+from app.services.stock_service import StockService
+
+def make_etag(
+    request: Request, tables: Sequence[str], stock_code: str, versions: Sequence[Tuple[Optional[datetime], int]]
+) -> str:
+    """根据各表的数据版本和查询参数生成弱 ETag（压缩后的响应体与原始响应体共用）"""
+    key = ";".join(
+        f"{table}|{stock_code}|{last_modified.isoformat() if last_modified else ''}|{count}"
+        for table, (last_modified, count) in zip(tables, versions)
+    )
+    key = f"{key}|{request.url.query}"
+    return f'W/"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """
+    判断客户端缓存是否仍然有效，If-None-Match 优先于 If-Modified-Since
+
+    Args:
+        request: 请求
+        etag: 当前数据的 ETag
+        last_modified: 当前数据的最近更新时间（UTC）
+
+    Returns:
+        bool: 是否可以返回 304
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        # 弱比较：忽略 W/ 前缀
+        return "*" in tags or etag.removeprefix("W/") in [tag.removeprefix("W/") for tag in tags]
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP 日期只精确到秒
+        return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+    return False
+
+def cache_headers(etag: str, last_modified: Optional[datetime], max_age: int) -> Dict[str, str]:
+    """生成 ETag、Last-Modified 和 Cache-Control 响应头"""
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}, must-revalidate",
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    service: StockService,
+    table: str,
+    stock_code: str,
+    max_age: int = None,
+    extra_tables: Sequence[str] = (),
+) -> Optional[Response]:
+    """
+    处理条件请求：数据未变化时返回 304 响应，否则把缓存响应头写入 response
+
+    Args:
+        request: 请求
+        response: 接口的响应对象，用于附加响应头
+        service: 查询服务
+        table: 数据所在的表
+        stock_code: 股票代码
+        max_age: Cache-Control 的 max-age（秒），默认取 HTTP_CACHE_MAX_AGE
+        extra_tables: 查询还依赖的其他按股票记录版本的表，任一表变化都会改变 ETag
+
+    Returns:
+        Optional[Response]: 数据未变化时的 304 响应，需要返回完整数据时为 None
+    """
+    tables = [table, *extra_tables]
+    versions = [service.data_version(name, stock_code) for name in tables]
+    last_modified = max((modified for modified, _ in versions if modified is not None), default=None)
+    etag = make_etag(request, tables, stock_code, versions)
+    headers = cache_headers(etag, last_modified, settings.HTTP_CACHE_MAX_AGE if max_age is None else max_age)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,65 @@
+import base64
+import json
+from typing import Any, List, Optional, Tuple
+
+# 分页游标通过响应头返回给客户端
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(scope: str, values: List[Any]) -> str:
+    """
+    生成不透明的分页游标
+
+    Args:
+        scope: 游标适用的查询（如 "valuations:600000"），防止游标被用于其他查询
+        values: 当前页最后一行的排序键
+
+    Returns:
+        str: URL 安全的游标字符串
+    """
+    payload = json.dumps({"s": scope, "k": [str(value) for value in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(token: str, scope: str) -> List[str]:
+    """
+    解析分页游标
+
+    Args:
+        token: encode_cursor 生成的游标
+        scope: 当前查询，需要与生成游标时一致
+
+    Returns:
+        List[str]: 排序键
+
+    Raises:
+        ValueError: 游标无法解析或不属于当前查询
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = payload["k"]
+        matched = payload["s"] == scope
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("无效的分页游标")
+    if not matched or not isinstance(values, list):
+        raise ValueError("分页游标与当前查询不匹配")
+    return values
+
+def paginate(rows: List[dict], limit: int, scope: str, keys: List[str]) -> Tuple[List[dict], Optional[str]]:
+    """
+    截取一页数据并生成下一页游标
+
+    查询时多取一行（LIMIT limit + 1），多出的一行说明还有下一页。
+
+    Args:
+        rows: 查询结果
+        limit: 每页条数
+        scope: 游标适用的查询
+        keys: 排序键列名
+
+    Returns:
+        Tuple[List[dict], Optional[str]]: 当前页数据和下一页游标（没有下一页时为 None）
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(scope, [rows[-1][key] for key in keys])
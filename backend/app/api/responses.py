@@ -0,0 +1,45 @@
+from decimal import Decimal
+from typing import Any, Optional
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from app.core.config import settings
+
+# 由接口自身的 response 参数决定、不应复制到新响应上的头
+_SKIP_HEADERS = {"content-length", "content-type"}
+
+def _default(value: Any) -> Any:
+    # PostgreSQL 的 NUMERIC 聚合结果（如 AVG）为 Decimal
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"无法序列化的类型: {type(value).__name__}")
+
+class FastJSONResponse(ORJSONResponse):
+    """使用 orjson 直接序列化查询结果，支持 date/datetime/numpy/Decimal"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+def rows_response(content: Any, response: Optional[Response] = None) -> Any:
+    """
+    返回数据库查询结果
+
+    开启 FAST_JSON_RESPONSES 时直接用 orjson 序列化，跳过 response_model 校验和
+    jsonable_encoder（查询结果的字段与类型由 SQL 保证，是可信数据）；关闭时原样返回，
+    由 FastAPI 按 response_model 校验并序列化。
+
+    Args:
+        content: execute_sql 返回的行（或单行）
+        response: 接口注入的响应对象，其上设置的响应头（如 ETag）会保留
+
+    Returns:
+        Any: FastJSONResponse 或原始数据
+    """
+    if not settings.FAST_JSON_RESPONSES:
+        return content
+    fast = FastJSONResponse(content)
+    if response is not None:
+        for key, value in response.headers.items():
+            if key not in _SKIP_HEADERS:
+                fast.headers[key] = value
+    return fast
@@ -0,0 +1,228 @@
+import json
+import logging
+import threading
+from typing import Callable, List, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 数据变更处理函数：(数据集即表名, 股票代码列表)，代码为 None 表示整个数据集都可能变化
+Handler = Callable[[str, Optional[List[str]]], None]
+
+# 单条消息最多携带的股票代码数（PostgreSQL NOTIFY 的消息不能超过 8000 字节）
+MAX_CODES_PER_MESSAGE = 500
+
+def encode_event(dataset: str, codes: Optional[List[str]]) -> str:
+    return json.dumps({"dataset": dataset, "codes": codes}, separators=(",", ":"))
+
+def decode_event(payload) -> tuple:
+    if isinstance(payload, bytes):
+        payload = payload.decode()
+    event = json.loads(payload)
+    return event["dataset"], event.get("codes")
+
+class InvalidationBus:
+    """
+    数据变更通知通道
+
+    采集进程在提交后发布受影响的数据集和股票代码，API 进程订阅后精确淘汰对应的缓存。
+    """
+
+    def __init__(self):
+        self.handlers: List[Handler] = []
+
+    def publish(self, dataset: str, codes: Optional[List[str]] = None) -> None:
+        """发布数据变更，codes 较多时拆分为多条消息"""
+        if codes is None:
+            self._send(encode_event(dataset, None))
+            return
+        codes = list(codes)
+        for start in range(0, len(codes), MAX_CODES_PER_MESSAGE):
+            self._send(encode_event(dataset, codes[start:start + MAX_CODES_PER_MESSAGE]))
+
+    def subscribe(self, handler: Handler) -> None:
+        """注册处理函数，第一次注册时开始监听"""
+        self.handlers.append(handler)
+        if len(self.handlers) == 1:
+            self._start()
+
+    def close(self) -> None:
+        """停止监听"""
+
+    def _send(self, payload: str) -> None:
+        raise NotImplementedError
+
+    def _start(self) -> None:
+        pass
+
+    def _dispatch(self, payload) -> None:
+        try:
+            dataset, codes = decode_event(payload)
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f"忽略无法解析的数据变更消息: {payload!r}")
+            return
+        for handler in list(self.handlers):
+            try:
+                handler(dataset, codes)
+            except Exception as e:
+                logger.error(f"处理数据变更 {dataset} 时出错: {str(e)}")
+
+    def _dispatch_reset(self) -> None:
+        """监听连接中断后可能漏掉消息，通知订阅方清空全部缓存"""
+        for handler in list(self.handlers):
+            try:
+                handler("*", None)
+            except Exception as e:
+                logger.error(f"重置缓存时出错: {str(e)}")
+
+class LocalBus(InvalidationBus):
+    """进程内通知，适用于单进程部署和测试"""
+
+    def _send(self, payload: str) -> None:
+        self._dispatch(payload)
+
+class _ListenerBus(InvalidationBus):
+    """在后台线程中监听外部消息的通知通道，连接断开后自动重连"""
+
+    reconnect_delay = 1.0
+
+    def __init__(self, channel: str):
+        super().__init__()
+        self.channel = channel
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"invalidation-{self.channel}", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        connected_before = False
+        while not self._stop.is_set():
+            try:
+                self._listen(on_connected=self._dispatch_reset if connected_before else None)
+            except Exception as e:
+                logger.warning(f"数据变更监听连接中断，{self.reconnect_delay} 秒后重连: {str(e)}")
+            connected_before = True
+            self._stop.wait(self.reconnect_delay)
+
+    def _listen(self, on_connected: Optional[Callable[[], None]]) -> None:
+        raise NotImplementedError
+
+class RedisBus(_ListenerBus):
+    """基于 Redis pub/sub 的通知通道"""
+
+    def __init__(self, url: str, channel: str):
+        super().__init__(channel)
+        import redis
+        self.client = redis.Redis.from_url(url)
+
+    def _send(self, payload: str) -> None:
+        self.client.publish(self.channel, payload)
+
+    def _listen(self, on_connected: Optional[Callable[[], None]]) -> None:
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(self.channel)
+            if on_connected:
+                on_connected()
+            while not self._stop.is_set():
+                message = pubsub.get_message(timeout=1.0)
+                if message and message["type"] == "message":
+                    self._dispatch(message["data"])
+        finally:
+            pubsub.close()
+
+class PostgresBus(_ListenerBus):
+    """基于 PostgreSQL LISTEN/NOTIFY 的通知通道"""
+
+    def __init__(self, engine, channel: str):
+        super().__init__(channel)
+        self.engine = engine
+
+    def _send(self, payload: str) -> None:
+        from sqlalchemy import text
+        with self.engine.begin() as connection:
+            connection.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": self.channel, "payload": payload})
+
+    def _listen(self, on_connected: Optional[Callable[[], None]]) -> None:
+        import select
+        connection = self.engine.raw_connection()
+        try:
+            dbapi_connection = connection.driver_connection
+            dbapi_connection.autocommit = True
+            with dbapi_connection.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            if on_connected:
+                on_connected()
+            while not self._stop.is_set():
+                if select.select([dbapi_connection], [], [], 1.0) == ([], [], []):
+                    continue
+                dbapi_connection.poll()
+                while dbapi_connection.notifies:
+                    self._dispatch(dbapi_connection.notifies.pop(0).payload)
+        finally:
+            connection.close()
+
+class NullBus(InvalidationBus):
+    """不发送通知"""
+
+    def _send(self, payload: str) -> None:
+        pass
+
+_bus: Optional[InvalidationBus] = None
+
+def create_bus(name: str) -> InvalidationBus:
+    """
+    按名称创建通知通道
+
+    Args:
+        name: redis、postgres、local 或 none
+
+    Returns:
+        InvalidationBus: 通知通道实例
+    """
+    if name == "redis":
+        return RedisBus(settings.REDIS_URL, settings.INVALIDATION_CHANNEL)
+    if name == "postgres":
+        from app.db.session import engine
+        return PostgresBus(engine, settings.INVALIDATION_CHANNEL)
+    if name == "local":
+        return LocalBus()
+    if name == "none":
+        return NullBus()
+    raise ValueError(f"未知的通知通道: {name}")
+
+def get_bus() -> InvalidationBus:
+    """获取当前通知通道，首次调用时按配置创建"""
+    global _bus
+    if _bus is None:
+        _bus = create_bus(settings.INVALIDATION_BACKEND)
+    return _bus
+
+def set_bus(bus: Optional[InvalidationBus]) -> None:
+    """替换当前通知通道，传入 None 时恢复为按配置创建"""
+    global _bus
+    _bus = bus
+
+def publish_invalidation(dataset: str, codes: Optional[List[str]] = None) -> None:
+    """
+    发布数据变更，在采集结果提交之后调用
+
+    通知失败只记录日志，不影响采集；订阅方的缓存仍会在 TTL 到期后刷新。
+
+    Args:
+        dataset: 变化的表名
+        codes: 受影响的股票代码，None 表示整个表
+    """
+    try:
+        get_bus().publish(dataset, codes)
+    except Exception as e:
+        logger.warning(f"发布数据变更 {dataset} 失败: {str(e)}")
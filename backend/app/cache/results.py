@@ -0,0 +1,242 @@
+import json
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, List, Optional, Tuple
+from app.core.config import settings
+
+# 采集提交后会发布变更通知的表，只有仅依赖这些表的查询才能缓存
+VERSIONED_TABLES = frozenset({
+    "stock_basic",
+    "stock_financials",
+    "stock_financial_validity",
+    "stock_valuations",
+    "stock_dividends",
+    "stock_dividend_yearly",
+})
+
+# 字符串常量、带引号的标识符和注释；规范化时常量原样保留，注释去掉
+_TOKENS = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|--[^\n]*|/\*.*?\*/)", re.S)
+# 关闭缓存的提示：/* nocache */ 或 -- nocache
+_NOCACHE_HINT = re.compile(r"/\*\s*nocache\s*\*/|--\s*nocache\b", re.I)
+# 每次执行结果可能不同的函数
+_VOLATILE = re.compile(
+    r"\b(now|random|setseed|current_date|current_time|current_timestamp|localtime|localtimestamp|clock_timestamp|"
+    r"statement_timestamp|transaction_timestamp|timeofday|nextval|setval|currval|gen_random_uuid|pg_\w+)\b"
+)
+_CTE = re.compile(r"(?:\bwith(?:\s+recursive)?|,)\s*([a-z_][\w$]*)\s+as\s*\(")
+_IDENTIFIER = re.compile(r"[a-z_][\w$]*")
+_FROM = re.compile(r"\bfrom\b")
+_FROM_TOKENS = re.compile(r"[a-z_][\w$]*|\S")
+# 结束 FROM 子句的关键字
+_FROM_END = frozenset({
+    "where", "group", "order", "limit", "offset", "having", "window", "union", "intersect", "except", "fetch", "for",
+})
+# 连接类型关键字，join 之后开始新的一项
+_JOIN_WORDS = frozenset({"inner", "left", "right", "full", "outer", "cross", "natural"})
+
+def normalize_sql(sql: str) -> str:
+    """
+    规范化 SQL 作为缓存键：去掉注释和末尾分号，合并空白，关键字和标识符转为小写
+
+    字符串常量和带引号的标识符保持原样。
+
+    Args:
+        sql: SQL 语句
+
+    Returns:
+        str: 规范化后的 SQL
+    """
+    parts, code = [], ""
+    for i, token in enumerate(_TOKENS.split(sql)):
+        if i % 2 == 0 or token.startswith(("--", "/*")):
+            code += token if i % 2 == 0 else " "
+        else:
+            parts.append(re.sub(r"\s+", " ", code.lower()))
+            parts.append(token)
+            code = ""
+    parts.append(re.sub(r"\s+", " ", code.lower()))
+    return "".join(parts).strip().rstrip(";").strip()
+
+def _from_relations(code: str) -> List[str]:
+    """
+    FROM 子句中每一项（逗号分隔的各表和 JOIN 的各表）的表名
+
+    以子查询开头的项跳过（子查询自身的 FROM 单独检查）；以函数调用等其他内容开头的项返回其首个标识符，
+    由调用方判定为不可缓存。
+    """
+    items = []
+    for match in _FROM.finditer(code):
+        depth, item, in_condition = 0, [], False
+        for token in _FROM_TOKENS.findall(code, match.end()):
+            if depth == 0:
+                if token in _FROM_END or token == ")":
+                    break
+                if token in (",", "join"):
+                    items.append(item)
+                    item, in_condition = [], False
+                    continue
+                if token in ("on", "using"):
+                    in_condition = True
+                if token in _JOIN_WORDS or in_condition:
+                    continue
+            depth += {"(": 1, ")": -1}.get(token, 0)
+            item.append(token)
+        items.append(item)
+    names = []
+    for item in items:
+        if not item or item[0] == "(":
+            continue
+        names.append("".join(item[:3]) if item[1:2] == ["."] else item[0])
+    return names
+
+def cacheable_tables(normalized: str) -> Optional[FrozenSet[str]]:
+    """
+    返回可缓存查询依赖的表
+
+    只缓存 SELECT/WITH 查询，FROM 列表（含逗号分隔的各项）和 JOIN 的对象必须是 VERSIONED_TABLES 中的表
+    或 WITH 定义的子查询，且不包含每次结果可能不同的函数。依赖的表取语句中出现的全部版本化表名（宁多勿少）。
+
+    Args:
+        normalized: normalize_sql 的结果
+
+    Returns:
+        Optional[FrozenSet[str]]: 依赖的表，不可缓存时为 None
+    """
+    code = _TOKENS.sub("''", normalized)
+    if not code.startswith(("select", "with")) or ";" in code or _VOLATILE.search(code):
+        return None
+    ctes = set(_CTE.findall(code))
+    for relation in _from_relations(code):
+        name = relation.split(".")[-1] if relation.startswith("public.") else relation
+        if name not in VERSIONED_TABLES and name not in ctes:
+            return None
+    tables = frozenset(_IDENTIFIER.findall(code)) & VERSIONED_TABLES
+    return tables or None
+
+def has_nocache_hint(sql: str) -> bool:
+    """SQL 中是否带有 /* nocache */ 或 -- nocache 提示"""
+    return bool(_NOCACHE_HINT.search(sql))
+
+class TableVersions:
+    """
+    进程内的表数据版本
+
+    订阅数据变更通知，采集进程每次提交后对应表的版本加一；缓存键包含查询依赖的表的版本，
+    表变化后旧条目不再被命中，由 LRU 逐步淘汰。
+    """
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def bump(self, dataset: str, codes: Optional[list] = None) -> None:
+        """数据变更处理函数，dataset 为 "*" 时所有表的版本都失效"""
+        with self._lock:
+            if dataset == "*":
+                self._epoch += 1
+            else:
+                self._versions[dataset] = self._versions.get(dataset, 0) + 1
+
+    def key(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        """指定表的版本组合"""
+        with self._lock:
+            return (self._epoch, *(self._versions.get(table, 0) for table in sorted(tables)))
+
+class ResultCache:
+    """
+    按字节数限制的查询结果 LRU 缓存，结果以 zlib 压缩后的 JSON 字节保存
+
+    Args:
+        max_bytes: 全部条目压缩后的总字节数上限
+        max_entry_bytes: 单个条目压缩后的字节数上限，超出时不缓存
+        ttl: 条目有效期（秒），0 表示不缓存；版本键已保证一致性，TTL 只作为通知丢失时的兜底
+        level: zlib 压缩级别
+    """
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int, ttl: float, level: int = 1):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.ttl = ttl
+        self.level = level
+        self.size = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "oversized": 0}
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """读取并解压结果，未命中或已过期时返回 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            blob = entry[1]
+        return zlib.decompress(blob)
+
+    def put(self, key: Hashable, payload: bytes) -> bool:
+        """压缩并写入结果，返回是否写入"""
+        if self.ttl <= 0:
+            return False
+        blob = zlib.compress(payload, self.level)
+        with self._lock:
+            if len(blob) > self.max_entry_bytes:
+                self.stats["oversized"] += 1
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, blob)
+            self.size += len(blob)
+            self.stats["stores"] += 1
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: Hashable) -> None:
+        _, blob = self._entries.pop(key)
+        self.size -= len(blob)
+
+def _params_key(params: Optional[Dict[str, Any]]) -> str:
+    return json.dumps(params or {}, sort_keys=True, default=str, separators=(",", ":"))
+
+def sql_cache_key(sql: str, params: Optional[Dict[str, Any]] = None) -> Optional[Hashable]:
+    """
+    计算查询结果的缓存键
+
+    Args:
+        sql: SQL 语句
+        params: 查询参数
+
+    Returns:
+        Optional[Hashable]: (规范化 SQL, 参数, 依赖表的版本)，查询不可缓存时为 None
+    """
+    normalized = normalize_sql(sql)
+    tables = cacheable_tables(normalized)
+    if tables is None:
+        return None
+    return normalized, _params_key(params), table_versions.key(tables)
+
+# /execute-sql 结果缓存与表版本，API 进程启动时订阅数据变更通知
+table_versions = TableVersions()
+sql_cache = ResultCache(
+    max_bytes=settings.SQL_CACHE_MAX_BYTES,
+    max_entry_bytes=settings.SQL_CACHE_MAX_ENTRY_BYTES,
+    ttl=settings.SQL_CACHE_TTL,
+    level=settings.SQL_CACHE_COMPRESS_LEVEL,
+)
@@ -0,0 +1,136 @@
+import io
+import os
+import tempfile
+from typing import Dict, Optional
+import numpy as np
+from app.core.config import settings
+
+# 单只股票的时间序列：dates（datetime64[D]）、metrics（指标名）、values（指标数 × 日期数的 float64 矩阵，
+# 缺失为 NaN）和 version；合并为一个矩阵可以减少 npz 中的数组个数，解析更快
+Series = Dict[str, np.ndarray]
+
+def encode_series(series: Series) -> bytes:
+    """将序列压缩为 npz 字节串"""
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **series)
+    return buffer.getvalue()
+
+def decode_series(blob: bytes) -> Series:
+    """解析 encode_series 生成的字节串"""
+    with np.load(io.BytesIO(blob), allow_pickle=False) as data:
+        return {name: data[name] for name in data.files}
+
+class SeriesStore:
+    """
+    预计算的单只股票时间序列存储
+
+    序列在采集完成后重建，读取方按其中记录的数据版本判断是否仍然有效。
+    """
+
+    def get(self, dataset: str, stock_code: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def put(self, dataset: str, stock_code: str, blob: bytes) -> None:
+        raise NotImplementedError
+
+    def delete(self, dataset: str, stock_code: str) -> None:
+        raise NotImplementedError
+
+class DiskSeriesStore(SeriesStore):
+    """按 {目录}/{数据集}/{股票代码}.npz 存放在本地磁盘（或多个进程共享的卷）"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, dataset: str, stock_code: str) -> str:
+        return os.path.join(self.directory, dataset, f"{stock_code}.npz")
+
+    def get(self, dataset: str, stock_code: str) -> Optional[bytes]:
+        try:
+            with open(self._path(dataset, stock_code), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, dataset: str, stock_code: str, blob: bytes) -> None:
+        path = self._path(dataset, stock_code)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 先写临时文件再替换，读取方不会看到写了一半的文件
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(blob)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def delete(self, dataset: str, stock_code: str) -> None:
+        try:
+            os.remove(self._path(dataset, stock_code))
+        except FileNotFoundError:
+            pass
+
+class RedisSeriesStore(SeriesStore):
+    """存放在 Redis 中，键为 {前缀}:{数据集}:{股票代码}"""
+
+    def __init__(self, url: str, prefix: str = "series"):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _key(self, dataset: str, stock_code: str) -> str:
+        return f"{self.prefix}:{dataset}:{stock_code}"
+
+    def get(self, dataset: str, stock_code: str) -> Optional[bytes]:
+        return self.client.get(self._key(dataset, stock_code))
+
+    def put(self, dataset: str, stock_code: str, blob: bytes) -> None:
+        self.client.set(self._key(dataset, stock_code), blob)
+
+    def delete(self, dataset: str, stock_code: str) -> None:
+        self.client.delete(self._key(dataset, stock_code))
+
+class NullSeriesStore(SeriesStore):
+    """不保存序列，每次从数据库构建"""
+
+    def get(self, dataset: str, stock_code: str) -> Optional[bytes]:
+        return None
+
+    def put(self, dataset: str, stock_code: str, blob: bytes) -> None:
+        pass
+
+    def delete(self, dataset: str, stock_code: str) -> None:
+        pass
+
+_store: Optional[SeriesStore] = None
+
+def create_series_store(name: str) -> SeriesStore:
+    """
+    按名称创建序列存储
+
+    Args:
+        name: disk、redis 或 none
+
+    Returns:
+        SeriesStore: 序列存储实例
+    """
+    if name == "disk":
+        return DiskSeriesStore(settings.SERIES_CACHE_DIR)
+    if name == "redis":
+        return RedisSeriesStore(settings.REDIS_URL)
+    if name == "none":
+        return NullSeriesStore()
+    raise ValueError(f"未知的序列存储: {name}")
+
+def get_series_store() -> SeriesStore:
+    """获取当前序列存储，首次调用时按配置创建"""
+    global _store
+    if _store is None:
+        _store = create_series_store(settings.SERIES_CACHE_BACKEND)
+    return _store
+
+def set_series_store(store: Optional[SeriesStore]) -> None:
+    """替换当前序列存储，传入 None 时恢复为按配置创建"""
+    global _store
+    _store = store
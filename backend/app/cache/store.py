@@ -0,0 +1,217 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+from app.core.config import settings
+
+# 缓存标签：(表名, 股票代码)，代码为 None 表示依赖整张表
+Tag = Tuple[str, Optional[str]]
+
+class TaggedCache:
+    """
+    带标签的进程内 LRU 缓存
+
+    每个条目记录其依赖的 (表名, 股票代码)，收到数据变更通知时只淘汰受影响的条目，
+    因此 TTL 可以设置得很长；TTL 只作为通知丢失时的兜底。
+
+    get_or_load 会合并并发请求（single-flight）：同一个键未命中时只有第一个请求执行加载，
+    加载期间到达的相同请求等待并共享其结果，即使不缓存（ttl 为 0）也是如此。
+
+    Args:
+        max_entries: 最大条目数，超出后淘汰最久未使用的条目
+        ttl: 条目有效期（秒），0 表示不缓存
+        coalesce: 是否合并相同键的并发加载
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 3600, coalesce: bool = True):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.coalesce = coalesce
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, List[Tag]]]" = OrderedDict()
+        self._by_tag: Dict[Tag, Set[Hashable]] = {}
+        self._by_dataset: Dict[str, Set[Hashable]] = {}
+        # 正在加载的键 -> (共享结果, 标签)
+        self._loading: Dict[Hashable, Tuple[Future, List[Tag]]] = {}
+        # 失效代数：每次失效通知使受影响的标签加一，加载结束时代数变化说明期间数据已变更，结果不写入缓存。
+        # 标签数不超过 表数 × 股票数，不需要清理
+        self._tag_generations: Dict[Tag, int] = {}
+        self._dataset_generations: Dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        # loads 为实际执行的加载次数，coalesced 为等待其他请求加载结果的次数
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0, "loads": 0, "coalesced": 0}
+
+    @property
+    def coalescing_ratio(self) -> float:
+        """未命中的请求中共享其他请求加载结果的比例"""
+        total = self.stats["loads"] + self.stats["coalesced"]
+        return self.stats["coalesced"] / total if total else 0.0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            return self._get(key, default)
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[Tag]) -> None:
+        with self._lock:
+            self._set(key, value, list(tags))
+
+    def get_or_load(self, key: Hashable, tags: Iterable[Tag], loader: Callable[[], Any]) -> Any:
+        """
+        读取缓存，未命中时调用 loader 加载并写入缓存
+
+        相同键的加载正在进行时等待并返回其结果；加载期间收到影响该键标签的数据变更通知时，
+        结果仍返回给已在等待的请求，但不写入缓存，之后的请求重新加载（不合并加载时同样如此）。在事件循环线程中调用时
+        （async 接口）不等待其他线程的加载，以免阻塞事件循环。
+
+        Args:
+            key: 缓存键
+            tags: 条目依赖的 (表名, 股票代码)
+            loader: 加载函数
+
+        Returns:
+            Any: 缓存或新加载的值（调用方不应修改）
+        """
+        missing = object()
+        tags = list(tags)
+        with self._lock:
+            value = self._get(key, missing)
+            if value is not missing:
+                return value
+            flight = self._loading.get(key) if self.coalesce else None
+            # 在事件循环线程中等待会阻塞该循环上的全部请求，此时不等待其他线程，自行加载
+            register = self.coalesce and (flight is None or not _on_event_loop())
+            if flight is not None and register:
+                self.stats["coalesced"] += 1
+            else:
+                flight = None
+                future: Future = Future()
+                if register:
+                    self._loading[key] = (future, tags)
+                generation = self._generation(tags)
+                self.stats["loads"] += 1
+        if flight is not None:
+            return flight[0].result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                self._finish(key, future)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._finish(key, future)
+            if self._generation(tags) == generation:
+                self._set(key, value, tags)
+        future.set_result(value)
+        return value
+
+    def invalidate(self, dataset: str, codes: Optional[List[str]] = None) -> int:
+        """
+        淘汰受数据变更影响的条目
+
+        Args:
+            dataset: 变化的表名，"*" 表示清空全部缓存
+            codes: 变化的股票代码，None 表示整张表
+
+        Returns:
+            int: 淘汰的条目数
+        """
+        with self._lock:
+            if dataset == "*":
+                keys = set(self._entries)
+            elif codes is None:
+                keys = set(self._by_dataset.get(dataset, ()))
+            else:
+                keys = set(self._by_tag.get((dataset, None), ()))
+                for code in codes:
+                    keys |= self._by_tag.get((dataset, code), set())
+            for key in keys:
+                self._remove(key)
+            if dataset == "*":
+                self._epoch += 1
+            elif codes is None:
+                self._dataset_generations[dataset] = self._dataset_generations.get(dataset, 0) + 1
+            else:
+                # 依赖整张表的标签受任意股票变化影响
+                for tag in [(dataset, None), *((dataset, code) for code in codes)]:
+                    self._tag_generations[tag] = self._tag_generations.get(tag, 0) + 1
+            # 正在加载的结果可能是变更前的数据，之后的请求不再等待它，其结果也不写入缓存
+            for key, (_, tags) in list(self._loading.items()):
+                if any(_affected(tag, dataset, codes) for tag in tags):
+                    del self._loading[key]
+            self.stats["invalidations"] += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        self.invalidate("*")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get(self, key: Hashable, default: Any) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.stats["misses"] += 1
+            return default
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry[1]
+
+    def _set(self, key: Hashable, value: Any, tags: List[Tag]) -> None:
+        if self.ttl <= 0:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl, value, tags)
+        for tag in tags:
+            self._by_tag.setdefault(tag, set()).add(key)
+            self._by_dataset.setdefault(tag[0], set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.stats["evictions"] += 1
+
+    def _generation(self, tags: List[Tag]) -> Tuple[int, ...]:
+        """标签当前的失效代数"""
+        return (self._epoch, *(
+            generation
+            for tag in tags
+            for generation in (self._dataset_generations.get(tag[0], 0), self._tag_generations.get(tag, 0))
+        ))
+
+    def _finish(self, key: Hashable, future: Future) -> None:
+        """结束加载，加载期间已被淘汰时 _loading 中不再是本次加载"""
+        flight = self._loading.get(key)
+        if flight is not None and flight[0] is future:
+            del self._loading[key]
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            for index, index_key in ((self._by_tag, tag), (self._by_dataset, tag[0])):
+                keys = index.get(index_key)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del index[index_key]
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+def _affected(tag: Tag, dataset: str, codes: Optional[List[str]]) -> bool:
+    if dataset == "*":
+        return True
+    return tag[0] == dataset and (codes is None or tag[1] is None or tag[1] in codes)
+
+# API 查询结果缓存，由数据变更通知精确淘汰
+api_cache = TaggedCache(
+    max_entries=settings.API_CACHE_MAX_ENTRIES, ttl=settings.API_CACHE_TTL, coalesce=settings.API_COALESCE_REQUESTS
+)
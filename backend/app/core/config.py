@@ -19,6 +19,65 @@ class Settings(BaseSettings):
     # AKShare配置
     AKSHARE_TIMEOUT: int = 30
     
+    # 数据源配置：akshare 为真实数据源，fake 为离线替身（录制数据或合成数据）
+    DATA_SOURCE: str = "akshare"
+    DATA_SOURCE_FIXTURES_DIR: Optional[str] = None
+    FAKE_SOURCE_LATENCY: float = 0.0
+    FAKE_SOURCE_ERROR_RATE: float = 0.0
+    
+    # 采集重试基础等待时间（秒），第 n 次重试等待 n 倍
+    COLLECTOR_RETRY_DELAY: float = 5.0
+    
+    # 手动刷新配置：各数据集并行刷新时共用的上游限速与并发上限
+    COLLECTOR_RATE_LIMIT: float = 5.0  # 每秒最多上游调用次数，0 表示不限速
+    COLLECTOR_CONCURRENCY: int = 8  # 同时处理的股票数，每只股票占用一个数据库连接，不应超过连接池大小
+    COLLECTOR_CALL_SECONDS: float = 1.0  # 单次上游调用的预估耗时（秒），用于 dry-run 估算
+    
+    # 定时任务配置
+    COLLECTION_CRON: str = "0 2 * * *"  # 完整采集流程的执行时间（crontab 格式）
+    JOB_LOCK_TTL: int = 600  # 任务锁有效期（秒），运行中自动续期
+    JOB_MAX_ATTEMPTS: int = 3  # 单只股票在一次运行中的最大尝试次数
+    COLLECTION_WORKERS: int = 1  # 采集工作进程数，大于 1 时按代码哈希分片并行采集
+    WORKER_BATCH_SIZE: int = 20  # 工作进程每次领取的条目数
+    WORKER_LEASE_TTL: int = 300  # 条目租约有效期（秒），处理过程中自动续期
+    
+    # HTTP 缓存与压缩配置
+    HTTP_CACHE_MAX_AGE: int = 300  # 历史数据接口的 Cache-Control max-age（秒），过期后客户端用 ETag 重新验证
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # 超过该字节数的响应才压缩（gzip，已安装 brotli 时优先 br）
+    
+    # 数据变更通知与 API 缓存配置
+    INVALIDATION_BACKEND: str = "redis"  # redis（pub/sub）、postgres（LISTEN/NOTIFY）、local（进程内）或 none
+    INVALIDATION_CHANNEL: str = "stock_data_changed"
+    API_CACHE_TTL: int = 3600  # 查询结果缓存有效期（秒），数据变更时按股票精确淘汰，0 表示不缓存
+    API_CACHE_MAX_ENTRIES: int = 10000
+    API_COALESCE_REQUESTS: bool = True  # 合并相同查询的并发请求，只执行一次数据库查询
+    
+    # /execute-sql 结果缓存：键包含规范化 SQL、参数和所依赖表的数据版本，结果压缩后按字节数 LRU 淘汰
+    SQL_CACHE_TTL: int = 3600  # 0 表示不缓存
+    SQL_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    SQL_CACHE_MAX_ENTRY_BYTES: int = 8 * 1024 * 1024  # 压缩后超过该大小的结果不缓存
+    SQL_CACHE_COMPRESS_LEVEL: int = 1
+    
+    # 图表序列缓存：按股票预计算并压缩的时间序列，采集完成后重建
+    SERIES_CACHE_BACKEND: str = "disk"  # disk、redis 或 none（每次从数据库构建）
+    SERIES_CACHE_DIR: str = "data/series"
+    CHART_MAX_CODES: int = 20  # 单次图表请求最多的股票数
+    
+    # 特征矩阵导出目录：采集完成后导出 指标 × 日期 × 股票 的 .npy 矩阵，供研究与回测进程内存映射读取
+    FEATURE_EXPORT_DIR: str = "data/features"
+    
+    # 查询结果直接用 orjson 序列化，跳过 response_model 校验（关闭后按 response_model 校验）
+    FAST_JSON_RESPONSES: bool = True
+    
+    # 财务指标校验配置：同时超出 IQR 围栏和稳健 z 分数阈值的值视为离群，记录进入隔离表
+    FINANCIAL_OUTLIER_IQR: float = 3.0
+    FINANCIAL_OUTLIER_ZSCORE: float = 5.0
+    FINANCIAL_OUTLIER_MIN_PERIODS: int = 8  # 历史期数少于该值时不做离群检查
+    
+    # 分红采集配置
+    DIVIDEND_BATCH_SIZE: int = 50  # 每批采集的股票数，每批写库一次
+    DIVIDEND_CONCURRENCY: int = 8  # 同时请求数据源的股票数
+    
     class Config:
         case_sensitive = True
         env_file = ".env"
@@ -0,0 +1,25 @@
+import pandas as pd
+from app.datasources.base import DataSource
+
+class AKShareDataSource(DataSource):
+    """AKShare 真实数据源"""
+
+    def __init__(self):
+        # akshare 导入较慢，只在真正使用时加载
+        import akshare
+        self.ak = akshare
+
+    def stock_info_a_code_name(self) -> pd.DataFrame:
+        return self.ak.stock_info_a_code_name()
+
+    def stock_individual_info_em(self, symbol: str) -> pd.DataFrame:
+        return self.ak.stock_individual_info_em(symbol=symbol)
+
+    def stock_financial_abstract_ths(self, symbol: str, indicator: str = "按报告期") -> pd.DataFrame:
+        return self.ak.stock_financial_abstract_ths(symbol=symbol, indicator=indicator)
+
+    def stock_a_indicator_lg(self, symbol: str) -> pd.DataFrame:
+        return self.ak.stock_a_indicator_lg(symbol=symbol)
+
+    def stock_history_dividend_detail(self, symbol: str, indicator: str = "分红") -> pd.DataFrame:
+        return self.ak.stock_history_dividend_detail(symbol=symbol, indicator=indicator)
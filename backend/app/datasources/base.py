@@ -0,0 +1,67 @@
+from typing import Optional
+import pandas as pd
+from app.core.config import settings
+
+class DataSource:
+    """
+    行情数据源接口
+
+    方法名与参数与 AKShare 同名函数保持一致，采集脚本只依赖该接口，
+    便于在真实数据源与离线替身之间切换。
+    """
+
+    def stock_info_a_code_name(self) -> pd.DataFrame:
+        """A 股代码与名称列表，列：code, name"""
+        raise NotImplementedError
+
+    def stock_individual_info_em(self, symbol: str) -> pd.DataFrame:
+        """个股基本信息，列：item, value"""
+        raise NotImplementedError
+
+    def stock_financial_abstract_ths(self, symbol: str, indicator: str = "按报告期") -> pd.DataFrame:
+        """同花顺财务摘要，列：报告期及各项指标（带单位的字符串）"""
+        raise NotImplementedError
+
+    def stock_a_indicator_lg(self, symbol: str) -> pd.DataFrame:
+        """日度估值指标，列：trade_date, pe, pe_ttm, pb, ps, ps_ttm, dv_ratio, dv_ttm, total_mv"""
+        raise NotImplementedError
+
+    def stock_history_dividend_detail(self, symbol: str, indicator: str = "分红") -> pd.DataFrame:
+        """历史分红，列：公告日期, 送股, 转增, 派息, 进度, 除权除息日, 股权登记日, 红股上市日"""
+        raise NotImplementedError
+
+_data_source: Optional[DataSource] = None
+
+def create_data_source(name: str) -> DataSource:
+    """
+    按名称创建数据源
+
+    Args:
+        name: 数据源名称，akshare 或 fake
+
+    Returns:
+        DataSource: 数据源实例
+    """
+    if name == "akshare":
+        from app.datasources.akshare_source import AKShareDataSource
+        return AKShareDataSource()
+    if name == "fake":
+        from app.datasources.fake import FakeDataSource
+        return FakeDataSource(
+            fixtures_dir=settings.DATA_SOURCE_FIXTURES_DIR,
+            latency=settings.FAKE_SOURCE_LATENCY,
+            error_rate=settings.FAKE_SOURCE_ERROR_RATE,
+        )
+    raise ValueError(f"未知的数据源: {name}")
+
+def get_data_source() -> DataSource:
+    """获取当前数据源，首次调用时按配置创建"""
+    global _data_source
+    if _data_source is None:
+        _data_source = create_data_source(settings.DATA_SOURCE)
+    return _data_source
+
+def set_data_source(source: Optional[DataSource]) -> None:
+    """替换当前数据源，传入 None 时恢复为按配置创建"""
+    global _data_source
+    _data_source = source
@@ -0,0 +1,236 @@
+import os
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Optional, Iterable
+import numpy as np
+import pandas as pd
+from app.datasources.base import DataSource
+from app.utils.data_converter import FINANCIAL_FIELD_MAP
+
+INDUSTRIES = ["银行", "证券", "保险", "白酒", "医药", "半导体", "汽车", "电力", "煤炭", "房地产"]
+
+AMOUNT_COLUMNS = ["net_profit", "non_net_profit", "total_revenue"]
+PERCENT_COLUMNS = [
+    "net_profit_growth", "non_net_profit_growth", "total_revenue_growth",
+    "net_profit_margin", "gross_profit_margin", "roe", "roe_diluted", "debt_ratio",
+]
+
+class InjectedError(ConnectionError):
+    """离线数据源按配置注入的模拟网络错误"""
+
+def synthetic_codes(n_stocks: int) -> list:
+    """生成沪深两市交替分布的股票代码"""
+    codes = []
+    for i in range(n_stocks):
+        if i % 2 == 0:
+            codes.append(f"{600000 + i // 2:06d}")
+        else:
+            codes.append(f"{1 + i // 2:06d}")
+    return codes
+
+def format_amount(value: float) -> str:
+    """按同花顺格式输出金额，如 12.34亿、567.89万"""
+    if abs(value) >= 10**8:
+        return f"{value / 10**8:.2f}亿"
+    return f"{value / 10**4:.2f}万"
+
+class FakeDataSource(DataSource):
+    """
+    离线数据源替身
+
+    优先返回 fixtures_dir 中录制的数据（<方法名>/<代码>.pkl），没有录制数据时
+    按股票代码生成确定性的合成数据。支持注入固定/随机延迟和随机错误，用于在单机上
+    可复现地测试采集的并发、批量与重试行为。
+
+    Args:
+        fixtures_dir: 录制数据目录（可选）
+        latency: 每次调用的固定延迟（秒）
+        latency_jitter: 额外随机延迟的上限（秒）
+        error_rate: 每次调用抛出 InjectedError 的概率
+        fail_symbols: 总是失败的股票代码
+        seed: 随机种子
+        n_stocks: 股票列表中的股票数量
+        n_periods: 每只股票的报告期数量
+        n_days: 每只股票的日度估值数量
+        end_date: 合成数据的截止日期
+    """
+
+    def __init__(
+        self,
+        fixtures_dir: Optional[str] = None,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        error_rate: float = 0.0,
+        fail_symbols: Optional[Iterable[str]] = None,
+        seed: int = 0,
+        n_stocks: int = 100,
+        n_periods: int = 40,
+        n_days: int = 750,
+        end_date: str = "2024-12-31",
+    ):
+        self.fixtures_dir = fixtures_dir
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.fail_symbols = set(fail_symbols or [])
+        self.seed = seed
+        self.n_stocks = n_stocks
+        self.n_periods = n_periods
+        self.n_days = n_days
+        self.end_date = end_date
+        self.calls = Counter()
+        self.errors = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _rng(self, symbol: str) -> np.random.Generator:
+        return np.random.default_rng([self.seed, zlib.crc32(symbol.encode())])
+
+    def _before_call(self, method: str, symbol: str) -> None:
+        with self._lock:
+            self.calls[method] += 1
+            delay = self.latency + self._random.uniform(0, self.latency_jitter)
+            fail = symbol in self.fail_symbols or self._random.random() < self.error_rate
+            if fail:
+                self.errors[method] += 1
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            raise InjectedError(f"模拟 {method}({symbol}) 请求失败")
+
+    def _load_fixture(self, method: str, symbol: str) -> Optional[pd.DataFrame]:
+        if not self.fixtures_dir:
+            return None
+        path = os.path.join(self.fixtures_dir, method, f"{symbol}.pkl")
+        if not os.path.exists(path):
+            return None
+        return pd.read_pickle(path)
+
+    def _serve(self, method: str, symbol: str, generate) -> pd.DataFrame:
+        self._before_call(method, symbol)
+        df = self._load_fixture(method, symbol)
+        if df is None:
+            df = generate()
+        return df.copy()
+
+    def stock_info_a_code_name(self) -> pd.DataFrame:
+        def generate():
+            codes = synthetic_codes(self.n_stocks)
+            return pd.DataFrame({"code": codes, "name": [f"合成{code}" for code in codes]})
+        return self._serve("stock_info_a_code_name", "all", generate)
+
+    def stock_individual_info_em(self, symbol: str) -> pd.DataFrame:
+        def generate():
+            rng = self._rng(symbol)
+            total_shares = float(rng.integers(10**8, 10**10))
+            price = round(float(rng.uniform(3, 200)), 2)
+            listing_year = int(rng.integers(1991, 2020))
+            return pd.DataFrame({
+                "item": ["最新", "股票代码", "股票简称", "总股本", "流通股", "总市值", "流通市值", "行业", "上市时间"],
+                "value": [
+                    price, symbol, f"合成{symbol}", total_shares, total_shares * 0.8,
+                    total_shares * price, total_shares * price * 0.8,
+                    INDUSTRIES[int(rng.integers(len(INDUSTRIES)))], listing_year * 10000 + 401,
+                ],
+            })
+        return self._serve("stock_individual_info_em", symbol, generate)
+
+    def stock_financial_abstract_ths(self, symbol: str, indicator: str = "按报告期") -> pd.DataFrame:
+        def generate():
+            rng = self._rng(symbol)
+            periods = pd.date_range(end=self.end_date, periods=self.n_periods, freq="Q")
+            df = pd.DataFrame({"报告期": periods.strftime("%Y-%m-%d")})
+            for column, field in FINANCIAL_FIELD_MAP.items():
+                if column in AMOUNT_COLUMNS:
+                    values = rng.integers(10**6, 10**11, size=self.n_periods)
+                    df[field] = [format_amount(value) for value in values]
+                elif column == "debt_ratio":
+                    df[field] = [f"{value:.2f}%" for value in rng.uniform(5, 95, size=self.n_periods)]
+                elif column in PERCENT_COLUMNS:
+                    df[field] = [f"{value:.2f}%" for value in rng.normal(10, 15, size=self.n_periods)]
+                else:
+                    df[field] = [f"{value:.4f}" for value in rng.uniform(0.1, 50, size=self.n_periods)]
+            # 保留真实数据中常见的缺失值形式
+            df["营业周期"] = False
+            return df
+        return self._serve("stock_financial_abstract_ths", symbol, generate)
+
+    def stock_a_indicator_lg(self, symbol: str) -> pd.DataFrame:
+        def generate():
+            rng = self._rng(symbol)
+            days = pd.bdate_range(end=self.end_date, periods=self.n_days)
+            pe = rng.lognormal(3, 0.6, size=self.n_days).round(2)
+            pb = rng.lognormal(0.7, 0.5, size=self.n_days).round(3)
+            ps = rng.lognormal(1, 0.7, size=self.n_days).round(3)
+            dv = rng.uniform(0, 6, size=self.n_days).round(3)
+            return pd.DataFrame({
+                "trade_date": days.date,
+                "pe": pe,
+                "pe_ttm": pe,
+                "pb": pb,
+                "ps": ps,
+                "ps_ttm": ps,
+                "dv_ratio": dv,
+                "dv_ttm": dv,
+                "total_mv": rng.uniform(10**5, 10**7, size=self.n_days).round(2),
+            })
+        return self._serve("stock_a_indicator_lg", symbol, generate)
+
+    def stock_history_dividend_detail(self, symbol: str, indicator: str = "分红") -> pd.DataFrame:
+        def generate():
+            rng = self._rng(symbol)
+            end_year = pd.Timestamp(self.end_date).year
+            years = [year for year in range(end_year - 14, end_year + 1) if rng.random() < 0.8]
+            ex_dates = pd.to_datetime([f"{year}-07-{int(rng.integers(1, 28)):02d}" for year in years])
+            return pd.DataFrame({
+                "公告日期": (ex_dates - pd.Timedelta(days=10)).date,
+                "送股": rng.choice([0.0, 0.0, 0.0, 2.0], size=len(years)),
+                "转增": rng.choice([0.0, 0.0, 0.0, 3.0], size=len(years)),
+                "派息": rng.uniform(0.5, 20, size=len(years)).round(2),
+                "进度": "实施",
+                "除权除息日": ex_dates.date,
+                "股权登记日": (ex_dates - pd.Timedelta(days=1)).date,
+                "红股上市日": None,
+            }).iloc[::-1].reset_index(drop=True)
+        return self._serve("stock_history_dividend_detail", symbol, generate)
+
+class RecordingDataSource(DataSource):
+    """
+    录制数据源：透传到内部数据源，并将返回结果保存为 FakeDataSource 可回放的录制数据
+
+    Args:
+        inner: 被录制的数据源（通常是 AKShareDataSource）
+        fixtures_dir: 录制数据保存目录
+    """
+
+    def __init__(self, inner: DataSource, fixtures_dir: str):
+        self.inner = inner
+        self.fixtures_dir = fixtures_dir
+
+    def _record(self, method: str, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        directory = os.path.join(self.fixtures_dir, method)
+        os.makedirs(directory, exist_ok=True)
+        df.to_pickle(os.path.join(directory, f"{symbol}.pkl"))
+        return df
+
+    def stock_info_a_code_name(self) -> pd.DataFrame:
+        return self._record("stock_info_a_code_name", "all", self.inner.stock_info_a_code_name())
+
+    def stock_individual_info_em(self, symbol: str) -> pd.DataFrame:
+        return self._record("stock_individual_info_em", symbol, self.inner.stock_individual_info_em(symbol))
+
+    def stock_financial_abstract_ths(self, symbol: str, indicator: str = "按报告期") -> pd.DataFrame:
+        return self._record(
+            "stock_financial_abstract_ths", symbol, self.inner.stock_financial_abstract_ths(symbol, indicator)
+        )
+
+    def stock_a_indicator_lg(self, symbol: str) -> pd.DataFrame:
+        return self._record("stock_a_indicator_lg", symbol, self.inner.stock_a_indicator_lg(symbol))
+
+    def stock_history_dividend_detail(self, symbol: str, indicator: str = "分红") -> pd.DataFrame:
+        return self._record(
+            "stock_history_dividend_detail", symbol, self.inner.stock_history_dividend_detail(symbol, indicator)
+        )
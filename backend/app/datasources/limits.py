@@ -0,0 +1,78 @@
+import threading
+import time
+from collections import Counter
+from typing import Optional
+import pandas as pd
+from app.datasources.base import DataSource
+
+class RateLimiter:
+    """
+    线程安全的令牌桶限速器
+
+    采集时上游调用在线程池中执行，多个数据集共用同一个限速器，总请求速率不超过 rate。
+
+    Args:
+        rate: 每秒允许的调用次数，0 或负数表示不限速
+        burst: 桶容量（允许的突发调用数），默认与 rate 相同
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = max(burst or rate, 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """取得一个令牌，令牌不足时阻塞等待"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+class LimitedDataSource(DataSource):
+    """
+    为数据源加上共享的限速与并发上限，并统计各方法的调用次数
+
+    Args:
+        source: 被包装的数据源
+        rate: 每秒最多调用次数，0 表示不限速
+        max_connections: 同时进行的上游调用数上限
+    """
+
+    def __init__(self, source: DataSource, rate: float, max_connections: int):
+        self.source = source
+        self.limiter = RateLimiter(rate)
+        self.connections = threading.BoundedSemaphore(max_connections)
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def _call(self, method: str, *args, **kwargs) -> pd.DataFrame:
+        with self.connections:
+            self.limiter.acquire()
+            with self._lock:
+                self.calls[method] += 1
+            return getattr(self.source, method)(*args, **kwargs)
+
+    def stock_info_a_code_name(self) -> pd.DataFrame:
+        return self._call("stock_info_a_code_name")
+
+    def stock_individual_info_em(self, symbol: str) -> pd.DataFrame:
+        return self._call("stock_individual_info_em", symbol)
+
+    def stock_financial_abstract_ths(self, symbol: str, indicator: str = "按报告期") -> pd.DataFrame:
+        return self._call("stock_financial_abstract_ths", symbol, indicator)
+
+    def stock_a_indicator_lg(self, symbol: str) -> pd.DataFrame:
+        return self._call("stock_a_indicator_lg", symbol)
+
+    def stock_history_dividend_detail(self, symbol: str, indicator: str = "分红") -> pd.DataFrame:
+        return self._call("stock_history_dividend_detail", symbol, indicator)
@@ -0,0 +1,8 @@
+# 导入全部模型，保证建表和配置关系映射时所有模型都已注册到 Base
+from app.db.session import Base
+from app.models.stock import Stock
+from app.models.financial import FinancialIndicator, FinancialValidity
+from app.models.valuation import StockValuation
+from app.models.dividend import StockDividend, StockDividendYearly
+from app.models.job import CollectionRun, CollectionCheckpoint, JobLock, DatasetRefresh
+from app.models.quarantine import DataQuarantine
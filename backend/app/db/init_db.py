@@ -2,10 +2,7 @@ import logging
 from sqlalchemy import create_engine
 from sqlalchemy_utils import database_exists, create_database
 from app.core.config import settings
-from app.db.session import Base
-from app.models.stock import Stock
-from app.models.financial import FinancialIndicator
-from app.models.valuation import StockValuation
+from app.db.base import Base
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
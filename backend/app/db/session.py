@@ -1,18 +1,44 @@
+from typing import Optional
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
 Base = declarative_base()
 
+# 引擎在第一次使用时创建：导入模型或命令行帮助等不访问数据库的场景不加载数据库驱动
+_engine: Optional[Engine] = None
+_session_factory = sessionmaker(autocommit=False, autoflush=False)
+
+def get_engine() -> Engine:
+    """获取数据库引擎，首次调用时按配置创建"""
+    global _engine
+    if _engine is None:
+        _engine = create_engine(settings.DATABASE_URL)
+        _session_factory.configure(bind=_engine)
+    return _engine
+
+def dispose_engine() -> None:
+    """关闭连接池中的连接，之后再使用引擎时会重新建立连接"""
+    if _engine is not None:
+        _engine.dispose()
+
+def SessionLocal() -> Session:
+    """创建数据库会话（保留原有名称，调用方式与 sessionmaker 相同）"""
+    get_engine()
+    return _session_factory()
+
+def __getattr__(name: str):
+    # 兼容 `from app.db.session import engine`，访问时才创建引擎
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # 依赖项
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
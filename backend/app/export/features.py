@@ -0,0 +1,178 @@
+"""
+特征矩阵导出与加载
+
+采集完成后将财务指标和估值指标按 指标 × 日期 × 股票 的稠密矩阵导出为 .npy 文件，研究与回测进程
+通过 load_panel 以内存映射方式打开，多个进程共享同一份页缓存，无需查询数据库。
+
+目录结构（{目录} 默认取 FEATURE_EXPORT_DIR）:
+    {目录}/{数据集}              -> 指向当前版本目录的符号链接
+    {目录}/{数据集}-{版本}/values.npy    float64，形状 (指标数, 日期数, 股票数)，缺失为 NaN
+    {目录}/{数据集}-{版本}/dates.npy     datetime64[M]，升序（估值按自然月、财务指标按报告期所在月份对齐）
+    {目录}/{数据集}-{版本}/codes.npy     股票代码，升序
+    {目录}/{数据集}-{版本}/manifest.json 指标名、形状和导出时的数据版本
+
+用法:
+    panel = load_panel("valuations")
+    pe = panel.frame("pe_ttm")            # 日期 × 股票的 DataFrame（不复制数据）
+    pb = panel.matrix("pb")[:, panel.code_index("600000")]
+    panel.frame("pb").loc["2023-02"]     # 2023 年 2 月各股票的最后一个估值
+"""
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import numpy as np
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+
+class FeaturePanel:
+    """
+    以内存映射方式打开的特征矩阵
+
+    打开时先解析符号链接，之后重新导出不会影响已打开的实例。
+
+    Args:
+        path: 数据集目录（符号链接或版本目录）
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.realpath(path)
+        with open(os.path.join(self.path, MANIFEST), encoding="utf-8") as file:
+            self.manifest: Dict[str, Any] = json.load(file)
+        self.metrics: List[str] = self.manifest["metrics"]
+        self.dates: np.ndarray = np.load(os.path.join(self.path, "dates.npy"))
+        self.codes: np.ndarray = np.load(os.path.join(self.path, "codes.npy"))
+        self.values: np.ndarray = np.load(os.path.join(self.path, "values.npy"), mmap_mode="r")
+        self._metric_index = {metric: i for i, metric in enumerate(self.metrics)}
+
+    def code_index(self, stock_code: str) -> int:
+        """股票代码在矩阵中的列号，不存在时抛出 KeyError"""
+        position = int(np.searchsorted(self.codes, stock_code))
+        if position >= len(self.codes) or self.codes[position] != stock_code:
+            raise KeyError(stock_code)
+        return position
+
+    def matrix(self, metric: str) -> np.ndarray:
+        """单个指标的 日期 × 股票 矩阵（只读视图）"""
+        return self.values[self._metric_index[metric]]
+
+    def frame(self, metric: str):
+        """单个指标的 日期 × 股票 DataFrame，数据直接引用内存映射"""
+        import pandas as pd
+        return pd.DataFrame(self.matrix(metric), index=pd.DatetimeIndex(self.dates), columns=self.codes, copy=False)
+
+def _dataset_path(dataset: str, directory: Optional[str]) -> str:
+    return os.path.join(directory or settings.FEATURE_EXPORT_DIR, dataset)
+
+def load_panel(dataset: str, directory: Optional[str] = None) -> FeaturePanel:
+    """
+    打开已导出的特征矩阵
+
+    Args:
+        dataset: 数据集名称，valuations 或 financials
+        directory: 导出目录，默认取 FEATURE_EXPORT_DIR
+
+    Returns:
+        FeaturePanel: 特征矩阵
+    """
+    return FeaturePanel(_dataset_path(dataset, directory))
+
+def build_panel(rows: List[tuple], n_metrics: int) -> Dict[str, np.ndarray]:
+    """
+    将 (股票代码, 日期, 指标...) 行转换为稠密矩阵
+
+    日期按月对齐：各股票交易日不同（停牌、上市日期不同），按原始日期取并集会得到大量只有个别股票有值的行；
+    财务指标的报告期都是月末，按月对齐后即为报告期。同一股票同一月份有多行时取日期最晚的一行。
+
+    Args:
+        rows: 查询结果
+        n_metrics: 指标数
+
+    Returns:
+        Dict[str, np.ndarray]: codes、dates（datetime64[M]）和形状为 (指标数, 日期数, 股票数) 的 values
+    """
+    stock_codes = np.array([row[0] for row in rows], dtype=str)
+    row_dates = np.array([str(row[1]) for row in rows], dtype="datetime64[D]")
+    data = np.array([row[2:] for row in rows], dtype=float).reshape(len(rows), n_metrics)
+    # 按日期排序后写入，重复位置保留最后写入的值，即每月日期最晚的一行
+    order = np.argsort(row_dates, kind="stable")
+    codes, code_positions = np.unique(stock_codes[order], return_inverse=True)
+    dates, date_positions = np.unique(row_dates[order].astype("datetime64[M]"), return_inverse=True)
+    values = np.full((n_metrics, len(dates), len(codes)), np.nan)
+    values[:, date_positions, code_positions] = data[order].T
+    return {"codes": codes, "dates": dates, "values": values}
+
+def _table_version(db, table: str) -> str:
+    from sqlalchemy import text
+    last_modified, count = db.execute(text(f"SELECT MAX(updated_at), COUNT(*) FROM {table}")).one()
+    return f"{last_modified or ''}|{count}"
+
+def export_panel(db, dataset: str, directory: Optional[str] = None, force: bool = False) -> Optional[str]:
+    """
+    导出单个数据集的特征矩阵
+
+    先写入新的版本目录，再原子替换符号链接；只保留当前和上一个版本，正在读取上一个版本的进程不受影响。
+    数据版本与当前导出一致时跳过。
+
+    Args:
+        db: 数据库会话
+        dataset: 数据集名称，valuations 或 financials
+        directory: 导出目录，默认取 FEATURE_EXPORT_DIR
+        force: 数据未变化时是否仍然导出
+
+    Returns:
+        Optional[str]: 新版本目录，跳过时为 None
+    """
+    from sqlalchemy import text
+    from app.services.chart_service import SERIES_DATASETS
+
+    table, date_column, metrics = SERIES_DATASETS[dataset]
+    link = _dataset_path(dataset, directory)
+    version = _table_version(db, table)
+    if not force and os.path.exists(link):
+        try:
+            if FeaturePanel(link).manifest["data_version"] == version:
+                logger.info(f"{dataset} 特征矩阵的数据没有变化，跳过导出")
+                return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"无法读取已导出的 {dataset} 特征矩阵，重新导出: {str(e)}")
+
+    rows = db.execute(
+        text(f"SELECT stock_code, {date_column}, {', '.join(metrics)} FROM {table}")
+    ).all()
+    panel = build_panel(rows, len(metrics))
+
+    root = os.path.dirname(link)
+    stamp = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
+    target = f"{link}-{stamp}"
+    os.makedirs(target)
+    for name, array in panel.items():
+        np.save(os.path.join(target, f"{name}.npy"), array)
+    with open(os.path.join(target, MANIFEST), "w", encoding="utf-8") as file:
+        json.dump({
+            "dataset": dataset,
+            "metrics": metrics,
+            "shape": list(panel["values"].shape),
+            "data_version": version,
+            "exported_at": datetime.utcnow().isoformat(),
+        }, file, ensure_ascii=False)
+
+    previous = os.path.realpath(link) if os.path.islink(link) else None
+    tmp_link = f"{link}.tmp"
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(os.path.basename(target), tmp_link)
+    os.replace(tmp_link, link)
+
+    keep = {os.path.realpath(target), previous}
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if name.startswith(f"{dataset}-") and os.path.isdir(path) and os.path.realpath(path) not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+    logger.info(f"导出 {dataset} 特征矩阵 {panel['values'].shape} 到 {target}")
+    return target
@@ -1,11 +1,30 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.api import api_router
+from app.api.compression import CompressionMiddleware
+from app.core.config import settings
+from app.cache.bus import get_bus
+from app.cache.results import table_versions
+from app.cache.store import api_cache
+from app.db.session import dispose_engine, get_engine
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 数据库引擎和通知通道在进程启动时创建，而不是在导入时
+    get_engine()
+    # 订阅数据变更通知，采集提交后精确淘汰查询缓存
+    get_bus().subscribe(api_cache.invalidate)
+    get_bus().subscribe(table_versions.bump)
+    yield
+    get_bus().close()
+    dispose_engine()
 
 app = FastAPI(
     title="Stock Analysis API",
     description="股票分析筛选系统 API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # 配置 CORS
@@ -15,8 +34,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "X-Next-Cursor", "X-Cache"],  # 浏览器端需要读取的缓存与分页响应头
 )
 
+# 压缩较大的响应
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
 # 注册 API 路由
 app.include_router(api_router, prefix="/api")
 
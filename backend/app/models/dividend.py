@@ -0,0 +1,36 @@
+from sqlalchemy import Column, String, Float, Date, Integer, ForeignKey
+from sqlalchemy.orm import relationship
+from app.models.base import BaseModel
+
+class StockDividend(BaseModel):
+    """历史分红记录"""
+    __tablename__ = 'stock_dividends'
+
+    id = Column(String(50), primary_key=True, index=True)
+    stock_code = Column(String(10), ForeignKey('stock_basic.code'), nullable=False, index=True)
+    announce_date = Column(Date, nullable=False, comment='公告日期')
+
+    # 分红方案（每10股）
+    bonus_shares = Column(Float, comment='送股(股/10股)')
+    transfer_shares = Column(Float, comment='转增(股/10股)')
+    cash_dividend = Column(Float, comment='派息(元/10股，税前)')
+    progress = Column(String(20), comment='进度')
+
+    # 关键日期
+    ex_dividend_date = Column(Date, index=True, comment='除权除息日')
+    record_date = Column(Date, comment='股权登记日')
+    bonus_listing_date = Column(Date, comment='红股上市日')
+
+    # 关联关系
+    stock = relationship("Stock", back_populates="dividends")
+
+class StockDividendYearly(BaseModel):
+    """年度分红统计，由分红记录按除权除息日所在年份汇总"""
+    __tablename__ = 'stock_dividend_yearly'
+
+    id = Column(String(50), primary_key=True, index=True)
+    stock_code = Column(String(10), ForeignKey('stock_basic.code'), nullable=False, index=True)
+    year = Column(Integer, nullable=False, index=True, comment='年份')
+    payout_count = Column(Integer, nullable=False, comment='现金分红次数')
+    cash_per_share = Column(Float, nullable=False, comment='每股现金分红合计(元，税前)')
+    streak = Column(Integer, nullable=False, index=True, comment='截至当年连续现金分红年数')
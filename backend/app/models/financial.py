@@ -1,10 +1,15 @@
-from sqlalchemy import Column, String, Float, Date, ForeignKey, BigInteger
+from sqlalchemy import Column, String, Float, Date, ForeignKey, BigInteger, Index
 from sqlalchemy.orm import relationship
 from app.models.base import BaseModel
 
 class FinancialIndicator(BaseModel):
     """财务指标"""
     __tablename__ = 'stock_financials'
+    __table_args__ = (
+        # 键集分页的排序键；条件请求按 (stock_code, updated_at) 计算数据版本
+        Index('ix_stock_financials_code_report_date', 'stock_code', 'report_date'),
+        Index('ix_stock_financials_code_updated', 'stock_code', 'updated_at'),
+    )
     
     id = Column(String(50), primary_key=True, index=True)
     stock_code = Column(String(10), ForeignKey('stock_basic.code'), nullable=False, index=True)
@@ -45,4 +50,24 @@ class FinancialIndicator(BaseModel):
     debt_ratio = Column(Float, comment='资产负债率(%)')
     
     # 关联关系
-    stock = relationship("Stock", back_populates="financial_indicators")
\ No newline at end of file
+    stock = relationship("Stock", back_populates="financial_indicators")
+
+class FinancialValidity(BaseModel):
+    """
+    财务指标的时点有效区间，用于按历史日期回放（避免使用当时尚未披露的数据）
+
+    每个报告期一条：valid_from 为披露日期，在 [valid_from, valid_to) 内该报告期是此股票已披露的最新一期；
+    披露当天即被更新报告期取代的记录（如与一季报同日披露的年报）区间为空。
+    """
+    __tablename__ = 'stock_financial_validity'
+    __table_args__ = (
+        # 全市场时点查询按区间筛选；单只股票按 (stock_code, valid_from) 查询
+        Index('ix_stock_financial_validity_range', 'valid_to', 'valid_from'),
+        Index('ix_stock_financial_validity_code_from', 'stock_code', 'valid_from'),
+    )
+
+    id = Column(String(50), primary_key=True, comment='与 stock_financials.id 相同')
+    stock_code = Column(String(10), ForeignKey('stock_basic.code'), nullable=False, comment='股票代码')
+    report_date = Column(Date, nullable=False, comment='报告期')
+    valid_from = Column(Date, nullable=False, comment='披露日期（含）')
+    valid_to = Column(Date, nullable=False, comment='被更新报告期取代的日期（不含），仍有效时为 9999-12-31')
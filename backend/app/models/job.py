@@ -0,0 +1,57 @@
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from app.models.base import BaseModel
+
+class CollectionRun(BaseModel):
+    """采集任务运行记录"""
+    __tablename__ = 'collection_runs'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_name = Column(String(50), nullable=False, index=True, comment='任务名称')
+    status = Column(String(20), nullable=False, index=True, comment='状态: running/completed/failed')
+    started_at = Column(DateTime, nullable=False, comment='开始时间')
+    finished_at = Column(DateTime, comment='结束时间')
+    total = Column(Integer, nullable=False, default=0, comment='待处理条目数')
+    error = Column(Text, comment='失败原因')
+
+    # 关联关系
+    checkpoints = relationship("CollectionCheckpoint", back_populates="run")
+
+class CollectionCheckpoint(BaseModel):
+    """采集进度检查点，每次运行中每个条目（股票代码或任务名）一条"""
+    __tablename__ = 'collection_checkpoints'
+    __table_args__ = (
+        UniqueConstraint('run_id', 'item', name='uq_collection_checkpoint_run_item'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    run_id = Column(Integer, ForeignKey('collection_runs.id'), nullable=False, index=True)
+    item = Column(String(50), nullable=False, comment='股票代码或任务名')
+    status = Column(String(20), nullable=False, index=True, comment='状态: pending/done/failed')
+    attempts = Column(Integer, nullable=False, default=0, comment='已尝试次数')
+    error = Column(Text, comment='最近一次失败原因')
+    
+    # 分片并行采集：条目按代码哈希分片，工作进程领取条目时写入租约，租约过期后可被其他进程接管
+    shard = Column(Integer, nullable=False, default=0, index=True, comment='分片编号')
+    lease_owner = Column(String(100), comment='租约持有者')
+    lease_expires_at = Column(DateTime, comment='租约过期时间')
+
+    # 关联关系
+    run = relationship("CollectionRun", back_populates="checkpoints")
+
+class JobLock(BaseModel):
+    """任务锁，防止同一任务重叠运行"""
+    __tablename__ = 'job_locks'
+
+    name = Column(String(50), primary_key=True, comment='锁名称')
+    owner = Column(String(100), nullable=False, comment='持有者')
+    expires_at = Column(DateTime, nullable=False, comment='过期时间')
+
+
+class DatasetRefresh(BaseModel):
+    """每只股票各数据集最近一次成功采集的时间，按需刷新时据此判断数据是否过期"""
+    __tablename__ = 'dataset_refreshes'
+
+    dataset = Column(String(50), primary_key=True, comment='数据集（任务名称）')
+    stock_code = Column(String(10), primary_key=True, comment='股票代码')
+    refreshed_at = Column(DateTime, nullable=False, comment='最近一次成功采集的时间')
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Text, Index
+from app.models.base import BaseModel
+
+class DataQuarantine(BaseModel):
+    """未通过校验的采集记录，保留原始数据供排查，不参与查询"""
+    __tablename__ = 'data_quarantine'
+    __table_args__ = (
+        Index('ix_data_quarantine_dataset_code', 'dataset', 'stock_code'),
+    )
+
+    id = Column(String(100), primary_key=True, index=True)
+    dataset = Column(String(50), nullable=False, comment='目标表名')
+    stock_code = Column(String(10), nullable=False, comment='股票代码')
+    record_key = Column(String(50), comment='记录标识（如报告期）')
+    reasons = Column(String(500), nullable=False, comment='未通过的检查，如 type:eps;range:debt_ratio')
+    raw = Column(Text, comment='数据源原始记录(JSON)')
@@ -1,10 +1,15 @@
-from sqlalchemy import Column, String, Date, Boolean
+from sqlalchemy import Column, String, Date, Boolean, Index
 from sqlalchemy.orm import relationship
 from app.models.base import BaseModel
 
 class Stock(BaseModel):
     """股票基本信息"""
     __tablename__ = 'stock_basic'
+    __table_args__ = (
+        # 键集分页的排序键
+        Index('ix_stock_basic_industry_code', 'industry', 'code'),
+        Index('ix_stock_basic_market_code', 'market', 'code'),
+    )
     
     code = Column(String(10), primary_key=True, index=True, comment='股票代码')
     name = Column(String(50), nullable=False, comment='股票名称')
@@ -13,4 +18,6 @@ class Stock(BaseModel):
     listing_date = Column(Date, comment='上市日期')
     
     # 关联关系
-    valuations = relationship("StockValuation", back_populates="stock") 
\ No newline at end of file
+    valuations = relationship("StockValuation", back_populates="stock")
+    financial_indicators = relationship("FinancialIndicator", back_populates="stock")
+    dividends = relationship("StockDividend", back_populates="stock") 
\ No newline at end of file
@@ -1,10 +1,15 @@
-from sqlalchemy import Column, String, Float, Date, ForeignKey
+from sqlalchemy import Column, String, Float, Date, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.models.base import BaseModel
 
 class StockValuation(BaseModel):
     """股票估值指标"""
     __tablename__ = 'stock_valuations'
+    __table_args__ = (
+        # 键集分页的排序键；条件请求按 (stock_code, updated_at) 计算数据版本
+        Index('ix_stock_valuations_code_date', 'stock_code', 'date'),
+        Index('ix_stock_valuations_code_updated', 'stock_code', 'updated_at'),
+    )
     
     id = Column(String(50), primary_key=True, index=True)
     stock_code = Column(String(10), ForeignKey('stock_basic.code'), nullable=False, index=True)
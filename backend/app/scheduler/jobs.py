@@ -0,0 +1,156 @@
+import inspect
+from typing import Callable, Dict, List, Iterable, Awaitable
+from sqlalchemy.orm import Session
+import app.db.base  # noqa: F401  注册全部模型
+from app.models.stock import Stock
+
+class Job:
+    """
+    采集任务定义
+
+    任务由一组条目（股票代码或派生任务名）组成，逐条处理并记录检查点。
+
+    Args:
+        name: 任务名称
+        description: 任务说明
+        list_items: 返回本次运行全部条目的协程函数
+        process_item: 处理单个条目的协程函数，返回是否成功
+        depends_on: 依赖的任务名称，运行时先完成依赖任务
+    """
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        list_items: Callable[[Session], Awaitable[List[str]]],
+        process_item: Callable[[Session, str], Awaitable[bool]],
+        depends_on: Iterable[str] = (),
+    ):
+        self.name = name
+        self.description = description
+        self.list_items = list_items
+        self.process_item = process_item
+        self.depends_on = list(depends_on)
+
+JOBS: Dict[str, Job] = {}
+
+# 派生指标任务：在财务与估值采集完成后运行，名称 -> 函数(db)
+DERIVED_TASKS: Dict[str, Callable[[Session], None]] = {}
+
+def register_job(job: Job) -> Job:
+    JOBS[job.name] = job
+    return job
+
+def derived_task(name: str):
+    """注册派生指标任务的装饰器，函数可以是普通函数或协程函数"""
+    def decorator(func: Callable[[Session], None]):
+        DERIVED_TASKS[name] = func
+        return func
+    return decorator
+
+def resolve_order(names: Iterable[str], with_dependencies: bool = True) -> List[str]:
+    """
+    按依赖关系对任务排序
+
+    Args:
+        names: 需要运行的任务名称
+        with_dependencies: 是否自动加入依赖任务
+
+    Returns:
+        List[str]: 依赖在前的任务名称列表
+    """
+    selected = set(names)
+    unknown = selected - set(JOBS)
+    if unknown:
+        raise ValueError(f"未知的任务: {', '.join(sorted(unknown))}")
+    order: List[str] = []
+    visiting = set()
+
+    def visit(name: str):
+        if name in order:
+            return
+        if name in visiting:
+            raise ValueError(f"任务依赖存在循环: {name}")
+        visiting.add(name)
+        for dependency in JOBS[name].depends_on:
+            if with_dependencies or dependency in selected:
+                visit(dependency)
+        visiting.discard(name)
+        order.append(name)
+
+    for name in JOBS:
+        if name in selected:
+            visit(name)
+    return order
+
+async def _all_stock_codes(db: Session) -> List[str]:
+    return [code for (code,) in db.query(Stock.code).order_by(Stock.code).all()]
+
+async def _list_stock_universe(db: Session) -> List[str]:
+    from app.scripts.collect_data import sync_stock_list
+    return await sync_stock_list(db)
+
+async def _process_stock_basic(db: Session, code: str) -> bool:
+    from app.scripts.collect_data import process_stock_basic
+    return await process_stock_basic(db, code)
+
+async def _process_financials(db: Session, code: str) -> bool:
+    from app.scripts.collect_data import process_stock_financial_indicators
+    stock = db.query(Stock).filter(Stock.code == code).first()
+    if not stock:
+        return False
+    return await process_stock_financial_indicators(db, stock)
+
+async def _process_valuations(db: Session, code: str) -> bool:
+    from app.scripts.collect_valuation import process_stock_valuation
+    stock = db.query(Stock).filter(Stock.code == code).first()
+    if not stock:
+        return False
+    return await process_stock_valuation(db, stock)
+
+async def _process_dividends(db: Session, code: str) -> bool:
+    from app.scripts.collect_dividend import process_stock_dividend
+    return await process_stock_dividend(db, code)
+
+async def _rebuild_series(db: Session, code: str) -> bool:
+    from app.services.chart_service import ChartService
+    ChartService(db).rebuild(code)
+    return True
+
+async def _list_export_datasets(db: Session) -> List[str]:
+    from app.services.chart_service import SERIES_DATASETS
+    return list(SERIES_DATASETS)
+
+async def _export_features(db: Session, dataset: str) -> bool:
+    from app.export.features import export_panel
+    export_panel(db, dataset)
+    return True
+
+@derived_task("financial_validity")
+def _backfill_financial_validity(db: Session) -> None:
+    # 采集时按股票维护；这里为升级前已入库的财务指标补算
+    from app.utils.point_in_time import backfill_financial_validity
+    backfill_financial_validity(db)
+
+async def _list_derived_tasks(db: Session) -> List[str]:
+    return list(DERIVED_TASKS)
+
+async def _process_derived_task(db: Session, name: str) -> bool:
+    result = DERIVED_TASKS[name](db)
+    if inspect.isawaitable(result):
+        await result
+    return True
+
+register_job(Job("stock_list", "股票列表与基本信息", _list_stock_universe, _process_stock_basic))
+register_job(Job("financials", "历史财务指标", _all_stock_codes, _process_financials, depends_on=["stock_list"]))
+register_job(Job("valuations", "月度估值指标", _all_stock_codes, _process_valuations, depends_on=["stock_list"]))
+register_job(Job("dividends", "历史分红与年度统计", _all_stock_codes, _process_dividends, depends_on=["stock_list"]))
+register_job(Job(
+    "derived", "派生指标", _list_derived_tasks, _process_derived_task, depends_on=["financials", "valuations"]
+))
+register_job(Job(
+    "series", "图表序列缓存", _all_stock_codes, _rebuild_series, depends_on=["financials", "valuations"]
+))
+register_job(Job(
+    "export", "特征矩阵导出", _list_export_datasets, _export_features, depends_on=["financials", "valuations"]
+))
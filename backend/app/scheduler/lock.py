@@ -0,0 +1,59 @@
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.job import JobLock
+
+def lock_owner() -> str:
+    """生成当前进程的锁持有者标识"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+def acquire_lock(db: Session, name: str, owner: str, ttl: int) -> bool:
+    """
+    获取任务锁
+
+    锁记录在 job_locks 表中并带有过期时间，持有者崩溃后锁会在 ttl 秒后自动失效。
+
+    Args:
+        db: 数据库会话
+        name: 锁名称
+        owner: 持有者标识
+        ttl: 锁有效期（秒）
+
+    Returns:
+        bool: 是否获取成功
+    """
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=ttl)
+    updated = db.query(JobLock).filter(
+        JobLock.name == name,
+        or_(JobLock.expires_at < now, JobLock.owner == owner)
+    ).update({"owner": owner, "expires_at": expires_at, "updated_at": now}, synchronize_session=False)
+    if updated:
+        db.commit()
+        return True
+    try:
+        db.add(JobLock(name=name, owner=owner, expires_at=expires_at))
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()
+        return False
+
+def refresh_lock(db: Session, name: str, owner: str, ttl: int) -> bool:
+    """延长锁的有效期，锁已被他人接管时返回 False"""
+    now = datetime.utcnow()
+    updated = db.query(JobLock).filter(
+        JobLock.name == name,
+        JobLock.owner == owner
+    ).update({"expires_at": now + timedelta(seconds=ttl), "updated_at": now}, synchronize_session=False)
+    db.commit()
+    return bool(updated)
+
+def release_lock(db: Session, name: str, owner: str) -> None:
+    """释放锁"""
+    db.query(JobLock).filter(JobLock.name == name, JobLock.owner == owner).delete(synchronize_session=False)
+    db.commit()
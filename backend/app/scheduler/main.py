@@ -0,0 +1,155 @@
+"""
+定时采集入口
+
+用法（在 backend 目录下执行）:
+    python -m app.scheduler.main serve                     # 按 COLLECTION_CRON 定时运行完整采集流程
+    python -m app.scheduler.main run                       # 立即运行完整采集流程
+    python -m app.scheduler.main run valuations            # 只运行估值采集（及其依赖）
+    python -m app.scheduler.main run valuations --no-deps  # 只运行估值采集
+    python -m app.scheduler.main run --workers 8           # 按代码哈希分 8 个进程并行采集
+    python -m app.scheduler.main worker valuations         # 在其他节点加入正在进行的估值采集
+    python -m app.scheduler.main status                    # 查看各任务最近一次运行
+    python -m app.scheduler.main refresh                   # 立即刷新全部数据集（各数据集并行，共用限速）
+    python -m app.scheduler.main refresh valuations dividends --codes 600000,000001
+    python -m app.scheduler.main refresh financials --industry 银行 --stale 30
+    python -m app.scheduler.main refresh --stale 7 --dry-run   # 只估算上游调用次数和耗时
+"""
+import argparse
+import asyncio
+import logging
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.job import CollectionRun, CollectionCheckpoint
+from app.scheduler.jobs import JOBS
+from app.scheduler.runner import run_pipeline
+from app.scheduler.refresh import REFRESH_DATASETS, plan_refresh, estimate_refresh, run_refresh
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def serve() -> None:
+    """按配置的 crontab 定时运行完整采集流程"""
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+    from apscheduler.triggers.cron import CronTrigger
+
+    scheduler = AsyncIOScheduler()
+    scheduler.add_job(
+        run_pipeline,
+        CronTrigger.from_crontab(settings.COLLECTION_CRON),
+        id="collection_pipeline",
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.start()
+    logger.info(f"定时采集已启动: {settings.COLLECTION_CRON}")
+    try:
+        asyncio.get_event_loop().run_forever()
+    except (KeyboardInterrupt, SystemExit):
+        scheduler.shutdown()
+
+def join_run(job_name: str) -> None:
+    """作为工作进程加入正在运行的任务"""
+    from app.scheduler.workers import find_running_run, worker_loop
+
+    db = SessionLocal()
+    try:
+        run = find_running_run(db, job_name)
+    finally:
+        db.close()
+    if not run:
+        logger.warning(f"任务 {job_name} 当前没有正在进行的运行")
+        return
+    stats = asyncio.run(worker_loop(job_name, run.id))
+    logger.info(f"{job_name}: {stats}")
+
+def print_status() -> None:
+    """打印各任务最近一次运行的进度"""
+    db = SessionLocal()
+    try:
+        for name in JOBS:
+            run = db.query(CollectionRun).filter(
+                CollectionRun.job_name == name
+            ).order_by(CollectionRun.id.desc()).first()
+            if not run:
+                print(f"{name}: 尚未运行")
+                continue
+            counts = {}
+            for status, in db.query(CollectionCheckpoint.status).filter(CollectionCheckpoint.run_id == run.id):
+                counts[status] = counts.get(status, 0) + 1
+            print(f"{name}: #{run.id} {run.status} 开始于 {run.started_at} 共 {run.total} 个条目 {counts}")
+    finally:
+        db.close()
+
+def refresh_datasets(args: argparse.Namespace) -> None:
+    """刷新指定数据集，dry-run 时只打印计划和估算"""
+    datasets = args.datasets or list(REFRESH_DATASETS)
+    codes = [code.strip() for code in args.codes.split(",") if code.strip()] if args.codes else None
+    rate = settings.COLLECTOR_RATE_LIMIT if args.rate is None else args.rate
+    concurrency = args.concurrency or settings.COLLECTOR_CONCURRENCY
+    if args.dry_run:
+        db = SessionLocal()
+        try:
+            plan = plan_refresh(db, datasets, codes, args.industry, args.stale)
+        finally:
+            db.close()
+        sync_list = "stock_list" in plan and not codes and not args.industry
+        estimate = estimate_refresh(plan, sync_list, rate, concurrency)
+        for name, item in estimate["datasets"].items():
+            print(f"{name}: {item['stocks']} 只股票，{item['calls']} 次上游调用")
+        if sync_list:
+            print("stock_list: 同步股票列表后新增的股票不在估算范围内")
+        print(f"合计 {estimate['calls']} 次上游调用，预计耗时 {estimate['seconds']} 秒"
+              f"（限速 {rate}/秒，并发 {concurrency}）")
+        return
+    result = run_refresh(
+        datasets, concurrency=concurrency, codes=codes, industry=args.industry, stale_days=args.stale, rate=rate
+    )
+    for name, stats in result["datasets"].items():
+        logger.info(f"{name}: {stats}")
+    logger.info(f"上游调用 {result['calls']}，耗时 {result['seconds']} 秒")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="定时采集任务")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("serve", help="按 COLLECTION_CRON 定时运行")
+    run_parser = subparsers.add_parser("run", help="立即运行")
+    run_parser.add_argument("jobs", nargs="*", help=f"任务名称（{', '.join(JOBS)}），默认全部")
+    run_parser.add_argument("--no-deps", action="store_true", help="不自动运行依赖任务")
+    run_parser.add_argument("--restart", action="store_true", help="忽略上次未完成的运行，重新开始")
+    run_parser.add_argument("--workers", type=int, help="工作进程数，默认取 COLLECTION_WORKERS")
+    worker_parser = subparsers.add_parser("worker", help="加入正在进行的运行")
+    worker_parser.add_argument("job", choices=list(JOBS), help="任务名称")
+    subparsers.add_parser("status", help="查看任务进度")
+    refresh_parser = subparsers.add_parser("refresh", help="立即刷新指定数据集，不记录检查点")
+    refresh_parser.add_argument(
+        "datasets", nargs="*", help=f"数据集（{', '.join(REFRESH_DATASETS)}），默认全部"
+    )
+    target = refresh_parser.add_mutually_exclusive_group()
+    target.add_argument("--codes", help="股票代码，逗号分隔")
+    target.add_argument("--industry", help="只刷新该行业的股票")
+    refresh_parser.add_argument("--stale", type=int, metavar="DAYS", help="只刷新超过 DAYS 天未更新的股票")
+    refresh_parser.add_argument("--rate", type=float, help="每秒最多上游调用次数，默认取 COLLECTOR_RATE_LIMIT")
+    refresh_parser.add_argument("--concurrency", type=int, help="同时处理的股票数，默认取 COLLECTOR_CONCURRENCY")
+    refresh_parser.add_argument("--dry-run", action="store_true", help="只估算上游调用次数和耗时")
+    args = parser.parse_args()
+    # nargs="*" 的位置参数与 choices 同时使用时，不传参数也会报错，这里单独校验
+    names, known = {"run": ("jobs", JOBS), "refresh": ("datasets", REFRESH_DATASETS)}.get(args.command, (None, {}))
+    unknown = [name for name in getattr(args, names, None) or [] if name not in known] if names else []
+    if unknown:
+        parser.error(f"未知的名称: {', '.join(unknown)}")
+
+    if args.command == "serve":
+        serve()
+    elif args.command == "run":
+        results = asyncio.run(run_pipeline(args.jobs or None, not args.no_deps, not args.restart, args.workers))
+        for name, status in results.items():
+            logger.info(f"{name}: {status}")
+    elif args.command == "worker":
+        join_run(args.job)
+    elif args.command == "refresh":
+        refresh_datasets(args)
+    else:
+        print_status()
+
+if __name__ == "__main__":
+    main()
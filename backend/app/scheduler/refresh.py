@@ -0,0 +1,277 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.job import DatasetRefresh
+from app.models.stock import Stock
+from app.scheduler.jobs import JOBS
+
+logger = logging.getLogger(__name__)
+
+# 可刷新的数据集（与采集任务同名），每只股票各需要一次上游调用
+REFRESH_DATASETS = ("stock_list", "financials", "valuations", "dividends")
+
+def target_codes(db: Session, codes: Optional[Iterable[str]] = None, industry: Optional[str] = None) -> List[str]:
+    """
+    确定刷新范围内的股票
+
+    Args:
+        db: 数据库会话
+        codes: 指定的股票代码（可选，按原样使用，不要求已入库）
+        industry: 行业（可选）
+
+    Returns:
+        List[str]: 股票代码，默认为全部已入库的股票
+    """
+    if codes:
+        return list(dict.fromkeys(codes))
+    query = db.query(Stock.code)
+    if industry:
+        query = query.filter(Stock.industry == industry)
+    return [code for (code,) in query.order_by(Stock.code).all()]
+
+def mark_refreshed(db: Session, dataset: str, stock_codes: List[str]) -> None:
+    """
+    记录股票的数据集刚刚采集成功，由调用方提交
+
+    数据行使用插入时跳过已有记录的方式写入，没有新数据时行的 updated_at 不变，
+    因此过期判断使用单独记录的采集时间。
+
+    Args:
+        db: 数据库会话
+        dataset: 数据集名称
+        stock_codes: 股票代码
+    """
+    import pandas as pd
+    from app.utils.bulk import bulk_upsert
+
+    frame = pd.DataFrame({"dataset": dataset, "stock_code": stock_codes, "refreshed_at": datetime.utcnow()})
+    bulk_upsert(db, DatasetRefresh, frame, index_elements=("dataset", "stock_code"), update_columns=["refreshed_at"])
+
+def stale_codes(db: Session, dataset: str, stock_codes: List[str], days: int) -> List[str]:
+    """
+    筛选数据过期的股票
+
+    按该股票的数据集最近一次采集成功的时间判断（没有记录的视为过期）；股票列表另外把缺少行业的股票视为过期。
+
+    Args:
+        db: 数据库会话
+        dataset: 数据集名称
+        stock_codes: 候选股票代码
+        days: 过期天数
+
+    Returns:
+        List[str]: 过期的股票代码，保持原有顺序
+    """
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    fresh = db.query(DatasetRefresh.stock_code).filter(
+        DatasetRefresh.dataset == dataset, DatasetRefresh.refreshed_at >= cutoff
+    )
+    if dataset == "stock_list":
+        fresh = fresh.join(Stock, Stock.code == DatasetRefresh.stock_code).filter(Stock.industry.isnot(None))
+    fresh_codes = {code for (code,) in fresh.all()}
+    return [code for code in stock_codes if code not in fresh_codes]
+
+def plan_refresh(
+    db: Session,
+    datasets: Iterable[str],
+    codes: Optional[Iterable[str]] = None,
+    industry: Optional[str] = None,
+    stale_days: Optional[int] = None,
+) -> Dict[str, List[str]]:
+    """
+    计算每个数据集需要刷新的股票
+
+    Args:
+        db: 数据库会话
+        datasets: 数据集名称
+        codes: 指定的股票代码（可选）
+        industry: 行业（可选）
+        stale_days: 只刷新超过该天数未更新的股票（可选）
+
+    Returns:
+        Dict[str, List[str]]: 数据集 -> 股票代码，按 REFRESH_DATASETS 的顺序
+    """
+    selected = set(datasets)
+    unknown = selected - set(REFRESH_DATASETS)
+    if unknown:
+        raise ValueError(f"未知的数据集: {', '.join(sorted(unknown))}")
+    universe = target_codes(db, codes, industry)
+    plan = {}
+    for name in REFRESH_DATASETS:
+        if name in selected:
+            plan[name] = stale_codes(db, name, universe, stale_days) if stale_days is not None else universe
+    return plan
+
+def estimate_refresh(
+    plan: Dict[str, List[str]],
+    sync_list: bool,
+    rate: float,
+    concurrency: int,
+    call_seconds: float = None,
+) -> Dict[str, Any]:
+    """
+    估算刷新所需的上游调用次数和耗时
+
+    所有数据集共用限速和并发上限，耗时取“总调用数 / 速率”与“总调用数 × 单次耗时 / 并发数”中较大者。
+
+    Args:
+        plan: plan_refresh 的结果
+        sync_list: 是否先同步完整股票列表（额外一次调用）
+        rate: 每秒最多调用次数，0 表示不限速
+        concurrency: 同时处理的股票数
+        call_seconds: 单次上游调用的预估耗时（秒）
+
+    Returns:
+        Dict[str, Any]: 各数据集的股票数和调用数、总调用数与预估耗时（秒）
+    """
+    call_seconds = settings.COLLECTOR_CALL_SECONDS if call_seconds is None else call_seconds
+    datasets = {name: {"stocks": len(codes), "calls": len(codes)} for name, codes in plan.items()}
+    if sync_list and "stock_list" in datasets:
+        datasets["stock_list"]["calls"] += 1
+    calls = sum(item["calls"] for item in datasets.values())
+    seconds = calls * call_seconds / max(concurrency, 1)
+    if rate > 0:
+        seconds = max(seconds, calls / rate)
+    return {"datasets": datasets, "calls": calls, "seconds": round(seconds, 1)}
+
+async def refresh_dataset(
+    name: str,
+    stock_codes: List[str],
+    semaphore: asyncio.Semaphore,
+    concurrency: int,
+) -> Dict[str, int]:
+    """
+    刷新单个数据集
+
+    每只股票在取得共享信号量后使用独立的数据库会话处理，同时占用的连接数不超过信号量上限。
+
+    Args:
+        name: 数据集名称
+        stock_codes: 股票代码
+        semaphore: 各数据集共享的并发上限
+        concurrency: 信号量的上限，即本数据集最多同时处理的股票数
+
+    Returns:
+        Dict[str, int]: 成功、失败的股票数
+    """
+    job = JOBS[name]
+    stats = {"done": 0, "failed": 0}
+    pending = iter(stock_codes)
+
+    async def worker():
+        for code in pending:
+            async with semaphore:
+                db = SessionLocal()
+                try:
+                    ok = await job.process_item(db, code)
+                    if ok:
+                        mark_refreshed(db, name, [code])
+                        db.commit()
+                except Exception as e:
+                    logger.error(f"刷新股票 {code} 的 {name} 时出错: {str(e)}")
+                    db.rollback()
+                    ok = False
+                finally:
+                    db.close()
+            stats["done" if ok else "failed"] += 1
+
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, len(stock_codes)))))
+    logger.info(f"{name} 刷新完成: {stats}")
+    return stats
+
+async def refresh(
+    datasets: Iterable[str],
+    codes: Optional[Iterable[str]] = None,
+    industry: Optional[str] = None,
+    stale_days: Optional[int] = None,
+    rate: float = None,
+    concurrency: int = None,
+) -> Dict[str, Any]:
+    """
+    刷新指定数据集
+
+    未指定股票和行业时先同步完整股票列表；股票列表刷新完成后，其余数据集并行刷新，
+    共用同一个上游限速器和并发上限。与定时任务不同，刷新不记录检查点。
+
+    Args:
+        datasets: 数据集名称
+        codes: 指定的股票代码（可选）
+        industry: 行业（可选）
+        stale_days: 只刷新超过该天数未更新的股票（可选）
+        rate: 每秒最多上游调用次数，默认取 COLLECTOR_RATE_LIMIT
+        concurrency: 同时处理的股票数，默认取 COLLECTOR_CONCURRENCY
+
+    Returns:
+        Dict[str, Any]: 各数据集的成功、失败股票数，上游调用次数和耗时（秒）
+    """
+    from app.datasources.base import get_data_source, set_data_source
+    from app.datasources.limits import LimitedDataSource
+    from app.scripts.collect_data import sync_stock_list
+
+    datasets = [name for name in REFRESH_DATASETS if name in set(datasets)]
+    rate = settings.COLLECTOR_RATE_LIMIT if rate is None else rate
+    concurrency = concurrency or settings.COLLECTOR_CONCURRENCY
+    semaphore = asyncio.Semaphore(concurrency)
+    source = get_data_source()
+    limited = LimitedDataSource(source, rate, concurrency)
+    set_data_source(limited)
+    start = time.perf_counter()
+    results: Dict[str, Any] = {}
+    try:
+        if "stock_list" in datasets:
+            db = SessionLocal()
+            try:
+                if not codes and not industry:
+                    await sync_stock_list(db)
+                plan = plan_refresh(db, ["stock_list"], codes, industry, stale_days)
+            finally:
+                db.close()
+            results["stock_list"] = await refresh_dataset("stock_list", plan["stock_list"], semaphore, concurrency)
+
+        others = [name for name in datasets if name != "stock_list"]
+        if others:
+            # 股票列表刷新后再确定范围，新上市和行业变化的股票也包含在内
+            db = SessionLocal()
+            try:
+                plan = plan_refresh(db, others, codes, industry, stale_days)
+            finally:
+                db.close()
+            stats = await asyncio.gather(*(refresh_dataset(name, plan[name], semaphore, concurrency) for name in others))
+            results.update(zip(others, stats))
+    finally:
+        set_data_source(source)
+
+    return {
+        "datasets": results,
+        "calls": dict(limited.calls),
+        "seconds": round(time.perf_counter() - start, 1),
+    }
+
+def run_refresh(datasets: Iterable[str], concurrency: int = None, **kwargs) -> Dict[str, Any]:
+    """
+    在新的事件循环中运行 refresh
+
+    线程池大小与并发上限一致，上游调用不会因默认线程池过小而排队。
+
+    Args:
+        datasets: 数据集名称
+        concurrency: 同时处理的股票数，默认取 COLLECTOR_CONCURRENCY
+        **kwargs: 传给 refresh 的其他参数
+
+    Returns:
+        Dict[str, Any]: refresh 的结果
+    """
+    concurrency = concurrency or settings.COLLECTOR_CONCURRENCY
+
+    async def main():
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="refresh") as executor:
+            asyncio.get_running_loop().set_default_executor(executor)
+            return await refresh(datasets, concurrency=concurrency, **kwargs)
+
+    return asyncio.run(main())
@@ -0,0 +1,196 @@
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+from sqlalchemy import insert, or_, and_
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.job import CollectionRun, CollectionCheckpoint
+from app.scheduler.jobs import JOBS, Job, resolve_order
+from app.scheduler.lock import lock_owner, acquire_lock, refresh_lock, release_lock
+from app.scheduler.refresh import REFRESH_DATASETS, mark_refreshed
+
+logger = logging.getLogger(__name__)
+
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+LOCKED = "locked"
+SKIPPED = "skipped"
+
+PENDING = "pending"
+DONE = "done"
+
+def find_resumable_run(db: Session, job_name: str) -> Optional[CollectionRun]:
+    """查找最近一次未完成（中断或失败）的运行"""
+    return db.query(CollectionRun).filter(
+        CollectionRun.job_name == job_name,
+        CollectionRun.status.in_([RUNNING, FAILED])
+    ).order_by(CollectionRun.id.desc()).first()
+
+async def create_run(db: Session, job: Job) -> CollectionRun:
+    """创建新的运行记录，并为每个条目写入待处理检查点"""
+    items = await job.list_items(db)
+    now = datetime.utcnow()
+    run = CollectionRun(job_name=job.name, status=RUNNING, started_at=now, total=len(items))
+    db.add(run)
+    db.flush()
+    if items:
+        db.execute(insert(CollectionCheckpoint), [
+            {
+                "run_id": run.id,
+                "item": item,
+                "status": PENDING,
+                "attempts": 0,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for item in items
+        ])
+    db.commit()
+    return run
+
+async def start_run(db: Session, job: Job, resume: bool = True) -> CollectionRun:
+    """继续上次未完成的运行，没有时创建新的运行"""
+    run = find_resumable_run(db, job.name) if resume else None
+    if run:
+        logger.info(f"任务 {job.name} 从运行 #{run.id} 的检查点继续")
+        run.status = RUNNING
+        run.error = None
+        db.commit()
+    else:
+        run = await create_run(db, job)
+        logger.info(f"任务 {job.name} 开始运行 #{run.id}，共 {run.total} 个条目")
+    return run
+
+def remaining_checkpoints(db: Session, run: CollectionRun, max_attempts: int):
+    """本次运行中仍需处理的检查点：待处理的，以及失败次数未达上限的"""
+    return db.query(CollectionCheckpoint).filter(
+        CollectionCheckpoint.run_id == run.id,
+        or_(
+            CollectionCheckpoint.status == PENDING,
+            and_(CollectionCheckpoint.status == FAILED, CollectionCheckpoint.attempts < max_attempts)
+        )
+    ).order_by(CollectionCheckpoint.id)
+
+async def process_checkpoint(db: Session, job: Job, checkpoint: CollectionCheckpoint) -> bool:
+    """处理单个条目并更新检查点，同时释放条目租约"""
+    error = None
+    try:
+        success = await job.process_item(db, checkpoint.item)
+    except Exception as e:
+        db.rollback()
+        success = False
+        error = str(e)
+        logger.error(f"任务 {job.name} 处理 {checkpoint.item} 时出错: {error}")
+    checkpoint.attempts += 1
+    checkpoint.status = DONE if success else FAILED
+    checkpoint.error = None if success else (error or "处理失败")
+    checkpoint.lease_owner = None
+    checkpoint.lease_expires_at = None
+    if success and job.name in REFRESH_DATASETS:
+        # 定时采集同样记录刷新时间，之后按需刷新时不会重复采集
+        mark_refreshed(db, job.name, [checkpoint.item])
+    db.commit()
+    return success
+
+async def run_job(
+    job_name: str,
+    resume: bool = True,
+    max_attempts: int = None,
+    lock_ttl: int = None,
+) -> str:
+    """
+    运行单个采集任务
+
+    同一任务同时只能有一个实例运行；上次运行中断时从检查点继续，
+    已完成的条目不再重复处理。失败的条目在本次运行中重试，最多尝试 max_attempts 次。
+
+    Args:
+        job_name: 任务名称
+        resume: 是否从上次未完成的运行继续
+        max_attempts: 单个条目的最大尝试次数
+        lock_ttl: 任务锁有效期（秒），运行中会持续续期
+
+    Returns:
+        str: 运行结果 completed/failed/locked
+    """
+    job = JOBS[job_name]
+    max_attempts = max_attempts or settings.JOB_MAX_ATTEMPTS
+    lock_ttl = lock_ttl or settings.JOB_LOCK_TTL
+    owner = lock_owner()
+    run = None
+    db = SessionLocal()
+    try:
+        if not acquire_lock(db, job.name, owner, lock_ttl):
+            logger.warning(f"任务 {job.name} 正在其他进程中运行，跳过")
+            return LOCKED
+        try:
+            run = await start_run(db, job, resume)
+            checkpoints = remaining_checkpoints(db, run, max_attempts).all()
+            logger.info(f"任务 {job.name} 待处理 {len(checkpoints)} 个条目")
+            last_refresh = time.monotonic()
+            failed = 0
+            # 失败的条目在本次运行中重试，直到成功或达到最大尝试次数
+            while checkpoints:
+                for checkpoint in checkpoints:
+                    if not await process_checkpoint(db, job, checkpoint):
+                        failed += 1
+                    if time.monotonic() - last_refresh > lock_ttl / 3:
+                        if not refresh_lock(db, job.name, owner, lock_ttl):
+                            raise RuntimeError(f"任务 {job.name} 的锁已被其他进程接管")
+                        last_refresh = time.monotonic()
+                checkpoints = remaining_checkpoints(db, run, max_attempts).all()
+
+            run.status = COMPLETED
+            run.finished_at = datetime.utcnow()
+            db.commit()
+            logger.info(f"任务 {job.name} 运行 #{run.id} 完成，本次失败 {failed} 次")
+            return COMPLETED
+        except Exception as e:
+            db.rollback()
+            if run is not None:
+                run.status = FAILED
+                run.error = str(e)
+                db.commit()
+            logger.error(f"任务 {job.name} 运行失败: {str(e)}")
+            return FAILED
+        finally:
+            release_lock(db, job.name, owner)
+    finally:
+        db.close()
+
+async def run_pipeline(
+    job_names: Optional[Iterable[str]] = None,
+    with_dependencies: bool = True,
+    resume: bool = True,
+    workers: int = None,
+) -> Dict[str, str]:
+    """
+    按依赖顺序运行多个任务，依赖任务未成功时跳过后续任务
+
+    Args:
+        job_names: 任务名称，默认运行全部任务
+        with_dependencies: 是否自动加入依赖任务
+        resume: 是否从上次未完成的运行继续
+        workers: 工作进程数，大于 1 时分片并行运行，默认取 COLLECTION_WORKERS
+
+    Returns:
+        Dict[str, str]: 任务名称 -> 运行结果
+    """
+    workers = workers or settings.COLLECTION_WORKERS
+    order = resolve_order(job_names or list(JOBS), with_dependencies)
+    results: Dict[str, str] = {}
+    for name in order:
+        blocked = [dep for dep in JOBS[name].depends_on if dep in results and results[dep] != COMPLETED]
+        if blocked:
+            logger.warning(f"任务 {name} 的依赖 {', '.join(blocked)} 未完成，跳过")
+            results[name] = SKIPPED
+            continue
+        if workers > 1:
+            from app.scheduler.workers import run_sharded
+            results[name] = await run_sharded(name, workers, resume=resume)
+        else:
+            results[name] = await run_job(name, resume=resume)
+    return results
@@ -0,0 +1,253 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import or_, and_, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.job import CollectionRun, CollectionCheckpoint
+from app.scheduler.jobs import JOBS
+from app.scheduler.lock import lock_owner, acquire_lock, refresh_lock, release_lock
+from app.scheduler.runner import (
+    start_run, process_checkpoint, RUNNING, COMPLETED, FAILED, LOCKED, PENDING
+)
+
+logger = logging.getLogger(__name__)
+
+def shard_of(item: str, n_shards: int) -> int:
+    """按代码哈希计算分片编号，结果与进程无关（不使用 Python 内置 hash）"""
+    return zlib.crc32(item.encode()) % n_shards
+
+def assign_shards(db: Session, run: CollectionRun, n_shards: int) -> None:
+    """按分片数重新计算本次运行中各条目的分片"""
+    rows = db.query(CollectionCheckpoint.id, CollectionCheckpoint.item).filter(
+        CollectionCheckpoint.run_id == run.id
+    ).all()
+    if rows:
+        db.execute(update(CollectionCheckpoint), [
+            {"id": checkpoint_id, "shard": shard_of(item, n_shards)} for checkpoint_id, item in rows
+        ])
+    db.commit()
+
+def _remaining(run_id: int, max_attempts: int):
+    return and_(
+        CollectionCheckpoint.run_id == run_id,
+        or_(
+            CollectionCheckpoint.status == PENDING,
+            and_(CollectionCheckpoint.status == FAILED, CollectionCheckpoint.attempts < max_attempts)
+        )
+    )
+
+def _claimable(run_id: int, max_attempts: int, now: datetime):
+    return and_(
+        _remaining(run_id, max_attempts),
+        or_(CollectionCheckpoint.lease_expires_at.is_(None), CollectionCheckpoint.lease_expires_at < now)
+    )
+
+def claim_batch(
+    db: Session,
+    run_id: int,
+    owner: str,
+    shard: Optional[int],
+    batch_size: int,
+    lease_ttl: int,
+    max_attempts: int,
+) -> List[CollectionCheckpoint]:
+    """
+    从工作队列领取一批条目并写入租约
+
+    领取通过带条件的 UPDATE 完成，多个进程同时领取时每个条目只会被一个进程拿到；
+    PostgreSQL 上额外使用 SKIP LOCKED 减少进程之间的锁等待。
+
+    Args:
+        db: 数据库会话
+        run_id: 运行编号
+        owner: 租约持有者
+        shard: 分片编号，None 表示不限分片
+        batch_size: 领取数量
+        lease_ttl: 租约有效期（秒）
+        max_attempts: 单个条目的最大尝试次数
+
+    Returns:
+        List[CollectionCheckpoint]: 领取到的条目
+    """
+    now = datetime.utcnow()
+    query = db.query(CollectionCheckpoint.id).filter(_claimable(run_id, max_attempts, now))
+    if shard is not None:
+        query = query.filter(CollectionCheckpoint.shard == shard)
+    if db.get_bind().dialect.name == "postgresql":
+        query = query.with_for_update(skip_locked=True)
+    ids = [checkpoint_id for (checkpoint_id,) in query.order_by(CollectionCheckpoint.id).limit(batch_size)]
+    if not ids:
+        db.commit()
+        return []
+    db.query(CollectionCheckpoint).filter(
+        CollectionCheckpoint.id.in_(ids),
+        _claimable(run_id, max_attempts, now)
+    ).update({
+        "lease_owner": owner,
+        "lease_expires_at": now + timedelta(seconds=lease_ttl),
+    }, synchronize_session=False)
+    db.commit()
+    return db.query(CollectionCheckpoint).filter(
+        CollectionCheckpoint.id.in_(ids),
+        CollectionCheckpoint.lease_owner == owner
+    ).order_by(CollectionCheckpoint.id).all()
+
+def renew_leases(db: Session, ids: List[int], owner: str, lease_ttl: int) -> None:
+    """延长自己持有的条目租约"""
+    if not ids:
+        return
+    db.query(CollectionCheckpoint).filter(
+        CollectionCheckpoint.id.in_(ids),
+        CollectionCheckpoint.lease_owner == owner
+    ).update({
+        "lease_expires_at": datetime.utcnow() + timedelta(seconds=lease_ttl),
+    }, synchronize_session=False)
+    db.commit()
+
+def has_remaining(db: Session, run_id: int, max_attempts: int) -> bool:
+    """本次运行是否还有未完成的条目（包括其他进程正在处理的）"""
+    return db.query(CollectionCheckpoint.id).filter(_remaining(run_id, max_attempts)).first() is not None
+
+async def worker_loop(
+    job_name: str,
+    run_id: int,
+    shard: Optional[int] = None,
+    owner: Optional[str] = None,
+    batch_size: int = None,
+    lease_ttl: int = None,
+    max_attempts: int = None,
+    poll_interval: float = 1.0,
+) -> Dict[str, int]:
+    """
+    工作进程主循环：领取条目、处理、更新检查点，直到运行中没有剩余条目
+
+    优先处理本分片的条目，本分片处理完后领取其他分片剩余的条目；
+    其他进程持有的租约过期（进程崩溃）后，条目会被重新领取。
+
+    Args:
+        job_name: 任务名称
+        run_id: 运行编号
+        shard: 优先处理的分片编号，None 表示不区分分片
+        owner: 租约持有者，默认自动生成
+        batch_size: 每次领取的条目数
+        lease_ttl: 租约有效期（秒）
+        max_attempts: 单个条目的最大尝试次数
+        poll_interval: 剩余条目都被其他进程持有时的等待间隔（秒）
+
+    Returns:
+        Dict[str, int]: 本进程成功和失败的条目数
+    """
+    job = JOBS[job_name]
+    owner = owner or lock_owner()
+    batch_size = batch_size or settings.WORKER_BATCH_SIZE
+    lease_ttl = lease_ttl or settings.WORKER_LEASE_TTL
+    max_attempts = max_attempts or settings.JOB_MAX_ATTEMPTS
+    stats = {"done": 0, "failed": 0}
+    db = SessionLocal()
+    try:
+        while True:
+            batch = claim_batch(db, run_id, owner, shard, batch_size, lease_ttl, max_attempts)
+            if not batch and shard is not None:
+                batch = claim_batch(db, run_id, owner, None, batch_size, lease_ttl, max_attempts)
+            if not batch:
+                if not has_remaining(db, run_id, max_attempts):
+                    break
+                await asyncio.sleep(poll_interval)
+                continue
+
+            last_renew = time.monotonic()
+            for index, checkpoint in enumerate(batch):
+                if await process_checkpoint(db, job, checkpoint):
+                    stats["done"] += 1
+                else:
+                    stats["failed"] += 1
+                if time.monotonic() - last_renew > lease_ttl / 3:
+                    renew_leases(db, [item.id for item in batch[index + 1:]], owner, lease_ttl)
+                    last_renew = time.monotonic()
+        logger.info(f"工作进程 {owner} 完成任务 {job_name} 运行 #{run_id}: {stats}")
+        return stats
+    finally:
+        db.close()
+
+def _worker_process(job_name: str, run_id: int, shard: int) -> Dict[str, int]:
+    """子进程入口"""
+    logging.basicConfig(level=logging.INFO)
+    return asyncio.run(worker_loop(job_name, run_id, shard))
+
+async def run_sharded(job_name: str, workers: int, resume: bool = True, lock_ttl: int = None) -> str:
+    """
+    分片并行运行采集任务
+
+    协调进程持有任务锁并创建（或继续）运行，按代码哈希把条目分成 workers 个分片，
+    再启动同样数量的工作进程。其他节点可以通过 `python -m app.scheduler.main worker`
+    加入同一次运行，共享数据库中的工作队列。
+
+    Args:
+        job_name: 任务名称
+        workers: 工作进程数
+        resume: 是否从上次未完成的运行继续
+        lock_ttl: 任务锁有效期（秒）
+
+    Returns:
+        str: 运行结果 completed/failed/locked
+    """
+    job = JOBS[job_name]
+    lock_ttl = lock_ttl or settings.JOB_LOCK_TTL
+    owner = lock_owner()
+    run = None
+    db = SessionLocal()
+    try:
+        if not acquire_lock(db, job.name, owner, lock_ttl):
+            logger.warning(f"任务 {job.name} 正在其他进程中运行，跳过")
+            return LOCKED
+        try:
+            run = await start_run(db, job, resume)
+            assign_shards(db, run, workers)
+            logger.info(f"任务 {job.name} 运行 #{run.id} 分为 {workers} 个分片并行处理")
+
+            loop = asyncio.get_running_loop()
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                futures = [
+                    loop.run_in_executor(pool, _worker_process, job.name, run.id, shard)
+                    for shard in range(workers)
+                ]
+                pending = set(futures)
+                while pending:
+                    _, pending = await asyncio.wait(pending, timeout=lock_ttl / 3)
+                    if not refresh_lock(db, job.name, owner, lock_ttl):
+                        raise RuntimeError(f"任务 {job.name} 的锁已被其他进程接管")
+                stats = [future.result() for future in futures]
+
+            run.status = COMPLETED
+            run.finished_at = datetime.utcnow()
+            db.commit()
+            failed = sum(item["failed"] for item in stats)
+            logger.info(f"任务 {job.name} 运行 #{run.id} 完成，本次失败 {failed} 个条目")
+            return COMPLETED
+        except Exception as e:
+            db.rollback()
+            if run is not None:
+                run.status = FAILED
+                run.error = str(e)
+                db.commit()
+            logger.error(f"任务 {job.name} 运行失败: {str(e)}")
+            return FAILED
+        finally:
+            release_lock(db, job.name, owner)
+    finally:
+        db.close()
+
+def find_running_run(db: Session, job_name: str) -> Optional[CollectionRun]:
+    """查找正在运行的运行记录，供其他节点的工作进程加入"""
+    return db.query(CollectionRun).filter(
+        CollectionRun.job_name == job_name,
+        CollectionRun.status == RUNNING
+    ).order_by(CollectionRun.id.desc()).first()
@@ -1,8 +1,8 @@
 import asyncio
 import logging
-import akshare as ak
 from datetime import datetime
 import json
+from app.datasources.base import get_data_source
 from app.utils.data_converter import convert_financial_data
 
 logging.basicConfig(level=logging.INFO)
@@ -11,7 +11,7 @@ logger = logging.getLogger(__name__)
 async def get_financial_indicators(stock_code: str) -> list:
     """获取财务指标历史数据"""
     loop = asyncio.get_event_loop()
-    df = await loop.run_in_executor(None, ak.stock_financial_abstract_ths, stock_code, "按报告期")
+    df = await loop.run_in_executor(None, get_data_source().stock_financial_abstract_ths, stock_code, "按报告期")
     if not df.empty:
         return df.to_dict(orient="records")
     return []
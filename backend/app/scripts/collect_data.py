@@ -1,30 +1,49 @@
 import asyncio
 import logging
-import akshare as ak
 from datetime import datetime
 from sqlalchemy.orm import Session
 from app.db.session import SessionLocal
+import app.db.base  # noqa: F401  注册全部模型
+from app.datasources.base import get_data_source
 from app.models.stock import Stock
-from app.models.financial import FinancialIndicator
-from app.utils.data_converter import convert_financial_data
-from typing import List, Dict, Any, Union
+from app.models.financial import FinancialIndicator, FinancialValidity
+from app.utils.bulk import bulk_upsert
+from app.cache.bus import publish_invalidation
+from app.utils.validation import split_financials, replace_quarantine
+from app.utils.point_in_time import refresh_financial_validity
+from typing import List, Dict, Any, Optional, Union
+import pandas as pd
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-async def get_stock_list() -> list:
-    """获取 A 股列表"""
+async def get_stock_list() -> pd.DataFrame:
+    """获取 A 股列表，返回 code/name/market 三列"""
     loop = asyncio.get_event_loop()
-    a_stocks = await loop.run_in_executor(None, ak.stock_info_a_code_name)
-    a_stocks["market"] = "A股"
-    a_stocks = a_stocks[["code", "name", "market"]]
-    return a_stocks.to_dict(orient="records")
+    a_stocks = await loop.run_in_executor(None, get_data_source().stock_info_a_code_name)
+    return a_stocks[["code", "name"]].assign(market="A股")
+
+async def sync_stock_list(db: Session) -> List[str]:
+    """
+    获取 A 股列表并整表写入股票代码、名称和市场（已存在的股票更新名称）
+
+    Args:
+        db: 数据库会话
+
+    Returns:
+        List[str]: 股票代码列表
+    """
+    stocks = await get_stock_list()
+    bulk_upsert(db, Stock, stocks, index_elements=("code",), update_columns=("name", "market"))
+    db.commit()
+    publish_invalidation(Stock.__tablename__)
+    return stocks["code"].tolist()
 
 async def get_stock_detail(stock_code: str) -> dict:
     """获取单只股票的基本信息"""
     loop = asyncio.get_event_loop()
-    df = await loop.run_in_executor(None, ak.stock_individual_info_em, stock_code)
-    info = {row["item"]: row["value"] for _, row in df.iterrows()}
+    df = await loop.run_in_executor(None, get_data_source().stock_individual_info_em, stock_code)
+    info = dict(zip(df["item"], df["value"]))
     return {
         "code": info.get("股票代码"),
         "name": info.get("股票简称"),
@@ -33,150 +52,116 @@ async def get_stock_detail(stock_code: str) -> dict:
         "list_date": info.get("上市时间"),
     }
 
-async def get_financial_indicators(stock_code: str) -> List[Dict[str, Any]]:
-    """获取股票的历史财务指标"""
+async def get_financial_indicators(stock_code: str) -> Optional[pd.DataFrame]:
+    """获取股票的历史财务指标（数据源原始格式，由 split_financials 转换和校验）"""
     try:
-        # 获取股票信息以获取行业
-        stock_info = await get_stock_detail(stock_code)
-        industry = stock_info.get('industry', '')
-        
-        # 获取财务指标数据
-        data = ak.stock_financial_abstract_ths(symbol=stock_code)
+        loop = asyncio.get_event_loop()
+        data = await loop.run_in_executor(None, get_data_source().stock_financial_abstract_ths, stock_code)
         if data is None or data.empty:
             logger.warning(f"股票 {stock_code} 没有财务指标数据")
-            return []
-            
-        # 转换为字典列表
-        records = data.to_dict('records')
-        
-        # 转换数据格式
-        converted_records = []
-        for record in records:
-            converted_record = convert_financial_data(record)
-            converted_record['报告期'] = record['报告期']  # 保持报告期不变
-            converted_records.append(converted_record)
-            
-        return converted_records
+            return None
+        return data
     except Exception as e:
         logger.error(f"获取股票 {stock_code} 的财务指标时出错: {str(e)}")
-        return []
+        return None
+
+async def process_stock_basic(db: Session, stock_code: str) -> bool:
+    """获取单只股票的基本信息并写入数据库，返回是否成功"""
+    # 获取详细信息
+    try:
+        detail = await get_stock_detail(stock_code)
+    except Exception as e:
+        logger.error(f"获取股票 {stock_code} 的详细信息时出错: {str(e)}")
+        return False
+    if not detail or not detail["code"]:
+        logger.warning(f"无法获取股票 {stock_code} 的详细信息")
+        return False
+        
+    # 创建或更新股票记录
+    stock = db.query(Stock).filter(Stock.code == detail["code"]).first()
+    if not stock:
+        # 处理上市日期
+        listing_date = None
+        if detail["list_date"]:
+            try:
+                # 处理 YYYYMMDD 格式的日期
+                date_str = str(detail["list_date"])
+                if len(date_str) == 8:
+                    listing_date = datetime.strptime(date_str, "%Y%m%d").date()
+                else:
+                    logger.warning(f"股票 {detail['code']} 的上市日期格式不正确: {date_str}")
+            except (ValueError, TypeError) as e:
+                logger.warning(f"无法解析股票 {detail['code']} 的上市日期: {detail['list_date']}, 错误: {str(e)}")
+        
+        stock = Stock(
+            code=detail["code"],
+            name=detail["name"],
+            industry=detail["industry"],
+            market=detail["market"],
+            listing_date=listing_date
+        )
+        db.add(stock)
+        logger.info(f"添加新股票: {detail['code']} - {detail['name']} ({detail['industry']})")
+    else:
+        stock.name = detail["name"]
+        stock.industry = detail["industry"]
+        stock.market = detail["market"]
+        if detail["list_date"]:
+            try:
+                # 处理 YYYYMMDD 格式的日期
+                date_str = str(detail["list_date"])
+                if len(date_str) == 8:
+                    stock.listing_date = datetime.strptime(date_str, "%Y%m%d").date()
+                else:
+                    logger.warning(f"股票 {detail['code']} 的上市日期格式不正确: {date_str}")
+            except (ValueError, TypeError) as e:
+                logger.warning(f"无法解析股票 {detail['code']} 的上市日期: {detail['list_date']}, 错误: {str(e)}")
+        logger.info(f"更新股票信息: {detail['code']} - {detail['name']} ({detail['industry']})")
+    
+    db.commit()
+    publish_invalidation(Stock.__tablename__, [detail["code"]])
+    return True
 
 async def collect_stock_list(db: Session):
     """收集股票列表数据"""
     logger.info("开始收集股票列表...")
-    stocks = await get_stock_list()
-    logger.info(f"获取到 {len(stocks)} 只股票")
+    codes = await sync_stock_list(db)
+    logger.info(f"获取到 {len(codes)} 只股票")
     
-    for stock_data in stocks:
-        # 获取详细信息
-        detail = await get_stock_detail(stock_data["code"])
-        if not detail:
-            logger.warning(f"无法获取股票 {stock_data['code']} 的详细信息")
-            continue
-            
-        # 创建或更新股票记录
-        stock = db.query(Stock).filter(Stock.code == detail["code"]).first()
-        if not stock:
-            # 处理上市日期
-            listing_date = None
-            if detail["list_date"]:
-                try:
-                    # 处理 YYYYMMDD 格式的日期
-                    date_str = str(detail["list_date"])
-                    if len(date_str) == 8:
-                        listing_date = datetime.strptime(date_str, "%Y%m%d").date()
-                    else:
-                        logger.warning(f"股票 {detail['code']} 的上市日期格式不正确: {date_str}")
-                except (ValueError, TypeError) as e:
-                    logger.warning(f"无法解析股票 {detail['code']} 的上市日期: {detail['list_date']}, 错误: {str(e)}")
-            
-            stock = Stock(
-                code=detail["code"],
-                name=detail["name"],
-                industry=detail["industry"],
-                market=detail["market"],
-                listing_date=listing_date
-            )
-            db.add(stock)
-            logger.info(f"添加新股票: {detail['code']} - {detail['name']} ({detail['industry']})")
-        else:
-            stock.name = detail["name"]
-            stock.industry = detail["industry"]
-            stock.market = detail["market"]
-            if detail["list_date"]:
-                try:
-                    # 处理 YYYYMMDD 格式的日期
-                    date_str = str(detail["list_date"])
-                    if len(date_str) == 8:
-                        stock.listing_date = datetime.strptime(date_str, "%Y%m%d").date()
-                    else:
-                        logger.warning(f"股票 {detail['code']} 的上市日期格式不正确: {date_str}")
-                except (ValueError, TypeError) as e:
-                    logger.warning(f"无法解析股票 {detail['code']} 的上市日期: {detail['list_date']}, 错误: {str(e)}")
-            logger.info(f"更新股票信息: {detail['code']} - {detail['name']} ({detail['industry']})")
+    for code in codes:
+        await process_stock_basic(db, code)
     
-    db.commit()
-    logger.info(f"股票列表收集完成，共 {len(stocks)} 条记录")
+    logger.info(f"股票列表收集完成，共 {len(codes)} 条记录")
+
+async def process_stock_financial_indicators(db: Session, stock: Stock) -> bool:
+    """
+    获取指定股票的财务指标并写入数据库，返回是否成功
 
-async def process_stock_financial_indicators(db: Session, stock: Stock) -> None:
-    """获取指定股票的财务指标并添加到数据库"""
+    通过校验的记录批量写入，未通过的记录写入隔离表，个别异常单元格不会导致整只股票写入失败。
+    """
     try:
-        indicators_list = await get_financial_indicators(stock.code)
-        if not indicators_list:
+        data = await get_financial_indicators(stock.code)
+        if data is None:
             logger.warning(f"无法获取股票 {stock.code} - {stock.name} 的财务指标")
-            return
-        logger.info(f"获取到股票 {stock.code} - {stock.name} 的 {len(indicators_list)} 期财务指标")
-        for indicators in indicators_list:
-            converted_data = convert_financial_data(indicators)
-            report_date_str = converted_data.get('报告期')
-            if not report_date_str:
-                logger.warning(f"股票 {stock.code} - {stock.name} 某期财务指标缺少报告期，跳过该条记录: {converted_data}")
-                continue
-            try:
-                report_date = datetime.strptime(report_date_str, "%Y-%m-%d").date()
-            except ValueError:
-                logger.warning(f"股票 {stock.code} - {stock.name} 的报告期格式不正确: {report_date_str}")
-                continue
-            financial = FinancialIndicator(
-                id=f"{stock.code}_{report_date}",
-                stock_code=stock.code,
-                report_date=report_date,
-                net_profit=converted_data.get('净利润'),
-                net_profit_growth=converted_data.get('净利润同比增长率'),
-                non_net_profit=converted_data.get('扣非净利润'),
-                non_net_profit_growth=converted_data.get('扣非净利润同比增长率'),
-                total_revenue=converted_data.get('营业总收入'),
-                total_revenue_growth=converted_data.get('营业总收入同比增长率'),
-                eps=converted_data.get('基本每股收益'),
-                bps=converted_data.get('每股净资产'),
-                capital_reserve_per_share=converted_data.get('每股资本公积金'),
-                undist_profit_per_share=converted_data.get('每股未分配利润'),
-                ocfps=converted_data.get('每股经营现金流'),
-                net_profit_margin=converted_data.get('销售净利率'),
-                gross_profit_margin=converted_data.get('销售毛利率'),
-                roe=converted_data.get('净资产收益率'),
-                roe_diluted=converted_data.get('净资产收益率-摊薄'),
-                operating_cycle=converted_data.get('营业周期'),
-                inventory_turnover=converted_data.get('存货周转率'),
-                inventory_turnover_days=converted_data.get('存货周转天数'),
-                receivable_turnover_days=converted_data.get('应收账款周转天数'),
-                current_ratio=converted_data.get('流动比率'),
-                quick_ratio=converted_data.get('速动比率'),
-                conservative_quick_ratio=converted_data.get('保守速动比率'),
-                equity_ratio=converted_data.get('产权比率'),
-                debt_ratio=converted_data.get('资产负债率')
-            )
-            existing = db.query(FinancialIndicator).filter(FinancialIndicator.id == financial.id).first()
-            if not existing:
-                db.add(financial)
-                logger.info(f"添加股票 {stock.code} - {stock.name} 的财务指标，报告期：{report_date}")
-            else:
-                logger.info(f"股票 {stock.code} - {stock.name} 的报告期 {report_date} 财务指标已存在，跳过")
+            return False
+        valid, rejected, gaps = split_financials(stock.code, data)
+        bulk_upsert(db, FinancialIndicator, valid)
+        replace_quarantine(db, FinancialIndicator.__tablename__, [stock.code], rejected)
+        refresh_financial_validity(db, [stock.code])
         db.commit()
-        logger.info(f"股票 {stock.code} - {stock.name} 的财务指标处理完成并提交")
+        publish_invalidation(FinancialIndicator.__tablename__, [stock.code])
+        publish_invalidation(FinancialValidity.__tablename__, [stock.code])
+        logger.info(f"股票 {stock.code} - {stock.name} 的 {len(data)} 期财务指标处理完成：写入 {len(valid)} 期，隔离 {len(rejected)} 期")
+        for row in rejected.itertuples():
+            logger.warning(f"股票 {stock.code} 报告期 {row.record_key} 的财务指标未通过校验: {row.reasons}")
+        if not gaps.empty:
+            logger.warning(f"股票 {stock.code} 的财务指标缺少 {int(gaps['missing'].sum())} 个季度: "
+                           + ", ".join(f"{row.after}~{row.before}" for row in gaps.itertuples()))
+        return True
     except Exception as e:
         logger.error(f"处理股票 {stock.code} - {stock.name} 时出错: {str(e)}")
         db.rollback()
+        return False
 
 async def collect_financial_indicators(db: Session):
     """收集财务指标数据"""
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional
+import pandas as pd
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+import app.db.base  # noqa: F401  注册全部模型
+from app.datasources.base import get_data_source
+from app.models.stock import Stock
+from app.models.dividend import StockDividend, StockDividendYearly
+from app.utils.bulk import bulk_upsert
+from app.cache.bus import publish_invalidation
+from app.utils.dividend import normalize_dividends, yearly_dividend_stats
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 方案进度会从预案变为实施，重复采集时需要更新的列
+DIVIDEND_UPDATE_COLUMNS = [
+    'bonus_shares', 'transfer_shares', 'cash_dividend', 'progress',
+    'ex_dividend_date', 'record_date', 'bonus_listing_date',
+]
+
+async def get_stock_dividends(stock_code: str) -> Optional[pd.DataFrame]:
+    """获取单只股票的历史分红，返回 stock_dividends 表的列"""
+    loop = asyncio.get_event_loop()
+    df = await loop.run_in_executor(None, get_data_source().stock_history_dividend_detail, stock_code, "分红")
+    if df is None or df.empty:
+        return None
+    return normalize_dividends(stock_code, df)
+
+def refresh_dividend_stats(db: Session, stock_codes: List[str]) -> int:
+    """
+    根据已入库的分红记录重新计算指定股票的年度统计
+
+    Args:
+        db: 数据库会话（不会提交）
+        stock_codes: 股票代码
+
+    Returns:
+        int: 写入的年度统计条数
+    """
+    if not stock_codes:
+        return 0
+    rows = db.query(
+        StockDividend.stock_code, StockDividend.ex_dividend_date,
+        StockDividend.cash_dividend, StockDividend.progress
+    ).filter(StockDividend.stock_code.in_(stock_codes)).all()
+    dividends = pd.DataFrame(rows, columns=['stock_code', 'ex_dividend_date', 'cash_dividend', 'progress'])
+    yearly = yearly_dividend_stats(dividends)
+
+    # 方案撤销后某些年份可能不再有分红，先清除旧统计再整体写入
+    db.query(StockDividendYearly).filter(
+        StockDividendYearly.stock_code.in_(stock_codes)
+    ).delete(synchronize_session=False)
+    return bulk_upsert(db, StockDividendYearly, yearly)
+
+def save_dividends(db: Session, frames: Dict[str, pd.DataFrame]) -> int:
+    """
+    批量写入多只股票的分红记录并更新年度统计，由调用方提交
+
+    Args:
+        db: 数据库会话
+        frames: 股票代码 -> normalize_dividends 的结果
+
+    Returns:
+        int: 写入的分红记录条数
+    """
+    if not frames:
+        return 0
+    dividends = pd.concat(frames.values(), ignore_index=True)
+    count = bulk_upsert(db, StockDividend, dividends, update_columns=DIVIDEND_UPDATE_COLUMNS)
+    refresh_dividend_stats(db, list(frames))
+    return count
+
+def publish_dividend_changes(stock_codes: List[str]) -> None:
+    """通知分红记录与年度统计的变更"""
+    if stock_codes:
+        for model in (StockDividend, StockDividendYearly):
+            publish_invalidation(model.__tablename__, stock_codes)
+
+async def process_stock_dividend(db: Session, stock_code: str) -> bool:
+    """采集单只股票的分红记录，返回是否成功（没有分红记录也视为成功）"""
+    try:
+        dividends = await get_stock_dividends(stock_code)
+        if dividends is None or dividends.empty:
+            logger.info(f"股票 {stock_code} 没有分红记录")
+            return True
+        save_dividends(db, {stock_code: dividends})
+        db.commit()
+        publish_dividend_changes([stock_code])
+        logger.info(f"写入股票 {stock_code} 的 {len(dividends)} 条分红记录")
+        return True
+    except Exception as e:
+        logger.error(f"处理股票 {stock_code} 的分红记录时出错: {str(e)}")
+        db.rollback()
+        return False
+
+async def collect_dividends(
+    stock_codes: Optional[List[str]] = None,
+    batch_size: int = None,
+    concurrency: int = None,
+) -> Dict[str, int]:
+    """
+    分批并发采集分红记录
+
+    每批内最多 concurrency 只股票同时请求数据源，整批数据一次写库并提交。
+
+    Args:
+        stock_codes: 股票代码，默认全部股票
+        batch_size: 每批股票数
+        concurrency: 同时请求数
+
+    Returns:
+        Dict[str, int]: 成功、失败的股票数和写入的分红记录数
+    """
+    batch_size = batch_size or settings.DIVIDEND_BATCH_SIZE
+    semaphore = asyncio.Semaphore(concurrency or settings.DIVIDEND_CONCURRENCY)
+    stats = {"done": 0, "failed": 0, "rows": 0}
+
+    async def fetch(code: str):
+        async with semaphore:
+            try:
+                return code, await get_stock_dividends(code)
+            except Exception as e:
+                logger.error(f"获取股票 {code} 的分红记录时出错: {str(e)}")
+                return code, e
+
+    db = SessionLocal()
+    try:
+        if stock_codes is None:
+            stock_codes = [code for (code,) in db.query(Stock.code).order_by(Stock.code).all()]
+        logger.info(f"开始采集 {len(stock_codes)} 只股票的分红记录")
+        for start in range(0, len(stock_codes), batch_size):
+            results = await asyncio.gather(*(fetch(code) for code in stock_codes[start:start + batch_size]))
+            frames = {}
+            for code, result in results:
+                if isinstance(result, Exception):
+                    stats["failed"] += 1
+                    continue
+                stats["done"] += 1
+                if result is not None and not result.empty:
+                    frames[code] = result
+            try:
+                stats["rows"] += save_dividends(db, frames)
+                db.commit()
+                publish_dividend_changes(list(frames))
+            except Exception as e:
+                logger.error(f"写入分红记录时出错: {str(e)}")
+                db.rollback()
+                stats["done"] -= len(frames)
+                stats["failed"] += len(frames)
+            logger.info(f"分红采集进度 {min(start + batch_size, len(stock_codes))}/{len(stock_codes)}")
+        logger.info(f"分红记录采集完成: {stats}")
+        return stats
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    asyncio.run(collect_dividends())
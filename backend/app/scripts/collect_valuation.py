@@ -1,98 +1,108 @@
 import asyncio
 import logging
-import akshare as ak
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.db.session import SessionLocal
+import app.db.base  # noqa: F401  注册全部模型
+from app.datasources.base import get_data_source
 from app.models.stock import Stock
 from app.models.valuation import StockValuation
+from app.utils.bulk import bulk_upsert
+from app.cache.bus import publish_invalidation
+import numpy as np
 import pandas as pd
 from sqlalchemy import not_
-import time
 from requests.exceptions import RequestException
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-async def get_stock_valuation(stock_code: str, max_retries: int = 3) -> list:
+# 估值数据源列名 -> 表字段
+VALUATION_COLUMNS = {
+    'trade_date': 'date',
+    'pe_ttm': 'pe_ttm',
+    'pb': 'pb',
+    'ps_ttm': 'ps_ttm',
+    'dv_ttm': 'dividend_yield_ttm',  # 股息率
+}
+
+def monthly_valuations(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    按月采样估值指标，取每月第一个交易日的数据（各列取当月第一个非空值）
+
+    Args:
+        df: 数据源返回的日度估值指标
+
+    Returns:
+        pd.DataFrame: 列为 date/pe_ttm/pb/ps_ttm/dividend_yield_ttm 的月度数据
+    """
+    trade_date = pd.to_datetime(df['trade_date']).to_numpy()
+    order = np.argsort(trade_date, kind='stable')
+    trade_date = trade_date[order]
+    # 按月份边界切分，每段内取第一个非空值
+    month = trade_date.astype('datetime64[M]')
+    starts = np.flatnonzero(np.r_[True, month[1:] != month[:-1]])
+    ends = np.r_[starts[1:], len(month)]
+    positions = np.arange(len(month))
+
+    monthly = {'date': trade_date[starts].astype('datetime64[D]').astype(object)}
+    for source, target in VALUATION_COLUMNS.items():
+        if source == 'trade_date':
+            continue
+        values = df[source].to_numpy(dtype=float)[order]
+        first = np.minimum.reduceat(np.where(np.isnan(values), len(values), positions), starts)
+        found = first < ends
+        column = np.full(len(starts), np.nan)
+        column[found] = values[first[found]]
+        monthly[target] = column
+    return pd.DataFrame(monthly)
+
+async def get_stock_valuation(stock_code: str, max_retries: int = 3) -> pd.DataFrame:
     """获取股票的估值指标，返回每月第一天的数据"""
+    loop = asyncio.get_event_loop()
     for retry in range(max_retries):
         try:
-            # 获取估值指标数据
-            df = ak.stock_a_indicator_lg(symbol=stock_code)
+            # 获取估值指标数据（在线程池中请求，不阻塞其他股票和数据集的采集）
+            df = await loop.run_in_executor(None, get_data_source().stock_a_indicator_lg, stock_code)
             if df is None or df.empty:
                 logger.warning(f"股票 {stock_code} 没有估值指标数据")
                 return None
                 
-            # 将日期列转换为日期类型
-            df['trade_date'] = pd.to_datetime(df['trade_date'])
-            
-            # 按月份分组，取每月第一天的数据
-            df['year_month'] = df['trade_date'].dt.to_period('M')
-            monthly_data = df.groupby('year_month').first().reset_index()
-            
-            # 转换回日期格式
-            monthly_data['trade_date'] = monthly_data['trade_date'].dt.date
-            
-            logger.info(f"股票 {stock_code} 的月度估值指标数据: {monthly_data}")
-            
-            # 转换为字典列表
-            result = []
-            for _, row in monthly_data.iterrows():
-                result.append({
-                    'date': row['trade_date'],
-                    'pe_ttm': row['pe_ttm'],
-                    'pb': row['pb'],
-                    'ps_ttm': row['ps_ttm'],
-                    'dividend_yield_ttm': row['dv_ttm']  # 股息率
-                })
-            return result
+            monthly_data = monthly_valuations(df)
+            logger.info(f"股票 {stock_code} 共 {len(monthly_data)} 个月度估值指标")
+            return monthly_data
             
         except (RequestException, Exception) as e:
             if retry < max_retries - 1:
-                wait_time = (retry + 1) * 5  # 递增等待时间：5秒、10秒、15秒
+                wait_time = (retry + 1) * settings.COLLECTOR_RETRY_DELAY  # 递增等待时间：默认5秒、10秒、15秒
                 logger.warning(f"获取股票 {stock_code} 的估值指标失败，{wait_time}秒后重试 ({retry + 1}/{max_retries}): {str(e)}")
-                time.sleep(wait_time)
+                await asyncio.sleep(wait_time)
             else:
                 logger.error(f"获取股票 {stock_code} 的估值指标失败，已达到最大重试次数: {str(e)}")
                 return None
 
-async def process_stock_valuation(db: Session, stock: Stock) -> None:
-    """处理单个股票的估值指标"""
+async def process_stock_valuation(db: Session, stock: Stock) -> bool:
+    """处理单个股票的估值指标，返回是否成功"""
     try:
         # 获取估值指标
-        valuation_data_list = await get_stock_valuation(stock.code)
-        if not valuation_data_list:
-            return
-            
-        for valuation_data in valuation_data_list:
-            # 创建估值指标记录
-            valuation = StockValuation(
-                id=f"{stock.code}_{valuation_data['date']}",
-                stock_code=stock.code,
-                date=valuation_data['date'],
-                pe_ttm=valuation_data['pe_ttm'],
-                pb=valuation_data['pb'],
-                ps_ttm=valuation_data['ps_ttm'],
-                dividend_yield_ttm=valuation_data['dividend_yield_ttm']
-            )
+        valuation_data = await get_stock_valuation(stock.code)
+        if valuation_data is None or valuation_data.empty:
+            return False
             
-            # 检查是否已存在
-            existing = db.query(StockValuation).filter(
-                StockValuation.id == valuation.id
-            ).first()
-            
-            if not existing:
-                db.add(valuation)
-                logger.info(f"添加股票 {stock.code} - {stock.name} 的估值指标，日期：{valuation_data['date']}")
-            else:
-                logger.info(f"股票 {stock.code} - {stock.name} 的估值指标已存在，日期：{valuation_data['date']}")
-                
+        # 整列生成主键，已存在的记录由数据库跳过
+        valuation_data.insert(0, 'id', stock.code + '_' + valuation_data['date'].astype(str))
+        valuation_data.insert(1, 'stock_code', stock.code)
+        bulk_upsert(db, StockValuation, valuation_data)
         db.commit()
+        publish_invalidation(StockValuation.__tablename__, [stock.code])
+        logger.info(f"写入股票 {stock.code} - {stock.name} 的 {len(valuation_data)} 条估值指标")
+        return True
         
     except Exception as e:
         logger.error(f"处理股票 {stock.code} - {stock.name} 的估值指标时出错: {str(e)}")
         db.rollback()
+        return False
 
 async def collect_valuations():
     """收集所有股票的估值指标"""
@@ -0,0 +1,170 @@
+import logging
+from datetime import date
+from typing import Any, Dict, List, Optional
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.services.stock_service import StockService
+from app.cache.series import Series, decode_series, encode_series, get_series_store
+from app.cache.store import api_cache
+from app.utils.data_converter import FINANCIAL_FIELD_MAP
+
+logger = logging.getLogger(__name__)
+
+# 图表数据集：名称 -> (表名, 日期列, 指标列)
+SERIES_DATASETS = {
+    "valuations": ("stock_valuations", "date", ["pe_ttm", "pb", "ps_ttm", "dividend_yield_ttm"]),
+    "financials": ("stock_financials", "report_date", list(FINANCIAL_FIELD_MAP)),
+}
+
+def _version_key(last_modified, count: int) -> str:
+    return f"{last_modified.isoformat() if last_modified else ''}|{count}"
+
+def align_series(series: Dict[str, Series], metrics: List[str], start_date: Optional[date] = None,
+                 end_date: Optional[date] = None) -> Dict[str, Any]:
+    """
+    将多只股票的序列对齐到共同的日期轴
+
+    Args:
+        series: 股票代码 -> 序列
+        metrics: 返回的指标
+        start_date: 开始日期（可选）
+        end_date: 结束日期（可选）
+
+    Returns:
+        Dict[str, Any]: dates 为全部股票日期的并集（升序），series 为 股票代码 -> 指标 -> 与 dates 等长的数组（缺失为 NaN）
+    """
+    dates = np.unique(np.concatenate([item["dates"] for item in series.values()] or [np.array([], "datetime64[D]")]))
+    if start_date:
+        dates = dates[dates >= np.datetime64(start_date, "D")]
+    if end_date:
+        dates = dates[dates <= np.datetime64(end_date, "D")]
+
+    aligned = {}
+    for code, item in series.items():
+        # 每只股票的日期都包含在并集中，按位置写入即可
+        keep = np.isin(item["dates"], dates)
+        positions = np.searchsorted(dates, item["dates"][keep])
+        index = {metric: i for i, metric in enumerate(item["metrics"].tolist())}
+        aligned[code] = {}
+        for metric in metrics:
+            values = np.full(len(dates), np.nan)
+            values[positions] = item["values"][index[metric]][keep]
+            aligned[code][metric] = values
+    return {"dates": dates, "series": aligned}
+
+class ChartService(StockService):
+    """图表数据服务：读取预计算的单只股票时间序列并对齐多只股票"""
+
+    def __init__(self, db: Session = None):
+        super().__init__(db)
+        self.store = get_series_store()
+
+    def build_series(self, dataset: str, stock_code: str, cached: bool = True) -> Series:
+        """
+        从数据库构建单只股票的完整序列
+
+        Args:
+            dataset: 数据集名称
+            stock_code: 股票代码
+            cached: 是否使用缓存的数据版本（采集进程重建时应为 False）
+
+        Returns:
+            Series: 日期升序的序列，version 记录构建时的数据版本
+        """
+        table, date_column, metrics = SERIES_DATASETS[dataset]
+        # 先取版本再取数据：两次查询之间数据若有变化，读取时版本不一致会触发重建
+        version = _version_key(*self.data_version(table, stock_code, cached=cached))
+        rows = self.db.execute(
+            text(f"SELECT {date_column}, {', '.join(metrics)} FROM {table} WHERE stock_code = :code ORDER BY {date_column}"),
+            {"code": stock_code},
+        ).all()
+        values = np.array([row[1:] for row in rows], dtype=float).reshape(len(rows), len(metrics))
+        return {
+            "dates": np.array([str(row[0]) for row in rows], dtype="datetime64[D]"),
+            "metrics": np.array(metrics),
+            "values": values.T.copy(),
+            "version": np.array(version),
+        }
+
+    def rebuild(self, stock_code: str, datasets: Optional[List[str]] = None) -> None:
+        """重建单只股票的序列并写入存储，在采集完成后调用"""
+        for dataset in datasets or list(SERIES_DATASETS):
+            self.store.put(dataset, stock_code, encode_series(self.build_series(dataset, stock_code, cached=False)))
+
+    def load_series(self, dataset: str, stock_code: str) -> Series:
+        """
+        读取单只股票的序列
+
+        依次使用进程内缓存、序列存储和数据库：存储中的序列版本与当前数据版本不一致时
+        重新构建并写回存储。
+
+        Args:
+            dataset: 数据集名称
+            stock_code: 股票代码
+
+        Returns:
+            Series: 序列（与其他请求共享，不应修改）
+        """
+        table = SERIES_DATASETS[dataset][0]
+
+        def load() -> Series:
+            version = _version_key(*self.data_version(table, stock_code))
+            blob = self.store.get(dataset, stock_code)
+            if blob is not None:
+                try:
+                    series = decode_series(blob)
+                    if str(series["version"]) == version:
+                        return series
+                except Exception as e:
+                    logger.warning(f"股票 {stock_code} 的 {dataset} 序列无法解析，重新构建: {str(e)}")
+            series = self.build_series(dataset, stock_code)
+            self.store.put(dataset, stock_code, encode_series(series))
+            return series
+
+        return api_cache.get_or_load(("series", dataset, stock_code), [(table, stock_code)], load)
+
+    def overlay(
+        self,
+        dataset: str,
+        stock_codes: List[str],
+        metrics: List[str],
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> Dict[str, Any]:
+        """
+        返回多只股票对齐后的指标序列
+
+        Args:
+            dataset: 数据集名称
+            stock_codes: 股票代码
+            metrics: 指标列
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+
+        Returns:
+            Dict[str, Any]: dates 为 ISO 日期列表（只出现一次），series 为 股票代码 -> 指标 -> 数值列表（缺失为 null）
+
+        Raises:
+            ValueError: 数据集或指标不存在
+        """
+        if dataset not in SERIES_DATASETS:
+            raise ValueError(f"未知的数据集: {dataset}")
+        unknown = [metric for metric in metrics if metric not in SERIES_DATASETS[dataset][2]]
+        if unknown:
+            raise ValueError(f"数据集 {dataset} 不包含指标: {', '.join(unknown)}")
+
+        aligned = align_series(
+            {code: self.load_series(dataset, code) for code in stock_codes}, metrics, start_date, end_date
+        )
+        return {
+            "dataset": dataset,
+            "dates": np.datetime_as_string(aligned["dates"]).tolist(),
+            "series": {
+                code: {
+                    metric: np.where(np.isnan(values), None, values.astype(object)).tolist()
+                    for metric, values in item.items()
+                }
+                for code, item in aligned["series"].items()
+            },
+        }
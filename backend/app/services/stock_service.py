@@ -1,12 +1,23 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 from app.db.session import SessionLocal
+from app.cache.store import api_cache, Tag
 import json
 from datetime import datetime
 
+# 按股票记录数据版本的表，版本查询语句预先构建
+_VERSION_SQL = {
+    table: text(f"SELECT MAX(updated_at), COUNT(*) FROM {table} WHERE stock_code = :code")
+    for table in (
+        "stock_financials", "stock_financial_validity", "stock_valuations", "stock_dividends", "stock_dividend_yearly"
+    )
+}
+
 class StockService:
     def __init__(self, db: Session = None):
+        # 只关闭自己创建的会话，调用方传入的会话（如采集任务的会话）由调用方管理
+        self._owns_session = db is None
         self.db = db or SessionLocal()
         
     def execute_sql(self, sql: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
@@ -24,24 +35,59 @@ class StockService:
             # 执行 SQL 查询
             result = self.db.execute(text(sql), params or {})
             
-            # 将结果转换为字典列表
-            rows = []
-            for row in result:
-                # 处理每个字段的值
-                row_dict = {}
-                for key, value in row._mapping.items():
-                    # 处理日期时间类型
-                    if isinstance(value, datetime):
-                        value = value.isoformat()
-                    row_dict[key] = value
-                rows.append(row_dict)
+            # 将结果转换为字典列表，日期时间类型转为 ISO 格式字符串
+            columns = list(result.keys())
+            rows = [
+                dict(zip(columns, [value.isoformat() if isinstance(value, datetime) else value for value in row]))
+                for row in result
+            ]
                 
             return rows
             
         except Exception as e:
             raise Exception(f"执行 SQL 查询时出错: {str(e)}")
             
+    def execute_sql_cached(self, sql: str, params: Dict[str, Any], tags: List[Tag]) -> List[Dict[str, Any]]:
+        """
+        执行 SQL 查询并缓存结果，数据变更通知到达时按 tags 淘汰
+        
+        Args:
+            sql: SQL 查询语句
+            params: 查询参数
+            tags: 结果依赖的 (表名, 股票代码)，股票代码为 None 表示依赖整张表
+            
+        Returns:
+            List[Dict[str, Any]]: 查询结果列表（与其他请求共享，不应修改）
+        """
+        key = (sql, tuple(sorted((params or {}).items())))
+        return api_cache.get_or_load(key, tags, lambda: self.execute_sql(sql, params))
+            
+    def data_version(self, table: str, stock_code: str, cached: bool = True) -> Tuple[Optional[datetime], int]:
+        """
+        查询单只股票在某张表中的数据版本
+        
+        行的新增、更新（updated_at 变化）和删除（行数变化）都会改变版本。默认缓存到
+        该股票的数据变更通知到达为止。
+        
+        Args:
+            table: 表名（仅限内部传入的固定表名）
+            stock_code: 股票代码
+            cached: 是否使用缓存（未订阅变更通知的进程，如采集进程，应直接查询）
+            
+        Returns:
+            Tuple[Optional[datetime], int]: 最近更新时间和行数
+        """
+        def load():
+            last_modified, count = self.db.execute(_VERSION_SQL[table], {"code": stock_code}).one()
+            if isinstance(last_modified, str):  # SQLite 的聚合结果为字符串
+                last_modified = datetime.fromisoformat(last_modified)
+            return last_modified, count
+            
+        if not cached:
+            return load()
+        return api_cache.get_or_load(("version", table, stock_code), [(table, stock_code)], load)
+            
     def __del__(self):
-        """确保关闭数据库连接"""
-        if self.db:
+        """确保关闭自己创建的数据库连接"""
+        if self.db and getattr(self, "_owns_session", True):
             self.db.close() 
\ No newline at end of file
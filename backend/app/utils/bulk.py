@@ -0,0 +1,79 @@
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+def frame_to_rows(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    将 DataFrame 按列转换为写库参数
+
+    每列整体转换为 Python 值（NaN/NaT 转为 None），最后在数据库驱动边界一次性组装成
+    executemany 需要的参数字典，避免 iterrows 逐行创建 Series。
+
+    Args:
+        frame: 列名与表字段一致的数据
+
+    Returns:
+        List[Dict[str, Any]]: 每行一个参数字典
+    """
+    columns = list(frame.columns)
+    values = []
+    for column in columns:
+        array = frame[column].to_numpy()
+        if array.dtype.kind == 'f':
+            values.append(np.where(np.isnan(array), None, array.astype(object)).tolist())
+        elif array.dtype.kind == 'O':
+            values.append([None if pd.isna(value) else value for value in array.tolist()])
+        else:
+            values.append(frame[column].astype(object).where(frame[column].notna(), None).tolist())
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+def _dialect_insert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"不支持的数据库: {dialect}")
+    return insert
+
+def bulk_upsert(
+    db: Session,
+    model,
+    frame: pd.DataFrame,
+    index_elements: Iterable[str] = ("id",),
+    update_columns: Optional[Iterable[str]] = None,
+    chunk_size: int = 1000,
+) -> int:
+    """
+    批量写入数据，主键（或唯一约束）冲突时跳过或更新
+
+    Args:
+        db: 数据库会话（不会提交，由调用方提交）
+        model: 目标模型
+        frame: 列名与表字段一致的数据
+        index_elements: 判断冲突的列
+        update_columns: 冲突时需要更新的列，为空时跳过已存在的记录
+        chunk_size: 每次 executemany 提交给驱动的行数
+
+    Returns:
+        int: 提交写入的行数（包括因冲突被跳过的行）
+    """
+    if frame.empty:
+        return 0
+    insert = _dialect_insert(db)
+    table = model.__table__
+    rows = frame_to_rows(frame)
+    # 不把数据内联为多行 VALUES：语句只编译一次（并被缓存），参数以 executemany 传给驱动
+    statement = insert(table)
+    if update_columns:
+        columns = {column: statement.excluded[column] for column in update_columns}
+        if "updated_at" in table.c:
+            columns["updated_at"] = statement.excluded["updated_at"]
+        statement = statement.on_conflict_do_update(index_elements=list(index_elements), set_=columns)
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=list(index_elements))
+    for start in range(0, len(rows), chunk_size):
+        db.execute(statement, rows[start:start + chunk_size])
+    return len(rows)
@@ -1,7 +1,38 @@
 import re
-from typing import Any, Union, Optional, Dict
+from typing import Any, Union, Optional, Dict, Tuple, TYPE_CHECKING
 from datetime import date
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+# stock_financials 列名与同花顺财务摘要字段的对应关系
+FINANCIAL_FIELD_MAP = {
+    "net_profit": "净利润",
+    "net_profit_growth": "净利润同比增长率",
+    "non_net_profit": "扣非净利润",
+    "non_net_profit_growth": "扣非净利润同比增长率",
+    "total_revenue": "营业总收入",
+    "total_revenue_growth": "营业总收入同比增长率",
+    "eps": "基本每股收益",
+    "bps": "每股净资产",
+    "capital_reserve_per_share": "每股资本公积金",
+    "undist_profit_per_share": "每股未分配利润",
+    "ocfps": "每股经营现金流",
+    "net_profit_margin": "销售净利率",
+    "gross_profit_margin": "销售毛利率",
+    "roe": "净资产收益率",
+    "roe_diluted": "净资产收益率-摊薄",
+    "operating_cycle": "营业周期",
+    "inventory_turnover": "存货周转率",
+    "inventory_turnover_days": "存货周转天数",
+    "receivable_turnover_days": "应收账款周转天数",
+    "current_ratio": "流动比率",
+    "quick_ratio": "速动比率",
+    "conservative_quick_ratio": "保守速动比率",
+    "equity_ratio": "产权比率",
+    "debt_ratio": "资产负债率",
+}
+
 def convert_financial_data(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     转换财务数据，根据值的情况处理：
@@ -34,4 +65,42 @@ def convert_financial_data(data: Dict[str, Any]) -> Dict[str, Any]:
                 result[key] = float(value_str)
             except ValueError:
                 result[key] = value_str
-    return result
\ No newline at end of file
+    return result
+
+# 表示缺失的文本（False 来自数据源的空单元格）
+MISSING_TEXTS = ['', '--', '-', 'False', 'None', 'nan', 'NaN']
+
+def convert_financial_series(series: "pd.Series") -> Tuple["pd.Series", "pd.Series"]:
+    """
+    按列转换财务数据，单位规则与 convert_financial_data 相同
+
+    Args:
+        series: 数据源返回的一列财务数据
+
+    Returns:
+        Tuple[pd.Series, pd.Series]: 转换后的浮点数（缺失或无法解析时为 NaN），
+        以及标记无法解析单元格的布尔序列
+    """
+    # FINANCIAL_FIELD_MAP 也被 API 使用，pandas 只在转换时导入
+    import numpy as np
+    import pandas as pd
+
+    if series.dtype.kind == 'b':
+        return pd.Series(np.nan, index=series.index), pd.Series(False, index=series.index)
+    if series.dtype.kind in 'iuf':
+        values = series.astype(float)
+        invalid = values.notna() & ~np.isfinite(values)
+        return values.where(~invalid), invalid
+
+    text = series.astype(str).str.strip()
+    missing = series.isna() | text.isin(MISSING_TEXTS)
+    scale = np.select(
+        [text.str.contains('万亿', regex=False), text.str.contains('亿', regex=False), text.str.contains('万', regex=False)],
+        [1e12, 1e8, 1e4],
+        1.0,
+    )
+    values = pd.to_numeric(text.str.replace('万亿|亿|万|%', '', regex=True), errors='coerce') * scale
+    # 带金额单位的值取整到元
+    values = values.where(scale == 1, values.round())
+    invalid = ~missing & ~np.isfinite(values)
+    return values.where(~missing & ~invalid), invalid
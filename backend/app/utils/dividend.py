@@ -0,0 +1,71 @@
+import pandas as pd
+
+# 分红数据源列名 -> 表字段
+DIVIDEND_COLUMNS = {
+    '公告日期': 'announce_date',
+    '送股': 'bonus_shares',
+    '转增': 'transfer_shares',
+    '派息': 'cash_dividend',
+    '进度': 'progress',
+    '除权除息日': 'ex_dividend_date',
+    '股权登记日': 'record_date',
+    '红股上市日': 'bonus_listing_date',
+}
+
+DATE_COLUMNS = ['announce_date', 'ex_dividend_date', 'record_date', 'bonus_listing_date']
+
+# 已实施的分红方案
+IMPLEMENTED = '实施'
+
+def normalize_dividends(stock_code: str, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    将数据源返回的分红明细转换为 stock_dividends 表的列
+
+    Args:
+        stock_code: 股票代码
+        df: stock_history_dividend_detail 返回的数据
+
+    Returns:
+        pd.DataFrame: 列与 StockDividend 字段一致，同一公告日期只保留一条
+    """
+    frame = df.reindex(columns=list(DIVIDEND_COLUMNS)).rename(columns=DIVIDEND_COLUMNS)
+    for column in DATE_COLUMNS:
+        frame[column] = pd.to_datetime(frame[column], errors='coerce').dt.date
+    for column in ['bonus_shares', 'transfer_shares', 'cash_dividend']:
+        frame[column] = pd.to_numeric(frame[column], errors='coerce')
+    frame = frame[frame['announce_date'].notna()]
+    frame.insert(0, 'id', stock_code + '_' + frame['announce_date'].astype(str))
+    frame.insert(1, 'stock_code', stock_code)
+    return frame.drop_duplicates('id', keep='first').reset_index(drop=True)
+
+def yearly_dividend_stats(dividends: pd.DataFrame) -> pd.DataFrame:
+    """
+    按股票和除权除息日所在年份汇总已实施的现金分红，并计算连续分红年数
+
+    Args:
+        dividends: 含 stock_code/ex_dividend_date/cash_dividend/progress 列的分红记录，可包含多只股票
+
+    Returns:
+        pd.DataFrame: 列与 StockDividendYearly 字段一致
+    """
+    ex_date = pd.to_datetime(dividends['ex_dividend_date'], errors='coerce')
+    cash = pd.to_numeric(dividends['cash_dividend'], errors='coerce')
+    paid = (dividends['progress'] == IMPLEMENTED) & (cash > 0) & ex_date.notna()
+    frame = pd.DataFrame({
+        'stock_code': dividends['stock_code'][paid],
+        'year': ex_date[paid].dt.year,
+        'cash_per_share': cash[paid] / 10,
+    })
+    yearly = frame.groupby(['stock_code', 'year'], sort=True).agg(
+        payout_count=('cash_per_share', 'size'),
+        cash_per_share=('cash_per_share', 'sum'),
+    ).reset_index()
+
+    # 股票变化或年份不连续时开始新的连续区间，区间内累计计数即为连续年数
+    code = yearly['stock_code']
+    year = yearly['year']
+    new_run = (code != code.shift()) | (year - year.shift() != 1)
+    yearly['streak'] = yearly.groupby(new_run.cumsum()).cumcount() + 1
+    yearly['cash_per_share'] = yearly['cash_per_share'].round(4)
+    yearly.insert(0, 'id', yearly['stock_code'] + '_' + yearly['year'].astype(str))
+    return yearly
@@ -0,0 +1,109 @@
+from datetime import date
+from typing import List
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+from app.cache.bus import publish_invalidation
+from app.models.financial import FinancialIndicator, FinancialValidity
+from app.utils.bulk import bulk_upsert
+
+# 仍然有效的区间的结束日期
+OPEN_END = date(9999, 12, 31)
+
+# 报告期月份 -> 法定披露截止日距报告期末的月数：一季报 4/30、半年报 8/31、三季报 10/31、年报次年 4/30
+DISCLOSURE_MONTHS = {3: 1, 6: 2, 9: 1, 12: 4}
+DEFAULT_DISCLOSURE_MONTHS = 4
+
+def disclosure_dates(report_dates: pd.Series) -> pd.Series:
+    """
+    按法定披露截止日估计各报告期的可用日期
+
+    数据源不提供实际公告日期，取截止日可以保证回放时不会用到当时尚未披露的数据
+    （提前披露的报告会晚几天到几个月才被使用）。
+
+    Args:
+        report_dates: 报告期
+
+    Returns:
+        pd.Series: 对应报告期所在月份末再加若干个月的月末日期（datetime64[D]）
+    """
+    periods = pd.to_datetime(report_dates).to_numpy().astype("datetime64[M]")
+    month = periods.astype(int) % 12 + 1
+    offset = np.full(len(periods), DEFAULT_DISCLOSURE_MONTHS)
+    for report_month, months in DISCLOSURE_MONTHS.items():
+        offset[month == report_month] = months
+    deadline = (periods + offset + 1).astype("datetime64[D]") - np.timedelta64(1, "D")
+    return pd.Series(deadline, index=report_dates.index)
+
+def validity_intervals(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    计算每个报告期的时点有效区间
+
+    Args:
+        frame: 列为 stock_code、report_date 的报告期
+
+    Returns:
+        pd.DataFrame: 与 FinancialValidity 字段一致；按披露日期排序后，被同日或更早披露的更新报告期
+        取代的记录区间为空，其余记录有效到下一期披露为止
+    """
+    df = frame[["stock_code", "report_date"]].copy()
+    df["report_date"] = pd.to_datetime(df["report_date"])
+    df["valid_from"] = disclosure_dates(df["report_date"])
+    df = df.sort_values(["stock_code", "valid_from", "report_date"], kind="stable").reset_index(drop=True)
+
+    same_stock = df["stock_code"].shift(-1) == df["stock_code"]
+    superseded = same_stock & (df["valid_from"].shift(-1) == df["valid_from"])
+    superseded |= df["report_date"] < df.groupby("stock_code")["report_date"].cummax()
+    effective = df[~superseded]
+
+    valid_to = df["valid_from"].copy()
+    valid_to[effective.index] = effective.groupby("stock_code")["valid_from"].shift(-1).fillna(pd.Timestamp(OPEN_END))
+    df["valid_to"] = valid_to
+    df.insert(0, "id", df["stock_code"] + "_" + df["report_date"].dt.strftime("%Y-%m-%d"))
+    for column in ("report_date", "valid_from", "valid_to"):
+        df[column] = df[column].dt.date
+    return df
+
+def refresh_financial_validity(db: Session, stock_codes: List[str]) -> int:
+    """
+    根据已入库的财务指标重新计算指定股票的时点有效区间，由调用方提交
+
+    Args:
+        db: 数据库会话
+        stock_codes: 股票代码
+
+    Returns:
+        int: 写入的区间条数
+    """
+    if not stock_codes:
+        return 0
+    rows = db.query(FinancialIndicator.stock_code, FinancialIndicator.report_date).filter(
+        FinancialIndicator.stock_code.in_(stock_codes)
+    ).all()
+    intervals = validity_intervals(pd.DataFrame(rows, columns=["stock_code", "report_date"]))
+    db.query(FinancialValidity).filter(
+        FinancialValidity.stock_code.in_(stock_codes)
+    ).delete(synchronize_session=False)
+    return bulk_upsert(db, FinancialValidity, intervals)
+
+def backfill_financial_validity(db: Session, batch_size: int = 500) -> int:
+    """
+    为已有财务指标但缺少有效区间的股票补算区间，每批提交一次
+
+    Args:
+        db: 数据库会话
+        batch_size: 每批股票数
+
+    Returns:
+        int: 补算的股票数
+    """
+    covered = db.query(FinancialValidity.stock_code).distinct()
+    codes = [code for (code,) in db.query(FinancialIndicator.stock_code).filter(
+        FinancialIndicator.stock_code.notin_(covered)
+    ).distinct().order_by(FinancialIndicator.stock_code).all()]
+    for start in range(0, len(codes), batch_size):
+        batch = codes[start:start + batch_size]
+        refresh_financial_validity(db, batch)
+        db.commit()
+        publish_invalidation(FinancialValidity.__tablename__, batch)
+    return len(codes)
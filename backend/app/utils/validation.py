@@ -0,0 +1,247 @@
+import json
+import warnings
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.quarantine import DataQuarantine
+from app.utils.bulk import bulk_upsert
+from app.utils.data_converter import FINANCIAL_FIELD_MAP, convert_financial_series
+
+# stock_financials 中以整数（元）存储的金额列
+FINANCIAL_AMOUNT_COLUMNS = ["net_profit", "non_net_profit", "total_revenue"]
+
+# 取值范围检查：列 -> (下限, 上限)，None 表示不限
+FINANCIAL_RANGES = {
+    "debt_ratio": (0, 100),
+    "gross_profit_margin": (None, 100),
+    "total_revenue": (0, None),
+    "current_ratio": (0, None),
+    "quick_ratio": (0, None),
+    "conservative_quick_ratio": (0, None),
+    "operating_cycle": (0, None),
+    "inventory_turnover": (0, None),
+    "inventory_turnover_days": (0, None),
+    "receivable_turnover_days": (0, None),
+}
+
+# 与本股历史比较的列；金额和增长率会随经营正常大幅变化，不做离群检查
+FINANCIAL_OUTLIER_COLUMNS = ["eps", "bps", "roe", "gross_profit_margin", "debt_ratio", "current_ratio"]
+
+def parse_financials(stock_code: str, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    将数据源返回的财务摘要转换为 stock_financials 表的列
+
+    所有指标列展平后一次转换，避免逐列调用带来的固定开销（单只股票通常只有几十期）。
+
+    Args:
+        stock_code: 股票代码
+        df: stock_financial_abstract_ths 返回的数据
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]: 转换后的数据（索引与 df 一致，金额列尚未取整），
+        以及同形状的布尔表，标记无法解析的单元格
+    """
+    columns = list(FINANCIAL_FIELD_MAP)
+    block = df.reindex(columns=list(FINANCIAL_FIELD_MAP.values())).to_numpy(dtype=object)
+    values, invalid = convert_financial_series(pd.Series(block.ravel()))
+    values = values.to_numpy().reshape(block.shape)
+    invalid = invalid.to_numpy().reshape(block.shape)
+
+    if "报告期" in df:
+        report_date = pd.to_datetime(df["报告期"], errors="coerce")
+    else:
+        report_date = pd.Series(pd.NaT, index=df.index)
+    frame = pd.DataFrame({"stock_code": stock_code, "report_date": report_date}, index=df.index)
+    frame = pd.concat([frame, pd.DataFrame(values, columns=columns, index=df.index)], axis=1)
+    invalid = pd.DataFrame(invalid, columns=columns, index=df.index)
+    invalid.insert(0, "report_date", report_date.isna().to_numpy())
+    return frame, invalid
+
+def _reason_labels(masks: Dict[str, np.ndarray], index: pd.Index) -> pd.Series:
+    """把多组布尔检查结果合并为每行的原因字符串，通过的行为空字符串"""
+    labels = np.full(len(index), "", dtype=object)
+    for label, mask in masks.items():
+        if mask.any():
+            labels = labels + np.where(mask, label + ";", "")
+    return pd.Series(labels, index=index).str.rstrip(";")
+
+def outlier_mask(
+    frame: pd.DataFrame,
+    columns: List[str],
+    iqr_factor: float,
+    zscore: float,
+    min_periods: int,
+) -> np.ndarray:
+    """
+    与同一股票的历史数据比较，标记离群值
+
+    同时超出 IQR 围栏（Q1 - k·IQR, Q3 + k·IQR）且稳健 z 分数（基于中位数绝对偏差）超过阈值才视为离群，
+    避免正常的业绩波动被隔离。历史期数不足或数据没有离散度时不做判断。
+
+    Args:
+        frame: 含 stock_code 和待检查列的数据，可包含多只股票，缺失值不参与统计
+        columns: 检查的列
+        iqr_factor: IQR 围栏倍数
+        zscore: 稳健 z 分数阈值
+        min_periods: 最少有效期数
+
+    Returns:
+        np.ndarray: 形状为 (行数, 列数) 的布尔数组，离群值为 True
+    """
+    values = frame[columns].to_numpy(dtype=float)
+    mask = np.zeros(values.shape, dtype=bool)
+    for rows in frame.groupby("stock_code", sort=False).indices.values():
+        block = values[rows]
+        enough = np.count_nonzero(~np.isnan(block), axis=0) >= min_periods
+        if len(rows) < min_periods or not enough.any():
+            continue
+        block = block[:, enough]
+        with warnings.catch_warnings():
+            # 整列缺失时 nanquantile 返回 NaN 并告警，此时比较结果均为 False
+            warnings.simplefilter("ignore", RuntimeWarning)
+            q1, median, q3 = np.nanquantile(block, [0.25, 0.5, 0.75], axis=0)
+            deviation = np.abs(block - median)
+            mad = np.nanmedian(deviation, axis=0)
+            iqr = q3 - q1
+            outside_fence = (block < q1 - iqr_factor * iqr) | (block > q3 + iqr_factor * iqr)
+            robust_z = 0.6745 * deviation / np.where(mad > 0, mad, np.nan)
+            mask[np.ix_(rows, np.flatnonzero(enough))] = outside_fence & (robust_z > zscore) & (iqr > 0)
+    return mask
+
+def check_financials(
+    frame: pd.DataFrame,
+    invalid: pd.DataFrame,
+    iqr_factor: Optional[float] = None,
+    zscore: Optional[float] = None,
+    min_periods: Optional[int] = None,
+) -> pd.Series:
+    """
+    对一批财务数据做向量化校验
+
+    检查项：
+    - type:列名   单元格无法解析为数字（或报告期无法解析为日期）
+    - range:列名  超出 FINANCIAL_RANGES 规定的取值范围
+    - outlier:列名 与本股历史相比离群（见 outlier_mask）
+    - period      报告期不是季度末
+    - duplicate   同一股票的报告期重复
+
+    Args:
+        frame: parse_financials 的转换结果，可包含多只股票（数据源返回的是完整历史）
+        invalid: parse_financials 返回的无法解析标记
+        iqr_factor: IQR 围栏倍数，默认取配置
+        zscore: 稳健 z 分数阈值，默认取配置
+        min_periods: 离群检查所需的最少期数，默认取配置
+
+    Returns:
+        pd.Series: 每行未通过的检查，以分号分隔；通过校验的行为空字符串
+    """
+    iqr_factor = settings.FINANCIAL_OUTLIER_IQR if iqr_factor is None else iqr_factor
+    zscore = settings.FINANCIAL_OUTLIER_ZSCORE if zscore is None else zscore
+    min_periods = settings.FINANCIAL_OUTLIER_MIN_PERIODS if min_periods is None else min_periods
+
+    masks = dict(zip((f"type:{column}" for column in invalid.columns), invalid.to_numpy().T))
+
+    range_columns = list(FINANCIAL_RANGES)
+    values = frame[range_columns].to_numpy(dtype=float)
+    low = np.array([np.nan if low is None else low for low, _ in FINANCIAL_RANGES.values()])
+    high = np.array([np.nan if high is None else high for _, high in FINANCIAL_RANGES.values()])
+    out_of_range = (values < low) | (values > high)
+    masks.update(zip((f"range:{column}" for column in range_columns), out_of_range.T))
+
+    # 历史统计只使用通过类型和范围检查的数值
+    clean = frame[["stock_code"] + FINANCIAL_OUTLIER_COLUMNS].copy()
+    for column in FINANCIAL_OUTLIER_COLUMNS:
+        failed = masks[f"type:{column}"] | masks.get(f"range:{column}", False)
+        if failed.any():
+            clean[column] = clean[column].where(~failed)
+    outliers = outlier_mask(clean, FINANCIAL_OUTLIER_COLUMNS, iqr_factor, zscore, min_periods)
+    masks.update(zip((f"outlier:{column}" for column in FINANCIAL_OUTLIER_COLUMNS), outliers.T))
+
+    report_date = frame["report_date"]
+    masks["period"] = (report_date.notna() & ~report_date.dt.is_quarter_end).to_numpy()
+    masks["duplicate"] = (report_date.notna() & frame.duplicated(["stock_code", "report_date"])).to_numpy()
+    return _reason_labels(masks, frame.index)
+
+def find_period_gaps(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    查找每只股票报告期序列中缺失的季度
+
+    Args:
+        frame: 含 stock_code 和 report_date 列的数据
+
+    Returns:
+        pd.DataFrame: stock_code、缺口前后的报告期（after/before）和缺失的季度数（missing）
+    """
+    dates = frame[["stock_code", "report_date"]].dropna().drop_duplicates()
+    dates = dates[dates["report_date"].dt.is_quarter_end].sort_values(["stock_code", "report_date"])
+    codes = dates["stock_code"].to_numpy()
+    days = dates["report_date"].to_numpy().astype("datetime64[D]")
+    quarter = days.astype("datetime64[M]").astype(int) // 3
+    missing = np.diff(quarter) - 1
+    gaps = np.flatnonzero((missing > 0) & (codes[1:] == codes[:-1]))
+    return pd.DataFrame({
+        "stock_code": codes[gaps + 1],
+        "after": days[gaps].astype(object),
+        "before": days[gaps + 1].astype(object),
+        "missing": missing[gaps],
+    })
+
+def split_financials(stock_code: str, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    转换并校验一只股票的财务摘要，将通过校验的记录与需要隔离的记录分开
+
+    Args:
+        stock_code: 股票代码
+        df: stock_financial_abstract_ths 返回的数据
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+            - 可写入 stock_financials 的记录
+            - 可写入 data_quarantine 的记录
+            - find_period_gaps 的结果
+    """
+    df = df.reset_index(drop=True)
+    frame, invalid = parse_financials(stock_code, df)
+    reasons = check_financials(frame, invalid)
+    passed = reasons == ""
+
+    valid = frame[passed].copy()
+    for column in FINANCIAL_AMOUNT_COLUMNS:
+        valid[column] = valid[column].round().astype("Int64")
+    valid.insert(0, "id", stock_code + "_" + valid["report_date"].dt.strftime("%Y-%m-%d"))
+    valid["report_date"] = valid["report_date"].dt.date
+
+    raw = df[~passed]
+    record_key = raw["报告期"].astype(str) if "报告期" in raw else pd.Series("", index=raw.index)
+    rejected = pd.DataFrame({
+        "id": "stock_financials:" + stock_code + "_" + record_key + "_" + raw.index.astype(str),
+        "dataset": "stock_financials",
+        "stock_code": stock_code,
+        "record_key": record_key.str.slice(0, 50),
+        "reasons": reasons[~passed].str.slice(0, 500),
+        "raw": [json.dumps(record, ensure_ascii=False, default=str) for record in raw.to_dict("records")],
+    }, index=raw.index)
+    return valid.reset_index(drop=True), rejected.reset_index(drop=True), find_period_gaps(frame[passed])
+
+def replace_quarantine(db: Session, dataset: str, stock_codes: List[str], rejected: pd.DataFrame) -> int:
+    """
+    用本次校验结果替换指定股票的隔离记录（已修正的记录随之移除），由调用方提交
+
+    Args:
+        db: 数据库会话
+        dataset: 目标表名
+        stock_codes: 本次处理的股票代码
+        rejected: 与 DataQuarantine 字段一致的隔离记录
+
+    Returns:
+        int: 写入的隔离记录条数
+    """
+    if not stock_codes:
+        return 0
+    db.query(DataQuarantine).filter(
+        DataQuarantine.dataset == dataset,
+        DataQuarantine.stock_code.in_(stock_codes),
+    ).delete(synchronize_session=False)
+    return bulk_upsert(db, DataQuarantine, rejected, update_columns=["reasons", "raw"])
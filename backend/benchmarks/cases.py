@@ -0,0 +1,652 @@
+import asyncio
+import subprocess
+import sys
+import time
+from typing import Dict, Any
+from sqlalchemy.orm import sessionmaker
+from app.datasources.base import set_data_source
+from app.datasources.fake import FakeDataSource
+from benchmarks.harness import benchmark, import_times, measure, summarize
+from benchmarks.synthetic import raw_financial_records
+
+# 选股 SQL：最新估值 + 最新报告期财务指标
+SCREENER_SQL = """
+SELECT
+    b.code,
+    b.name,
+    b.industry,
+    v.pe_ttm,
+    v.pb,
+    f.roe,
+    f.debt_ratio
+FROM stock_basic b
+JOIN stock_valuations v ON v.stock_code = b.code
+    AND v.date = (SELECT MAX(date) FROM stock_valuations WHERE stock_code = b.code)
+JOIN stock_financials f ON f.stock_code = b.code
+    AND f.report_date = (SELECT MAX(report_date) FROM stock_financials WHERE stock_code = b.code)
+WHERE v.pe_ttm < 20 AND f.roe > 10 AND f.debt_ratio < 60
+ORDER BY v.pe_ttm
+"""
+
+BENCH_CODE_BASE = 990000
+
+# request_coalescing 用例中每次数据库查询的模拟延迟（秒）与并发客户端数
+DB_LATENCY = 0.02
+CONCURRENT_CLIENTS = 64
+
+# API 进程启动时不应导入的模块（只在采集或图表请求时按需导入）
+HEAVY_MODULES = ["pandas", "numpy", "akshare"]
+
+def _sample_codes(context: Dict[str, Any], n: int = 10):
+    codes = context["market"]["stock_basic"]["code"].tolist()
+    step = max(1, len(codes) // n)
+    return codes[::step][:n]
+
+def _request_samples(client, method: str, url: str, repeat: int, **kwargs):
+    samples = []
+    response = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.request(method, url, **kwargs)
+        samples.append(time.perf_counter() - start)
+        response.raise_for_status()
+    return samples, response
+
+@benchmark("convert_financial_data")
+def bench_convert_financial_data(context: Dict[str, Any]) -> Dict[str, Any]:
+    """财务数据格式转换吞吐量"""
+    from app.utils.data_converter import convert_financial_data
+
+    records = raw_financial_records(context["market"]["stock_financials"].head(20000))
+
+    def run():
+        for record in records:
+            convert_financial_data(record)
+
+    stats = measure(run, repeat=context["repeat"])
+    stats["records"] = len(records)
+    stats["records_per_sec"] = len(records) / (stats["mean_ms"] / 1000)
+    return stats
+
+def _legacy_monthly_valuations(df):
+    """改为列式处理前的逐行实现，作为解析耗时的对照"""
+    import pandas as pd
+
+    df = df.copy()
+    df['trade_date'] = pd.to_datetime(df['trade_date'])
+    df['year_month'] = df['trade_date'].dt.to_period('M')
+    monthly_data = df.groupby('year_month').first().reset_index()
+    monthly_data['trade_date'] = monthly_data['trade_date'].dt.date
+    result = []
+    for _, row in monthly_data.iterrows():
+        result.append({
+            'date': row['trade_date'],
+            'pe_ttm': row['pe_ttm'],
+            'pb': row['pb'],
+            'ps_ttm': row['ps_ttm'],
+            'dividend_yield_ttm': row['dv_ttm'],
+        })
+    return result
+
+@benchmark("valuation_parse")
+def bench_valuation_parse(context: Dict[str, Any]) -> Dict[str, Any]:
+    """单只股票估值数据的解析耗时（月度采样到写库参数），对比逐行实现"""
+    from app.scripts.collect_valuation import monthly_valuations
+    from app.utils.bulk import frame_to_rows
+
+    daily = _fake_source(context).stock_a_indicator_lg("600000")
+    stats = measure(lambda: frame_to_rows(monthly_valuations(daily)), repeat=context["repeat"])
+    legacy = measure(lambda: _legacy_monthly_valuations(daily), repeat=context["repeat"])
+    stats["days"] = len(daily)
+    stats["legacy_mean_ms"] = legacy["mean_ms"]
+    stats["speedup"] = legacy["mean_ms"] / stats["mean_ms"]
+    return stats
+
+def _bench_stocks(db, n: int):
+    """创建不在合成市场中的基准测试股票，采集结果写入时不会与已有数据冲突"""
+    from app.models.stock import Stock
+
+    stocks = []
+    for i in range(n):
+        code = f"{BENCH_CODE_BASE + i:06d}"
+        stock = db.query(Stock).filter(Stock.code == code).first()
+        if not stock:
+            stock = Stock(code=code, name=f"基准测试{i}", market="A股")
+            db.add(stock)
+        stocks.append(stock)
+    db.commit()
+    return stocks
+
+def _run_collection(context: Dict[str, Any], process, model, source: FakeDataSource, n_stocks: int) -> Dict[str, Any]:
+    """
+    使用离线数据源逐只执行采集（获取 + 解析 + 写库），每轮开始前清空基准测试股票的数据
+
+    Args:
+        context: 测试上下文
+        process: 单只股票的采集函数，如 process_stock_valuation
+        model: 写入的模型，用于清理数据和统计行数
+        source: 离线数据源
+        n_stocks: 每轮采集的股票数量
+    """
+    Session = sessionmaker(bind=context["engine"])
+    samples = []
+    rows = 0
+    db = Session()
+    set_data_source(source)
+    try:
+        stocks = _bench_stocks(db, n_stocks)
+        codes = [stock.code for stock in stocks]
+        for _ in range(context["repeat"]):
+            db.query(model).filter(model.stock_code.in_(codes)).delete(synchronize_session=False)
+            db.commit()
+            start = time.perf_counter()
+            for stock in stocks:
+                asyncio.run(process(db, stock))
+            samples.append(time.perf_counter() - start)
+            rows = db.query(model).filter(model.stock_code.in_(codes)).count()
+        db.query(model).filter(model.stock_code.in_(codes)).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        set_data_source(None)
+        db.close()
+
+    stats = summarize(samples)
+    stats["stocks"] = n_stocks
+    stats["rows"] = rows
+    stats["stocks_per_sec"] = n_stocks / (stats["mean_ms"] / 1000)
+    stats["rows_per_sec"] = rows / (stats["mean_ms"] / 1000)
+    stats["upstream_calls"] = dict(source.calls)
+    stats["upstream_errors"] = dict(source.errors)
+    return stats
+
+def _fake_source(context: Dict[str, Any], **kwargs) -> FakeDataSource:
+    spec = context["spec"]
+    return FakeDataSource(seed=spec.seed, n_periods=spec.n_periods, n_days=spec.n_days, **kwargs)
+
+@benchmark("collector_write_valuations")
+def bench_collector_write_valuations(context: Dict[str, Any]) -> Dict[str, Any]:
+    """估值采集速率（离线数据源无延迟，衡量解析与写库）"""
+    from app.scripts.collect_valuation import process_stock_valuation
+    from app.models.valuation import StockValuation
+
+    return _run_collection(context, process_stock_valuation, StockValuation, _fake_source(context), 10)
+
+@benchmark("collector_write_financials")
+def bench_collector_write_financials(context: Dict[str, Any]) -> Dict[str, Any]:
+    """财务指标采集速率（离线数据源无延迟，含格式转换与写库）"""
+    from app.scripts.collect_data import process_stock_financial_indicators
+    from app.models.financial import FinancialIndicator
+
+    return _run_collection(
+        context, process_stock_financial_indicators, FinancialIndicator, _fake_source(context), 10
+    )
+
+@benchmark("collector_fetch_valuations")
+def bench_collector_fetch_valuations(context: Dict[str, Any]) -> Dict[str, Any]:
+    """估值采集速率（模拟上游延迟与随机错误，衡量并发与重试行为）"""
+    from app.scripts.collect_valuation import process_stock_valuation
+    from app.models.valuation import StockValuation
+
+    source = _fake_source(
+        context,
+        latency=context["upstream_latency"],
+        latency_jitter=context["upstream_latency"],
+        error_rate=context["upstream_error_rate"],
+    )
+    return _run_collection(context, process_stock_valuation, StockValuation, source, 10)
+
+@benchmark("collector_refresh")
+def bench_collector_refresh(context: Dict[str, Any]) -> Dict[str, Any]:
+    """财务、估值、分红三个数据集逐只串行刷新与并行刷新（共用限速与并发上限）的耗时"""
+    from app.scheduler.refresh import run_refresh
+    from app.models.dividend import StockDividend, StockDividendYearly
+    from app.models.financial import FinancialIndicator
+    from app.models.valuation import StockValuation
+
+    Session = sessionmaker(bind=context["engine"])
+    datasets = ["financials", "valuations", "dividends"]
+    models = [StockDividendYearly, StockDividend, StockValuation, FinancialIndicator]
+    db = Session()
+    source = _fake_source(context, latency=context["upstream_latency"], latency_jitter=context["upstream_latency"])
+    set_data_source(source)
+    samples_by_mode = {}
+    try:
+        codes = [stock.code for stock in _bench_stocks(db, 10)]
+        for mode, concurrency in (("serial", 1), ("parallel", 8)):
+            samples = []
+            for _ in range(context["repeat"]):
+                for model in models:
+                    db.query(model).filter(model.stock_code.in_(codes)).delete(synchronize_session=False)
+                db.commit()
+                start = time.perf_counter()
+                run_refresh(datasets, concurrency=concurrency, codes=codes, rate=0)
+                samples.append(time.perf_counter() - start)
+            samples_by_mode[mode] = samples
+        for model in models:
+            db.query(model).filter(model.stock_code.in_(codes)).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        set_data_source(None)
+        db.close()
+    stats = summarize(samples_by_mode["parallel"])
+    stats["serial_mean_ms"] = summarize(samples_by_mode["serial"])["mean_ms"]
+    stats["speedup"] = stats["serial_mean_ms"] / stats["mean_ms"]
+    stats["upstream_calls"] = dict(source.calls)
+    return stats
+
+@benchmark("feature_panel")
+def bench_feature_panel(context: Dict[str, Any]) -> Dict[str, Any]:
+    """研究进程获取全市场 股票 × 日期 × 指标 面板：从数据库查询并透视 vs 打开导出的内存映射矩阵"""
+    import pandas as pd
+    from app.export.features import export_panel, load_panel
+    from app.services.chart_service import SERIES_DATASETS
+
+    Session = sessionmaker(bind=context["engine"])
+    db = Session()
+    try:
+        export_samples = []
+        for _ in range(context["repeat"]):
+            start = time.perf_counter()
+            for dataset in SERIES_DATASETS:
+                export_panel(db, dataset, force=True)
+            export_samples.append(time.perf_counter() - start)
+    finally:
+        db.close()
+
+    def query_panels():
+        for table, date_column, metrics in SERIES_DATASETS.values():
+            df = pd.read_sql(f"SELECT stock_code, {date_column}, {', '.join(metrics)} FROM {table}", context["engine"])
+            df.pivot(index=date_column, columns="stock_code", values=metrics)
+
+    def load_panels():
+        for dataset, (_, _, metrics) in SERIES_DATASETS.items():
+            panel = load_panel(dataset)
+            for metric in metrics:
+                panel.frame(metric)
+
+    query = measure(query_panels, repeat=context["repeat"])
+    stats = measure(load_panels, repeat=context["repeat"])
+    stats["query_mean_ms"] = query["mean_ms"]
+    stats["export_mean_ms"] = summarize(export_samples)["mean_ms"]
+    stats["speedup"] = query["mean_ms"] / stats["mean_ms"]
+    return stats
+
+@benchmark("history_financials")
+def bench_history_financials(context: Dict[str, Any]) -> Dict[str, Any]:
+    """单只股票历史财务指标接口延迟"""
+    client = context["client"]
+    samples = []
+    for code in _sample_codes(context):
+        result, _ = _request_samples(client, "GET", f"/api/stock/{code}/financials?limit=100", context["repeat"])
+        samples.extend(result)
+    return summarize(samples)
+
+@benchmark("history_valuations")
+def bench_history_valuations(context: Dict[str, Any]) -> Dict[str, Any]:
+    """单只股票历史估值指标接口延迟"""
+    client = context["client"]
+    samples = []
+    for code in _sample_codes(context):
+        result, _ = _request_samples(client, "GET", f"/api/stock/{code}/valuations?limit=250", context["repeat"])
+        samples.extend(result)
+    return summarize(samples)
+
+@benchmark("history_polling")
+def bench_history_polling(context: Dict[str, Any]) -> Dict[str, Any]:
+    """轮询历史估值接口：完整响应、压缩响应与 304 重新验证的延迟和传输字节数"""
+    client = context["client"]
+    code = _sample_codes(context, 1)[0]
+    url = f"/api/stock/{code}/valuations?limit=250"
+    identity = {"Accept-Encoding": "identity"}
+    samples, response = _request_samples(client, "GET", url, context["repeat"], headers=identity)
+    stats = summarize(samples)
+    stats["full_bytes"] = len(response.content)
+    for encoding in ("gzip", "br"):
+        start = time.perf_counter()
+        with client.stream("GET", url, headers={"Accept-Encoding": encoding}) as response:
+            body = b"".join(response.iter_raw())
+        if response.headers.get("content-encoding") == encoding:
+            stats[f"{encoding}_ms"] = (time.perf_counter() - start) * 1000
+            stats[f"{encoding}_bytes"] = len(body)
+
+    etag = response.headers["etag"]
+    revalidate = []
+    for _ in range(context["repeat"]):
+        start = time.perf_counter()
+        response = client.get(url, headers={**identity, "If-None-Match": etag})
+        revalidate.append(time.perf_counter() - start)
+        assert response.status_code == 304
+    stats["not_modified_mean_ms"] = summarize(revalidate)["mean_ms"]
+    stats["not_modified_bytes"] = len(response.content)
+    return stats
+
+def _cpu_samples(client, method: str, url: str, repeat: int, **kwargs):
+    """每次请求的 CPU 时间（秒），TestClient 与应用在同一进程内，包含序列化开销"""
+    client.request(method, url, **kwargs).raise_for_status()
+    samples = []
+    for _ in range(repeat):
+        start = time.process_time()
+        client.request(method, url, **kwargs).raise_for_status()
+        samples.append(time.process_time() - start)
+    return samples
+
+@benchmark("response_serialization")
+def bench_response_serialization(context: Dict[str, Any]) -> Dict[str, Any]:
+    """orjson 直接序列化与 response_model 校验 + 默认 JSON 编码的单请求 CPU 时间对比"""
+    from app.core.config import settings
+
+    client = context["client"]
+    code = _sample_codes(context, 1)[0]
+    cases = {
+        "financials": ("GET", f"/api/stock/{code}/financials?limit=100", {}),
+        "valuations": ("GET", f"/api/stock/{code}/valuations?limit=250", {}),
+        "execute_sql": ("POST", "/api/stock/execute-sql", {
+            "json": {"sql": f"SELECT * FROM stock_valuations LIMIT {context['large_result_rows']}"}
+        }),
+    }
+    headers = {"Accept-Encoding": "identity"}
+    original = settings.FAST_JSON_RESPONSES
+    samples = {}
+    try:
+        for name, (method, url, kwargs) in cases.items():
+            for fast in (False, True):
+                settings.FAST_JSON_RESPONSES = fast
+                samples[name, fast] = _cpu_samples(client, method, url, context["repeat"], headers=headers, **kwargs)
+    finally:
+        settings.FAST_JSON_RESPONSES = original
+
+    # 以 /financials?limit=100 快速路径的 CPU 时间作为主指标
+    stats = summarize(samples["financials", True])
+    for name in cases:
+        validated = summarize(samples[name, False])["mean_ms"]
+        fast = summarize(samples[name, True])["mean_ms"]
+        stats[f"{name}_validated_cpu_ms"] = validated
+        stats[f"{name}_fast_cpu_ms"] = fast
+        stats[f"{name}_cpu_saved_ms"] = validated - fast
+    return stats
+
+@benchmark("pagination")
+def bench_pagination(context: Dict[str, Any]) -> Dict[str, Any]:
+    """历史估值首页与末页的延迟：游标分页与 /execute-sql OFFSET 分页对比"""
+    client = context["client"]
+    repeat = context["repeat"]
+    code = _sample_codes(context, 1)[0]
+    page_size = 50
+    headers = {"Accept-Encoding": "identity"}
+    url = f"/api/stock/{code}/valuations"
+
+    # 先翻到最后一页，记录最后一页的游标
+    cursors = [None]
+    while True:
+        params = {"limit": page_size, **({"cursor": cursors[-1]} if cursors[-1] else {})}
+        cursor = client.get(url, params=params, headers=headers).headers.get("x-next-cursor")
+        if not cursor:
+            break
+        cursors.append(cursor)
+
+    def offset_sql(page: int) -> Dict[str, Any]:
+        return {"sql": (
+            f"SELECT date, pe_ttm, pb, ps_ttm, dividend_yield_ttm FROM stock_valuations "
+            f"WHERE stock_code = '{code}' ORDER BY date DESC LIMIT {page_size} OFFSET {page * page_size}"
+        )}
+
+    first, _ = _request_samples(client, "GET", f"{url}?limit={page_size}", repeat, headers=headers)
+    last, _ = _request_samples(client, "GET", f"{url}?limit={page_size}&cursor={cursors[-1]}", repeat, headers=headers)
+    offset_first, _ = _request_samples(client, "POST", "/api/stock/execute-sql", repeat, json=offset_sql(0))
+    offset_last, _ = _request_samples(
+        client, "POST", "/api/stock/execute-sql", repeat, json=offset_sql(len(cursors) - 1)
+    )
+
+    stats = summarize(last)
+    stats["pages"] = len(cursors)
+    stats["keyset_first_ms"] = summarize(first)["mean_ms"]
+    stats["keyset_last_ms"] = stats["mean_ms"]
+    stats["offset_first_ms"] = summarize(offset_first)["mean_ms"]
+    stats["offset_last_ms"] = summarize(offset_last)["mean_ms"]
+    return stats
+
+@benchmark("api_cache")
+def bench_api_cache(context: Dict[str, Any]) -> Dict[str, Any]:
+    """查询缓存：命中延迟、按股票精确淘汰后的命中率"""
+    from app.cache.bus import get_bus, publish_invalidation
+    from app.cache.store import api_cache
+
+    client = context["client"]
+    codes = _sample_codes(context)
+    urls = [f"/api/stock/{code}/valuations?limit=250" for code in codes]
+    headers = {"Accept-Encoding": "identity"}
+    original_ttl = api_cache.ttl
+    api_cache.ttl = 3600
+    api_cache.clear()
+    get_bus().subscribe(api_cache.invalidate)
+    try:
+        cold, _ = _request_samples(client, "GET", urls[0], 1, headers=headers)
+        stats = summarize(
+            [sample for url in urls for sample in _request_samples(client, "GET", url, context["repeat"], headers=headers)[0]]
+        )
+        stats["cold_ms"] = cold[0] * 1000
+
+        # 一只股票的数据变化只淘汰该股票的条目，其余股票仍然命中
+        before = dict(api_cache.stats)
+        publish_invalidation("stock_valuations", [codes[0]])
+        for url in urls:
+            client.get(url, headers=headers).raise_for_status()
+        hits = api_cache.stats["hits"] - before["hits"]
+        misses = api_cache.stats["misses"] - before["misses"]
+        stats["hit_rate_after_invalidation"] = hits / (hits + misses)
+        stats["entries"] = len(api_cache)
+    finally:
+        get_bus().handlers.remove(api_cache.invalidate)
+        api_cache.ttl = original_ttl
+        api_cache.clear()
+    return stats
+
+@benchmark("request_coalescing")
+def bench_request_coalescing(context: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    热门股票并发请求：Zipf 分布访问 /basic 与 /valuations 时合并并发查询前后的数据库查询次数与 QPS
+
+    SQLite 查询只需约 1 毫秒，并发请求几乎不会重叠；每次查询额外等待 DB_LATENCY 模拟高峰时远程数据库的往返与排队。
+    """
+    import asyncio
+    import httpx
+    import numpy as np
+    from sqlalchemy import event
+    from app.cache.store import api_cache
+    from app.main import app
+
+    codes = context["market"]["stock_basic"]["code"].tolist()
+    rng = np.random.default_rng(0)
+    weights = 1.0 / np.arange(1, len(codes) + 1) ** 1.2
+    picks = rng.choice(len(codes), size=40 * context["repeat"], p=weights / weights.sum())
+    urls = [
+        f"/api/stock/{codes[i]}/basic" if n % 2 else f"/api/stock/{codes[i]}/valuations?limit=250"
+        for n, i in enumerate(picks)
+    ]
+    queries = []
+
+    def count_query(*args):
+        queries.append(1)
+        time.sleep(DB_LATENCY)
+
+    event.listen(context["engine"], "before_cursor_execute", count_query)
+
+    async def fetch_all(limit: int):
+        # 与单个 uvicorn 进程相同：一个事件循环接收全部请求，同步接口在线程池中执行
+        transport = httpx.ASGITransport(app=app)
+        semaphore = asyncio.Semaphore(limit)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def fetch(url):
+                async with semaphore:
+                    start = time.perf_counter()
+                    (await client.get(url)).raise_for_status()
+                    return time.perf_counter() - start
+            return await asyncio.gather(*(fetch(url) for url in urls))
+
+    def run(coalesce: bool) -> Dict[str, Any]:
+        api_cache.coalesce = coalesce
+        before = dict(api_cache.stats)
+        queries.clear()
+        start = time.perf_counter()
+        samples = asyncio.run(fetch_all(CONCURRENT_CLIENTS))
+        elapsed = time.perf_counter() - start
+        stats = summarize(samples)
+        stats["requests_per_second"] = len(urls) / elapsed
+        stats["db_queries"] = len(queries)
+        stats["db_qps"] = len(queries) / elapsed
+        loads = api_cache.stats["loads"] - before["loads"]
+        coalesced = api_cache.stats["coalesced"] - before["coalesced"]
+        stats["coalescing_ratio"] = coalesced / (loads + coalesced)
+        return stats
+
+    original = api_cache.coalesce
+    try:
+        baseline = run(False)
+        stats = run(True)
+    finally:
+        api_cache.coalesce = original
+        event.remove(context["engine"], "before_cursor_execute", count_query)
+    stats["requests"] = len(urls)
+    stats["distinct_urls"] = len(set(urls))
+    for key in ("mean_ms", "p95_ms", "requests_per_second", "db_queries", "db_qps"):
+        stats[f"uncoalesced_{key}"] = baseline[key]
+    return stats
+
+@benchmark("chart_overlay")
+def bench_chart_overlay(context: Dict[str, Any]) -> Dict[str, Any]:
+    """10 只股票估值叠加图：逐只请求 /valuations 与一次请求 /chart/series 的延迟和传输字节数"""
+    client = context["client"]
+    codes = _sample_codes(context)
+    headers = {"Accept-Encoding": "identity"}
+
+    per_stock = []
+    per_stock_bytes = 0
+    for _ in range(context["repeat"]):
+        start = time.perf_counter()
+        per_stock_bytes = 0
+        for code in codes:
+            response = client.get(f"/api/stock/{code}/valuations?limit=1000", headers=headers)
+            response.raise_for_status()
+            per_stock_bytes += len(response.content)
+        per_stock.append(time.perf_counter() - start)
+
+    url = f"/api/chart/series?codes={','.join(codes)}&metrics=pe_ttm"
+    cold, _ = _request_samples(client, "GET", url, 1, headers=headers)
+    samples, response = _request_samples(client, "GET", url, context["repeat"], headers=headers)
+    stats = summarize(samples)
+    stats["cold_ms"] = cold[0] * 1000
+    stats["bytes"] = len(response.content)
+    stats["per_stock_requests_mean_ms"] = summarize(per_stock)["mean_ms"]
+    stats["per_stock_requests_bytes"] = per_stock_bytes
+    return stats
+
+# API 进程启动：导入应用并执行 lifespan（创建引擎、订阅数据变更通知）
+_API_BOOT = """
+import asyncio
+from app.main import app
+
+async def boot():
+    async with app.router.lifespan_context(app):
+        pass
+
+asyncio.run(boot())
+"""
+
+def _process_samples(args, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], check=True, capture_output=True)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+@benchmark("startup")
+def bench_startup(context: Dict[str, Any]) -> Dict[str, Any]:
+    """API 工作进程启动与命令行启动耗时（新进程，含解释器启动）"""
+    stats = summarize(_process_samples(["-c", _API_BOOT], context["repeat"]))
+    stats["cli_help_mean_ms"] = summarize(
+        _process_samples(["-m", "app.scheduler.main", "--help"], context["repeat"])
+    )["mean_ms"]
+    api_imports = import_times("app.main")
+    stats["api_import_ms"] = api_imports["app.main"]
+    stats["api_heavy_modules"] = sorted(name for name in HEAVY_MODULES if name in api_imports)
+    return stats
+
+@benchmark("execute_sql_large")
+def bench_execute_sql_large(context: Dict[str, Any]) -> Dict[str, Any]:
+    """/execute-sql 大结果集开销"""
+    limit = context["large_result_rows"]
+    samples, response = _request_samples(
+        context["client"], "POST", "/api/stock/execute-sql", context["repeat"],
+        json={"sql": f"SELECT * FROM stock_valuations LIMIT {limit}"},
+    )
+    stats = summarize(samples)
+    stats["rows"] = len(response.json())
+    stats["payload_bytes"] = len(response.content)
+    return stats
+
+@benchmark("screener")
+def bench_screener(context: Dict[str, Any]) -> Dict[str, Any]:
+    """选股查询延迟（最新估值 + 最新财务指标）"""
+    samples, response = _request_samples(
+        context["client"], "POST", "/api/stock/execute-sql", context["repeat"],
+        json={"sql": SCREENER_SQL},
+    )
+    stats = summarize(samples)
+    stats["rows"] = len(response.json())
+    return stats
+
+@benchmark("sql_result_cache")
+def bench_sql_result_cache(context: Dict[str, Any]) -> Dict[str, Any]:
+    """/execute-sql 结果缓存：选股查询命中延迟与未缓存执行对比，依赖表更新后重新执行"""
+    from app.cache.bus import get_bus, publish_invalidation
+    from app.cache.results import sql_cache, table_versions
+
+    client = context["client"]
+    url = "/api/stock/execute-sql"
+    body = {"sql": SCREENER_SQL}
+    original_ttl = sql_cache.ttl
+    sql_cache.ttl = 3600
+    sql_cache.clear()
+    get_bus().subscribe(table_versions.bump)
+    try:
+        uncached, _ = _request_samples(
+            client, "POST", url, context["repeat"], json=body, headers={"Cache-Control": "no-cache, no-store"}
+        )
+        client.post(url, json=body).raise_for_status()
+        samples, response = _request_samples(client, "POST", url, context["repeat"], json=body)
+        assert response.headers["X-Cache"] == "HIT"
+        stats = summarize(samples)
+        stats["uncached_mean_ms"] = summarize(uncached)["mean_ms"]
+        stats["stored_bytes"] = sql_cache.size
+        stats["payload_bytes"] = len(response.content)
+
+        # 未引用的表更新不影响命中，引用的表更新后重新执行
+        publish_invalidation("stock_dividends", None)
+        stats["hit_after_unrelated_update"] = client.post(url, json=body).headers["X-Cache"] == "HIT"
+        publish_invalidation("stock_valuations", None)
+        stats["hit_after_related_update"] = client.post(url, json=body).headers["X-Cache"] == "HIT"
+    finally:
+        get_bus().handlers.remove(table_versions.bump)
+        sql_cache.ttl = original_ttl
+        sql_cache.clear()
+    return stats
+
+@benchmark("as_of_screen")
+def bench_as_of_screen(context: Dict[str, Any]) -> Dict[str, Any]:
+    """全市场时点选股延迟（截至历史日期已披露的最新财务指标 + 当日估值），对比使用最新数据的选股"""
+    import pandas as pd
+
+    days = pd.bdate_range(end=context["spec"].end_date, periods=context["spec"].n_days)
+    as_of = days[len(days) // 2].date().isoformat()
+    samples, response = _request_samples(
+        context["client"], "GET", f"/api/screener/as-of?as_of={as_of}&limit=10000", context["repeat"]
+    )
+    latest, _ = _request_samples(
+        context["client"], "POST", "/api/stock/execute-sql", context["repeat"], json={"sql": SCREENER_SQL},
+    )
+    stats = summarize(samples)
+    stats["as_of"] = as_of
+    stats["rows"] = len(response.json())
+    stats["latest_screen_mean_ms"] = summarize(latest)["mean_ms"]
+    return stats
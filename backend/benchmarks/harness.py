@@ -0,0 +1,130 @@
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional
+
+# 已注册的基准测试：名称 -> 函数(context) -> 结果字典
+BENCHMARKS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {}
+
+def benchmark(name: str):
+    """注册基准测试的装饰器"""
+    def decorator(func: Callable[[Dict[str, Any]], Dict[str, Any]]):
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """将耗时样本（秒）汇总为毫秒统计"""
+    ordered = sorted(samples)
+    p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+    return {
+        "runs": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p95_ms": ordered[p95_index] * 1000,
+        "min_ms": ordered[0] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+def measure(func: Callable[[], Any], repeat: int = 5, warmup: int = 1) -> Dict[str, float]:
+    """
+    重复执行函数并统计耗时
+
+    Args:
+        func: 被测函数
+        repeat: 计时次数
+        warmup: 预热次数（不计时）
+
+    Returns:
+        Dict[str, float]: 耗时统计
+    """
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+def import_times(module: str, cwd: Optional[str] = None) -> Dict[str, float]:
+    """
+    在新进程中用 python -X importtime 导入模块
+
+    Args:
+        module: 模块名
+        cwd: 运行目录（backend 目录），默认为当前目录
+
+    Returns:
+        Dict[str, float]: 导入过程中加载的每个模块 -> 累计导入耗时（毫秒）
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True, cwd=cwd,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) == 3 and fields[1].strip().isdigit():
+            times[fields[2].strip()] = int(fields[1]) / 1000
+    return times
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def build_report(results: Dict[str, Any], meta: Dict[str, Any]) -> Dict[str, Any]:
+    """组装结果报告"""
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            **meta,
+        },
+        "results": results,
+    }
+
+def save_report(report: Dict[str, Any], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """
+    对比两份报告，找出性能回退项
+
+    以 mean_ms 为准，当前值比基线慢超过 threshold 比例时视为回退。
+
+    Args:
+        baseline: 基线报告
+        current: 当前报告
+        threshold: 允许的相对变慢比例
+
+    Returns:
+        List[Dict[str, Any]]: 回退项列表
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if not base or "mean_ms" not in base or "mean_ms" not in result:
+            continue
+        if base["mean_ms"] <= 0:
+            continue
+        change = result["mean_ms"] / base["mean_ms"] - 1
+        if change > threshold:
+            regressions.append({
+                "name": name,
+                "baseline_ms": base["mean_ms"],
+                "current_ms": result["mean_ms"],
+                "change": change,
+            })
+    return regressions
@@ -0,0 +1,113 @@
+"""
+基准测试入口
+
+用法（在 backend 目录下执行）:
+    python -m benchmarks.run --stocks 100 --periods 40 --days 750 --output bench.json
+    python -m benchmarks.run --database-url postgresql://user:pw@db:5432/stockbench
+    python -m benchmarks.run --baseline bench_v1.json --output bench_v2.json
+
+注意：--database-url 指向的数据库会被清空重建，只能使用专用的基准测试库。
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="股票分析系统基准测试")
+    parser.add_argument("--stocks", type=int, default=100, help="合成股票数量")
+    parser.add_argument("--periods", type=int, default=40, help="每只股票的报告期数量")
+    parser.add_argument("--days", type=int, default=750, help="每只股票的日度估值数量")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--repeat", type=int, default=5, help="每项测试的计时次数")
+    parser.add_argument("--large-result-rows", type=int, default=50000, help="/execute-sql 大结果集行数")
+    parser.add_argument("--upstream-latency", type=float, default=0.01, help="离线数据源模拟延迟（秒）")
+    parser.add_argument("--upstream-error-rate", type=float, default=0.1, help="离线数据源模拟错误率")
+    parser.add_argument("--database-url", help="数据库地址，默认使用临时 SQLite 文件")
+    parser.add_argument("--only", nargs="*", help="只运行指定名称的测试")
+    parser.add_argument("--output", help="结果 JSON 输出路径")
+    parser.add_argument("--baseline", help="用于对比的基线结果 JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="判定为回退的相对变慢比例")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    database_url = args.database_url or "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="stock-bench-"), "bench.db")
+    # 必须在导入 app 之前设置，app.core.config 在导入时读取环境变量
+    os.environ["DATABASE_URL"] = database_url
+    for key in ("POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB"):
+        os.environ.setdefault(key, "bench")
+    os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+    # 重试等待缩短为毫秒级，避免注入错误时测试耗时被等待时间主导
+    os.environ.setdefault("COLLECTOR_RETRY_DELAY", "0.01")
+    # 接口类测试默认测量未缓存的查询路径，api_cache 用例单独开启缓存
+    os.environ.setdefault("API_CACHE_TTL", "0")
+    os.environ.setdefault("SQL_CACHE_TTL", "0")
+    os.environ.setdefault("INVALIDATION_BACKEND", "local")
+    os.environ.setdefault("SERIES_CACHE_DIR", tempfile.mkdtemp(prefix="stock-bench-series-"))
+    os.environ.setdefault("FEATURE_EXPORT_DIR", tempfile.mkdtemp(prefix="stock-bench-features-"))
+
+    from fastapi.testclient import TestClient
+    from app.db.session import engine
+    from app.main import app
+    from benchmarks import cases  # noqa: F401  注册测试用例
+    from benchmarks.harness import BENCHMARKS, build_report, save_report, compare_reports
+    from benchmarks.synthetic import MarketSpec, generate_market, load_market
+
+    # 采集脚本逐行打印日志（注入错误时还有重试警告），计时时关闭以免日志 I/O 干扰结果
+    logging.disable(logging.WARNING)
+
+    spec = MarketSpec(n_stocks=args.stocks, n_periods=args.periods, n_days=args.days, seed=args.seed)
+    market = generate_market(spec)
+    row_counts = load_market(engine, market)
+    print(f"已写入合成数据: {row_counts} ({engine.dialect.name})", file=sys.stderr)
+
+    context = {
+        "engine": engine,
+        "market": market,
+        "spec": spec,
+        "repeat": args.repeat,
+        "large_result_rows": args.large_result_rows,
+        "upstream_latency": args.upstream_latency,
+        "upstream_error_rate": args.upstream_error_rate,
+        "client": TestClient(app),
+    }
+
+    results = {}
+    for name, func in BENCHMARKS.items():
+        if args.only and name not in args.only:
+            continue
+        print(f"运行 {name} ...", file=sys.stderr)
+        results[name] = func(context)
+        print(f"  mean {results[name]['mean_ms']:.2f} ms  p95 {results[name]['p95_ms']:.2f} ms", file=sys.stderr)
+
+    report = build_report(results, {
+        "dialect": engine.dialect.name,
+        "spec": spec.to_dict(),
+        "row_counts": row_counts,
+        "repeat": args.repeat,
+    })
+    if args.output:
+        save_report(report, args.output)
+    else:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_reports(baseline, report, args.threshold)
+        for item in regressions:
+            print(
+                f"性能回退: {item['name']} {item['baseline_ms']:.2f} ms -> {item['current_ms']:.2f} ms "
+                f"(+{item['change']:.0%})",
+                file=sys.stderr,
+            )
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
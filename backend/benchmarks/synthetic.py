@@ -0,0 +1,146 @@
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Dict, Any, List
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from app.datasources.fake import INDUSTRIES, AMOUNT_COLUMNS, PERCENT_COLUMNS, synthetic_codes, format_amount
+from app.utils.data_converter import FINANCIAL_FIELD_MAP
+from app.utils.point_in_time import validity_intervals
+
+@dataclass
+class MarketSpec:
+    """合成市场规模参数"""
+    n_stocks: int = 100
+    n_periods: int = 40
+    n_days: int = 750
+    seed: int = 42
+    end_date: str = "2024-12-31"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+def generate_market(spec: MarketSpec) -> Dict[str, pd.DataFrame]:
+    """
+    按数据库表结构生成合成市场数据
+
+    Args:
+        spec: 市场规模参数
+
+    Returns:
+        Dict[str, pd.DataFrame]: 表名到数据的映射，列名与模型字段一致
+    """
+    rng = np.random.default_rng(spec.seed)
+    now = datetime.utcnow()
+    codes = synthetic_codes(spec.n_stocks)
+
+    stocks = pd.DataFrame({
+        "code": codes,
+        "name": [f"合成{i:04d}" for i in range(spec.n_stocks)],
+        "industry": rng.choice(INDUSTRIES, size=spec.n_stocks),
+        "market": "A股",
+        "listing_date": pd.Timestamp("2000-01-04").date(),
+    })
+
+    # 财务指标：每只股票 n_periods 个季度报告期
+    periods = pd.date_range(end=spec.end_date, periods=spec.n_periods, freq="Q")
+    n_rows = spec.n_stocks * spec.n_periods
+    financials = pd.DataFrame({
+        "stock_code": np.repeat(codes, spec.n_periods),
+        "report_date": np.tile(periods.date, spec.n_stocks),
+    })
+    financials["id"] = financials["stock_code"] + "_" + financials["report_date"].astype(str)
+    for column in AMOUNT_COLUMNS:
+        financials[column] = rng.integers(10**6, 10**11, size=n_rows)
+    for column in PERCENT_COLUMNS:
+        financials[column] = rng.normal(10, 15, size=n_rows).round(2)
+    financials["debt_ratio"] = rng.uniform(5, 95, size=n_rows).round(2)
+    for column in FINANCIAL_FIELD_MAP:
+        if column not in financials:
+            financials[column] = rng.uniform(0.1, 50, size=n_rows).round(4)
+
+    # 估值指标：每只股票 n_days 个交易日
+    days = pd.bdate_range(end=spec.end_date, periods=spec.n_days)
+    n_rows = spec.n_stocks * spec.n_days
+    valuations = pd.DataFrame({
+        "stock_code": np.repeat(codes, spec.n_days),
+        "date": np.tile(days.date, spec.n_stocks),
+        "pe_ttm": rng.lognormal(3, 0.6, size=n_rows).round(2),
+        "pb": rng.lognormal(0.7, 0.5, size=n_rows).round(3),
+        "ps_ttm": rng.lognormal(1, 0.7, size=n_rows).round(3),
+        "dividend_yield_ttm": rng.uniform(0, 6, size=n_rows).round(3),
+    })
+    valuations["id"] = valuations["stock_code"] + "_" + valuations["date"].astype(str)
+
+    # 时点有效区间：由报告期按披露截止日推算
+    validity = validity_intervals(financials)
+
+    for df in (stocks, financials, valuations, validity):
+        df["created_at"] = now
+        df["updated_at"] = now
+
+    return {
+        "stock_basic": stocks,
+        "stock_financials": financials,
+        "stock_valuations": valuations,
+        "stock_financial_validity": validity,
+    }
+
+def raw_financial_records(financials: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    将合成财务指标还原为同花顺财务摘要的原始格式（带单位和百分号的字符串）
+
+    Args:
+        financials: generate_market 生成的 stock_financials 数据
+
+    Returns:
+        List[Dict[str, Any]]: 与 ak.stock_financial_abstract_ths 一致的记录列表
+    """
+    records = []
+    for row in financials.to_dict(orient="records"):
+        record = {"报告期": str(row["report_date"])}
+        for column, field in FINANCIAL_FIELD_MAP.items():
+            value = row[column]
+            if column in AMOUNT_COLUMNS:
+                record[field] = format_amount(value)
+            elif column in PERCENT_COLUMNS:
+                record[field] = f"{value}%"
+            else:
+                record[field] = str(value)
+        # 保留真实数据中常见的缺失值形式
+        record["营业周期"] = False
+        records.append(record)
+    return records
+
+def load_market(engine: Engine, market: Dict[str, pd.DataFrame], chunk_size: int = 5000) -> Dict[str, int]:
+    """
+    重建表结构并写入合成数据
+
+    注意：会删除并重建所有表，只能指向专用的基准测试数据库。
+
+    Args:
+        engine: 目标数据库引擎（PostgreSQL 或 SQLite）
+        market: generate_market 的返回值
+        chunk_size: 每批写入的行数
+
+    Returns:
+        Dict[str, int]: 每张表写入的行数
+    """
+    from app.db.base import Base
+    from app.models.stock import Stock
+    from app.models.financial import FinancialIndicator, FinancialValidity
+    from app.models.valuation import StockValuation
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    counts = {}
+    with engine.begin() as conn:
+        for model in (Stock, FinancialIndicator, StockValuation, FinancialValidity):
+            df = market[model.__tablename__]
+            records = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+            for start in range(0, len(records), chunk_size):
+                conn.execute(insert(model.__table__), records[start:start + chunk_size])
+            counts[model.__tablename__] = len(records)
+    return counts
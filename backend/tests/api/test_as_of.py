@@ -0,0 +1,86 @@
+from datetime import date
+import pandas as pd
+from fastapi.testclient import TestClient
+from app.main import app
+from app.db.session import SessionLocal
+from app.models.financial import FinancialIndicator, FinancialValidity
+from app.models.stock import Stock
+from app.models.valuation import StockValuation
+from app.utils.point_in_time import OPEN_END, backfill_financial_validity, validity_intervals
+
+CODE = "980601"
+REPORTS = [date(2022, 9, 30), date(2022, 12, 31), date(2023, 3, 31)]
+
+def test_validity_intervals_follow_disclosure_deadlines():
+    """测试按披露截止日计算有效区间，与一季报同日披露的年报区间为空"""
+    intervals = validity_intervals(pd.DataFrame({"stock_code": CODE, "report_date": REPORTS}))
+    assert intervals[["report_date", "valid_from", "valid_to"]].values.tolist() == [
+        [date(2022, 9, 30), date(2022, 10, 31), date(2023, 4, 30)],
+        [date(2022, 12, 31), date(2023, 4, 30), date(2023, 4, 30)],
+        [date(2023, 3, 31), date(2023, 4, 30), OPEN_END],
+    ]
+
+def test_as_of_screen_and_history_exclude_unpublished_reports():
+    """测试时点选股和历史接口只使用截至该日已披露的报告期和当时的估值"""
+    db = SessionLocal()
+    try:
+        db.add(Stock(code=CODE, name="时点测试", industry="时点行业", market="A股"))
+        db.add_all([
+            FinancialIndicator(id=f"{CODE}_{day}", stock_code=CODE, report_date=day, roe=float(i + 1))
+            for i, day in enumerate(REPORTS)
+        ])
+        db.add_all([
+            StockValuation(id=f"{CODE}_{day}", stock_code=CODE, date=day, pe_ttm=pe)
+            for day, pe in [(date(2023, 4, 3), 10.0), (date(2023, 5, 4), 12.0)]
+        ])
+        db.commit()
+        assert backfill_financial_validity(db) == 1
+
+        client = TestClient(app)
+        params = {"as_of": "2023-04-29", "industry": "时点行业"}
+        rows = client.get("/api/screener/as-of", params=params).json()
+        assert [(row["report_date"], row["roe"], row["valuation_date"], row["pe_ttm"]) for row in rows] == [
+            ("2022-09-30", 1.0, "2023-04-03", 10.0)
+        ]
+        rows = client.get("/api/screener/as-of", params={**params, "as_of": "2023-05-10"}).json()
+        assert [(row["report_date"], row["published_date"], row["pe_ttm"]) for row in rows] == [
+            ("2023-03-31", "2023-04-30", 12.0)
+        ]
+        assert client.get("/api/screener/as-of", params={**params, "min_roe": 5}).json() == []
+
+        history = client.get(f"/api/stock/{CODE}/financials", params={"as_of": "2023-04-29"}).json()
+        assert [row["report_date"] for row in history] == ["2022-09-30"]
+        assert len(client.get(f"/api/stock/{CODE}/financials").json()) == 3
+    finally:
+        for model in (FinancialValidity, FinancialIndicator, StockValuation):
+            db.query(model).filter(model.stock_code == CODE).delete(synchronize_session=False)
+        db.query(Stock).filter(Stock.code == CODE).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+def test_as_of_responses_refresh_after_validity_backfill():
+    """测试补算有效区间（只发布有效区间表的变更通知）后，时点查询的缓存和 ETag 随之更新"""
+    db = SessionLocal()
+    try:
+        db.add(Stock(code=CODE, name="时点测试", industry="时点行业", market="A股"))
+        db.add(FinancialIndicator(id=f"{CODE}_{REPORTS[0]}", stock_code=CODE, report_date=REPORTS[0], roe=1.0))
+        db.commit()
+
+        client = TestClient(app)
+        url = f"/api/stock/{CODE}/financials"
+        params = {"as_of": "2023-01-01"}
+        before = client.get(url, params=params)
+        assert before.json() == []
+        screen = {"as_of": "2023-01-01", "industry": "时点行业"}
+        assert client.get("/api/screener/as-of", params=screen).json() == []
+
+        assert backfill_financial_validity(db) == 1
+        after = client.get(url, params=params, headers={"If-None-Match": before.headers["etag"]})
+        assert after.status_code == 200 and [row["report_date"] for row in after.json()] == ["2022-09-30"]
+        assert [row["code"] for row in client.get("/api/screener/as-of", params=screen).json()] == [CODE]
+    finally:
+        for model in (FinancialValidity, FinancialIndicator):
+            db.query(model).filter(model.stock_code == CODE).delete(synchronize_session=False)
+        db.query(Stock).filter(Stock.code == CODE).delete(synchronize_session=False)
+        db.commit()
+        db.close()
@@ -0,0 +1,75 @@
+import gzip
+from datetime import date, datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api.compression import brotli
+from app.cache.bus import publish_invalidation
+from app.db.session import SessionLocal
+from app.models.stock import Stock
+from app.models.valuation import StockValuation
+
+CODE = "980201"
+
+@pytest.fixture
+def valuations():
+    db = SessionLocal()
+    db.add(Stock(code=CODE, name="缓存测试", market="A股"))
+    db.add_all([
+        StockValuation(id=f"{CODE}_{month}", stock_code=CODE, date=date(2020 + month // 12, month % 12 + 1, 1), pe_ttm=10.0 + month)
+        for month in range(120)
+    ])
+    db.commit()
+    try:
+        yield db
+    finally:
+        db.query(StockValuation).filter(StockValuation.stock_code == CODE).delete()
+        db.query(Stock).filter(Stock.code == CODE).delete()
+        db.commit()
+        db.close()
+
+def test_etag_and_last_modified(valuations):
+    """测试未变化的数据返回 304，数据更新后 ETag 变化"""
+    client = TestClient(app)
+    url = f"/api/stock/{CODE}/valuations?limit=5"
+    response = client.get(url)
+    etag = response.headers["etag"]
+    assert response.status_code == 200
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    assert "last-modified" in response.headers
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert client.get(url, headers={"If-Modified-Since": response.headers["last-modified"]}).status_code == 304
+    # 不同的查询参数对应不同的 ETag
+    assert client.get(f"{url}0", headers={"If-None-Match": etag}).status_code == 200
+
+    valuations.query(StockValuation).filter(StockValuation.id == f"{CODE}_0").update(
+        {"pe_ttm": 99.0, "updated_at": datetime.utcnow() + timedelta(seconds=2)}
+    )
+    valuations.commit()
+    publish_invalidation("stock_valuations", [CODE])
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+def test_compression(valuations):
+    """测试大响应按 Accept-Encoding 压缩，小响应不压缩"""
+    client = TestClient(app)
+    url = f"/api/stock/{CODE}/valuations?limit=120"
+    plain = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+    encodings = [("gzip", gzip.decompress)]
+    if brotli is not None:
+        encodings.append(("br", brotli.decompress))
+    for encoding, decompress in encodings:
+        with client.stream("GET", url, headers={"Accept-Encoding": encoding}) as response:
+            body = b"".join(response.iter_raw())
+        assert response.headers["content-encoding"] == encoding
+        assert len(body) < len(plain.content)
+        assert decompress(body) == plain.content
+
+    small = client.get(f"/api/stock/{CODE}/valuations?limit=1", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
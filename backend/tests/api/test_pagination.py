@@ -0,0 +1,87 @@
+from datetime import date
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api.pagination import encode_cursor
+from app.db.session import SessionLocal
+from app.models.stock import Stock
+from app.models.valuation import StockValuation
+
+CODES = [f"98040{i}" for i in range(7)]
+
+@pytest.fixture
+def universe():
+    db = SessionLocal()
+    db.add_all([
+        Stock(code=code, name=f"分页{code}", market="A股", industry="分页测试" if i % 2 == 0 else "其他")
+        for i, code in enumerate(CODES)
+    ])
+    db.add_all([
+        StockValuation(id=f"{CODES[0]}_{month}", stock_code=CODES[0], date=date(2015 + month // 12, month % 12 + 1, 1))
+        for month in range(95)
+    ])
+    db.commit()
+    try:
+        yield
+    finally:
+        db.query(StockValuation).filter(StockValuation.stock_code.in_(CODES)).delete(synchronize_session=False)
+        db.query(Stock).filter(Stock.code.in_(CODES)).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+def test_history_keyset_pagination(universe):
+    """测试历史估值按游标翻页，覆盖全部记录且不重复"""
+    client = TestClient(app)
+    url = f"/api/stock/{CODES[0]}/valuations"
+    dates, cursor = [], None
+    while True:
+        response = client.get(url, params={"limit": 20, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        dates.extend(item["date"] for item in response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    assert len(dates) == 95
+    assert dates == sorted(set(dates), reverse=True)
+
+def test_invalid_cursor(universe):
+    """测试无效游标和其他查询的游标返回 400"""
+    client = TestClient(app)
+    url = f"/api/stock/{CODES[0]}/valuations"
+    assert client.get(url, params={"cursor": "not-a-cursor"}).status_code == 400
+    other = encode_cursor(f"valuations:{CODES[1]}", ["2020-01-01"])
+    assert client.get(url, params={"cursor": other}).status_code == 400
+
+def test_stock_list_filters_and_pages(universe):
+    """测试股票列表按行业筛选并分页"""
+    client = TestClient(app)
+    codes, cursor = [], None
+    while True:
+        params = {"industry": "分页测试", "limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/stock/list", params=params).json()
+        codes.extend(item["code"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert codes == CODES[::2]
+    assert client.get("/api/stock/list", params={"limit": 0}).status_code == 422
+
+def test_history_limit_bounds(universe):
+    """测试历史接口的每页条数限制在 1~1000"""
+    client = TestClient(app)
+    for endpoint in ("valuations", "financials"):
+        url = f"/api/stock/{CODES[0]}/{endpoint}"
+        for limit in (0, -1, 1001):
+            assert client.get(url, params={"limit": limit}).status_code == 422
+        assert client.get(url, params={"limit": 1000}).status_code == 200
+    assert len(client.get(f"/api/stock/{CODES[0]}/valuations", params={"limit": 1}).json()) == 1
+
+def test_dividend_limit_bounds(universe):
+    """测试分红记录与连续分红选股的条数限制在 1~1000"""
+    client = TestClient(app)
+    for url in (f"/api/stock/{CODES[0]}/dividends", "/api/screener/dividend-streak"):
+        for limit in (0, -1, 1001):
+            assert client.get(url, params={"limit": limit}).status_code == 422
+        assert client.get(url, params={"limit": 1000}).status_code == 200
@@ -0,0 +1,51 @@
+from datetime import date
+from decimal import Decimal
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api.responses import FastJSONResponse
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.financial import FinancialIndicator
+from app.models.stock import Stock
+
+CODE = "980301"
+
+@pytest.fixture
+def financials():
+    db = SessionLocal()
+    db.add(Stock(code=CODE, name="序列化测试", market="A股"))
+    db.add_all([
+        FinancialIndicator(
+            id=f"{CODE}_{year}", stock_code=CODE, report_date=date(year, 12, 31),
+            net_profit=10 ** 9 + year, roe=12.5, debt_ratio=None
+        )
+        for year in range(2015, 2025)
+    ])
+    db.commit()
+    try:
+        yield
+    finally:
+        db.query(FinancialIndicator).filter(FinancialIndicator.stock_code == CODE).delete()
+        db.query(Stock).filter(Stock.code == CODE).delete()
+        db.commit()
+        db.close()
+
+def test_fast_path_matches_validated_response(financials, monkeypatch):
+    """测试 orjson 快速路径与 response_model 校验路径返回相同的数据和缓存头"""
+    client = TestClient(app)
+    url = f"/api/stock/{CODE}/financials?limit=100"
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", False)
+    validated = client.get(url)
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+    fast = client.get(url)
+
+    assert fast.status_code == validated.status_code == 200
+    assert fast.json() == validated.json()
+    assert fast.json()[0]["report_date"] == "2024-12-31"
+    assert fast.headers["etag"] == validated.headers["etag"]
+    assert fast.headers["content-type"] == "application/json"
+
+def test_decimal_is_serialized():
+    """测试 PostgreSQL NUMERIC 聚合结果可以序列化"""
+    assert FastJSONResponse([{"avg": Decimal("1.5")}]).body == b'[{"avg":1.5}]'
@@ -0,0 +1,36 @@
+from benchmarks.synthetic import MarketSpec, generate_market, raw_financial_records
+from benchmarks.harness import compare_reports, summarize
+from app.utils.data_converter import convert_financial_data
+
+def test_generate_market_shape():
+    """测试合成数据规模与可复现性"""
+    spec = MarketSpec(n_stocks=4, n_periods=3, n_days=5)
+    market = generate_market(spec)
+
+    assert len(market["stock_basic"]) == 4
+    assert len(market["stock_financials"]) == 12
+    assert len(market["stock_valuations"]) == 20
+    assert market["stock_financials"]["id"].is_unique
+    assert market["stock_valuations"]["id"].is_unique
+
+    again = generate_market(spec)
+    assert again["stock_valuations"]["pe_ttm"].equals(market["stock_valuations"]["pe_ttm"])
+
+def test_raw_financial_records_round_trip():
+    """测试原始格式记录可被转换回数值"""
+    market = generate_market(MarketSpec(n_stocks=1, n_periods=2, n_days=1))
+    financials = market["stock_financials"]
+    record = raw_financial_records(financials)[0]
+
+    converted = convert_financial_data(record)
+    assert converted["资产负债率"] == financials["debt_ratio"].iloc[0]
+    assert converted["营业周期"] is None
+    assert abs(converted["净利润"] - financials["net_profit"].iloc[0]) <= financials["net_profit"].iloc[0] * 0.01
+
+def test_compare_reports_detects_regression():
+    """测试回退检测"""
+    baseline = {"results": {"a": summarize([0.010]), "b": summarize([0.010])}}
+    current = {"results": {"a": summarize([0.011]), "b": summarize([0.020])}}
+
+    regressions = compare_reports(baseline, current, threshold=0.2)
+    assert [item["name"] for item in regressions] == ["b"]
@@ -0,0 +1,166 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app.cache.bus import LocalBus, decode_event, encode_event
+from app.cache.store import TaggedCache, api_cache
+from app.datasources.base import set_data_source
+from app.datasources.fake import FakeDataSource
+from app.db.session import SessionLocal
+from app.models.stock import Stock
+from app.models.valuation import StockValuation
+from app.scripts.collect_valuation import process_stock_valuation
+from app.services.stock_service import StockService
+
+def test_tagged_cache_evicts_only_affected_entries():
+    """测试按 (表名, 股票代码) 精确淘汰，依赖整张表的条目随任意股票变化淘汰"""
+    cache = TaggedCache(max_entries=3, ttl=60)
+    cache.set("a", 1, [("stock_valuations", "600000")])
+    cache.set("b", 2, [("stock_valuations", "000001")])
+    cache.set("list", 3, [("stock_valuations", None)])
+
+    assert cache.invalidate("stock_valuations", ["600000"]) == 2
+    assert cache.get("a") is None and cache.get("list") is None
+    assert cache.get("b") == 2
+    assert cache.invalidate("stock_financials", ["000001"]) == 0
+
+    for key in "cdef":
+        cache.set(key, key, [("stock_basic", key)])
+    assert len(cache) == 3 and cache.get("b") is None
+
+def test_concurrent_loads_are_coalesced():
+    """测试相同键的并发加载只执行一次，加载期间被淘汰的结果不写入缓存"""
+    cache = TaggedCache(ttl=60)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return len(calls)
+
+    tags = [("stock_basic", "600000")]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        leader = pool.submit(cache.get_or_load, "k", tags, loader)
+        started.wait(5)
+        followers = [pool.submit(cache.get_or_load, "k", tags, loader) for _ in range(7)]
+        while cache.stats["coalesced"] < 7:
+            release.wait(0.001)
+        cache.invalidate("stock_basic", ["600000"])
+        release.set()
+        assert [f.result() for f in [leader, *followers]] == [1] * 8
+    assert len(calls) == 1 and cache.coalescing_ratio == 7 / 8
+    assert cache.get("k") is None
+    assert cache.get_or_load("k", tags, loader) == 2 and cache.get("k") == 2
+
+def test_event_loop_caller_does_not_wait_on_thread_load():
+    """测试线程池中的加载进行时，事件循环中的相同键请求不阻塞事件循环，自行加载"""
+    cache = TaggedCache(ttl=60)
+    started, release = threading.Event(), threading.Event()
+
+    def slow_loader():
+        started.set()
+        release.wait(5)
+        return "thread"
+
+    async def main():
+        ticks = []
+
+        async def ticker():
+            while not release.is_set():
+                ticks.append(1)
+                await asyncio.sleep(0.001)
+
+        task = asyncio.create_task(ticker())
+        await asyncio.sleep(0.01)
+        value = cache.get_or_load("k", [("stock_valuations", "600000")], lambda: "loop")
+        await asyncio.sleep(0.01)
+        release.set()
+        await task
+        return value, len(ticks)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        sync_caller = pool.submit(cache.get_or_load, "k", [("stock_valuations", "600000")], slow_loader)
+        started.wait(5)
+        value, ticks = asyncio.run(main())
+        assert value == "loop" and ticks > 5
+        assert sync_caller.result() == "thread"
+    assert cache.stats["loads"] == 2 and cache.stats["coalesced"] == 0
+
+def test_invalidation_during_uncoalesced_load_is_not_cached():
+    """测试不合并加载时，加载期间受影响的失效通知使结果不写入缓存，无关的通知不影响"""
+    cache = TaggedCache(ttl=60, coalesce=False)
+    tags = [("stock_basic", "600000")]
+
+    def loader(code):
+        def load():
+            cache.invalidate("stock_basic", [code])
+            return code
+        return load
+
+    assert cache.get_or_load("k", tags, loader("600000")) == "600000"
+    assert cache.get("k") is None
+    assert cache.get_or_load("k", tags, loader("000001")) == "000001"
+    assert cache.get("k") == "000001"
+
+def test_invalidation_during_event_loop_load_is_not_cached():
+    """测试事件循环中自行加载期间收到失效通知时，其结果和线程中的加载结果都不写入缓存"""
+    cache = TaggedCache(ttl=60)
+    tags = [("stock_valuations", "600000")]
+    started, release = threading.Event(), threading.Event()
+
+    def slow_loader():
+        started.set()
+        release.wait(5)
+        return "thread"
+
+    def loop_loader():
+        cache.invalidate("stock_valuations", ["600000"])
+        return "loop"
+
+    async def main():
+        return cache.get_or_load("k", tags, loop_loader)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        sync_caller = pool.submit(cache.get_or_load, "k", tags, slow_loader)
+        started.wait(5)
+        assert asyncio.run(main()) == "loop"
+        assert cache.get("k") is None
+        release.set()
+        assert sync_caller.result() == "thread"
+    assert cache.get("k") is None
+    assert cache.get_or_load("k", tags, lambda: "fresh") == "fresh" and cache.get("k") == "fresh"
+
+def test_local_bus_dispatch_and_chunking():
+    """测试消息编码与大批量代码拆分"""
+    bus = LocalBus()
+    received = []
+    bus.subscribe(lambda dataset, codes: received.append((dataset, codes)))
+    bus.publish("stock_basic", [f"{i:06d}" for i in range(1200)])
+    bus.publish("stock_basic")
+
+    assert [len(codes) for _, codes in received[:-1]] == [500, 500, 200]
+    assert received[-1] == ("stock_basic", None)
+    assert decode_event(encode_event("x", ["1"]).encode()) == ("x", ["1"])
+
+def test_collector_commit_evicts_api_cache():
+    """测试估值采集提交后，API 缓存中该股票的结果被淘汰"""
+    db = SessionLocal()
+    stock = Stock(code="980501", name="通知测试", market="A股")
+    db.add(stock)
+    db.commit()
+    service = StockService(db)
+    sql = "SELECT COUNT(*) AS n FROM stock_valuations WHERE stock_code = :code"
+    tags = [("stock_valuations", stock.code)]
+    set_data_source(FakeDataSource(n_days=60))
+    try:
+        assert service.execute_sql_cached(sql, {"code": stock.code}, tags)[0]["n"] == 0
+        assert asyncio.run(process_stock_valuation(db, stock))
+        assert service.execute_sql_cached(sql, {"code": stock.code}, tags)[0]["n"] > 0
+    finally:
+        set_data_source(None)
+        db.query(StockValuation).filter(StockValuation.stock_code == "980501").delete()
+        db.query(Stock).filter(Stock.code == "980501").delete()
+        db.commit()
+        db.close()
+        api_cache.clear()
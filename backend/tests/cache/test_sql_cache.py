@@ -0,0 +1,78 @@
+import random
+from fastapi.testclient import TestClient
+from app.cache.bus import publish_invalidation
+from app.cache.results import ResultCache, cacheable_tables, normalize_sql, sql_cache
+from app.db.session import SessionLocal
+from app.main import app
+from app.models.stock import Stock
+
+CODE = "980701"
+URL = "/api/stock/execute-sql"
+
+def test_normalize_and_cacheability():
+    """测试规范化保留字符串常量，只有仅读取版本化表的确定性查询可缓存"""
+    sql = "SELECT  name FROM Stock_Basic -- 注释\n WHERE name = 'A  b';"
+    assert normalize_sql(sql) == "select name from stock_basic where name = 'A  b'"
+    assert normalize_sql(sql) == normalize_sql("select name /* x */ from stock_basic where name = 'A  b'")
+
+    assert cacheable_tables(normalize_sql(
+        "WITH v AS (SELECT * FROM stock_valuations) SELECT * FROM stock_basic b JOIN v ON v.stock_code = b.code"
+    )) == {"stock_basic", "stock_valuations"}
+    assert cacheable_tables(normalize_sql(
+        "SELECT * FROM public.stock_basic b, stock_valuations v WHERE v.stock_code = b.code"
+    )) == {"stock_basic", "stock_valuations"}
+    for sql in [
+        "SELECT * FROM users",
+        "SELECT now(), code FROM stock_basic",
+        "SELECT * FROM information_schema.tables",
+        "SELECT * FROM stock_basic b, data_quarantine q WHERE q.record_key = b.code",
+        "SELECT * FROM stock_basic b JOIN stock_valuations v ON v.stock_code = b.code, job_locks",
+        "SELECT * FROM (SELECT code FROM stock_basic) s, collection_checkpoints c",
+        "DELETE FROM stock_basic",
+        "SELECT 1",
+    ]:
+        assert cacheable_tables(normalize_sql(sql)) is None, sql
+
+def test_result_cache_evicts_by_size():
+    """测试按压缩后的总字节数淘汰最久未使用的条目，超大条目不缓存"""
+    payload = random.Random(0).randbytes
+    cache = ResultCache(max_bytes=100, max_entry_bytes=50, ttl=60)
+    a, b, c = payload(30), payload(30), payload(30)
+    assert cache.put("a", a) and cache.put("b", b)
+    assert cache.get("a") == a
+    assert cache.put("c", c)
+    assert cache.get("b") is None and cache.get("a") == a and cache.get("c") == c
+    assert not cache.put("d", payload(100))
+    assert cache.stats["evictions"] == 1 and cache.stats["oversized"] == 1
+
+def test_execute_sql_cached_until_table_changes():
+    """测试重复查询命中缓存，依赖的表更新后重新执行，缓存控制头和 nocache 提示可跳过缓存"""
+    db = SessionLocal()
+    client = TestClient(app)
+    body = {"sql": "SELECT name FROM stock_basic WHERE code = :code", "params": {"code": CODE}}
+    sql_cache.clear()
+    try:
+        db.add(Stock(code=CODE, name="旧名称", market="A股"))
+        db.commit()
+        first = client.post(URL, json=body)
+        assert first.headers["X-Cache"] == "MISS" and first.json() == [{"name": "旧名称"}]
+        second = client.post(URL, json={**body, "sql": "select name  from stock_basic where code = :code;"})
+        assert second.headers["X-Cache"] == "HIT" and second.content == first.content
+
+        db.query(Stock).filter(Stock.code == CODE).update({"name": "新名称"})
+        db.commit()
+        publish_invalidation("stock_dividends", [CODE])
+        assert client.post(URL, json=body).json() == [{"name": "旧名称"}]
+        assert client.post(URL, json=body, headers={"Cache-Control": "no-cache"}).json() == [{"name": "新名称"}]
+        publish_invalidation(Stock.__tablename__, [CODE])
+        response = client.post(URL, json=body)
+        assert response.headers["X-Cache"] == "MISS" and response.json() == [{"name": "新名称"}]
+
+        hinted = client.post(URL, json={**body, "sql": body["sql"] + " /* nocache */"})
+        assert "X-Cache" not in hinted.headers
+        assert client.post(URL, json={**body, "params": {"code": "000000"}}).json() == []
+    finally:
+        db.query(Stock).filter(Stock.code == CODE).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+        sql_cache.clear()
@@ -0,0 +1,35 @@
+import os
+import tempfile
+
+# 未配置数据库时使用临时 SQLite 文件，保证测试无需外部服务即可运行
+_tmp_dir = tempfile.mkdtemp(prefix="stock-analyse-test-")
+os.environ.setdefault("POSTGRES_USER", "test")
+os.environ.setdefault("POSTGRES_PASSWORD", "test")
+os.environ.setdefault("POSTGRES_DB", "test")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp_dir, 'test.db')}")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("INVALIDATION_BACKEND", "local")
+os.environ.setdefault("SERIES_CACHE_DIR", os.path.join(_tmp_dir, "series"))
+os.environ.setdefault("FEATURE_EXPORT_DIR", os.path.join(_tmp_dir, "features"))
+
+import pytest
+from app.db.base import Base
+from app.db.session import engine
+from app.cache.bus import get_bus
+from app.cache.results import table_versions
+from app.cache.store import api_cache
+
+@pytest.fixture(scope="session", autouse=True)
+def create_tables():
+    """创建数据库表"""
+    Base.metadata.create_all(bind=engine)
+    yield
+
+@pytest.fixture(scope="session", autouse=True)
+def subscribe_invalidation():
+    """与 API 启动时一样订阅数据变更通知（TestClient 未进入上下文时不会运行 lifespan）"""
+    get_bus().subscribe(api_cache.invalidate)
+    get_bus().subscribe(table_versions.bump)
+    yield
+    get_bus().handlers.remove(api_cache.invalidate)
+    get_bus().handlers.remove(table_versions.bump)
@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+from benchmarks.cases import HEAVY_MODULES
+from benchmarks.harness import import_times
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入 app.main 的累计耗时上限（毫秒）；单核环境下实测约 1000ms，其中 fastapi/pydantic 约占 700ms
+API_IMPORT_BUDGET_MS = 3000
+
+def test_api_import_within_budget():
+    """测试 API 进程导入应用时不加载 pandas/numpy/akshare，且导入耗时在预算内"""
+    times = import_times("app.main", cwd=BACKEND_DIR)
+    assert [name for name in HEAVY_MODULES if name in times] == []
+    assert times["app.main"] < API_IMPORT_BUDGET_MS
+
+def test_import_does_not_create_engine():
+    """测试导入应用和模型时不创建数据库引擎，由 lifespan 或第一次使用时创建"""
+    code = "import app.main, app.db.base, app.db.session as session; assert session._engine is None"
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=BACKEND_DIR)
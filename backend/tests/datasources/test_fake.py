@@ -0,0 +1,55 @@
+import pytest
+from app.datasources.base import get_data_source, set_data_source
+from app.datasources.fake import FakeDataSource, RecordingDataSource, InjectedError
+from app.utils.data_converter import convert_financial_data
+
+def test_synthetic_data_is_deterministic():
+    """测试同一代码的合成数据可复现"""
+    first = FakeDataSource(n_days=30).stock_a_indicator_lg("600000")
+    second = FakeDataSource(n_days=30).stock_a_indicator_lg("600000")
+    other = FakeDataSource(n_days=30).stock_a_indicator_lg("000001")
+
+    assert len(first) == 30
+    assert first.equals(second)
+    assert not first["pe_ttm"].equals(other["pe_ttm"])
+
+def test_financial_abstract_matches_akshare_format():
+    """测试财务摘要为带单位的字符串，可被 convert_financial_data 解析"""
+    df = FakeDataSource(n_periods=4).stock_financial_abstract_ths("600000")
+    record = convert_financial_data(df.to_dict("records")[0])
+
+    assert len(df) == 4
+    assert isinstance(record["净利润"], int)
+    assert 0 <= record["资产负债率"] <= 100
+    assert record["营业周期"] is None
+
+def test_error_injection():
+    """测试错误注入与调用计数"""
+    source = FakeDataSource(error_rate=1.0)
+    with pytest.raises(InjectedError):
+        source.stock_a_indicator_lg("600000")
+    assert source.calls["stock_a_indicator_lg"] == 1
+    assert source.errors["stock_a_indicator_lg"] == 1
+
+    source = FakeDataSource(fail_symbols=["000001"])
+    source.stock_individual_info_em("600000")
+    with pytest.raises(InjectedError):
+        source.stock_individual_info_em("000001")
+
+def test_recorded_fixtures_are_replayed(tmp_path):
+    """测试录制数据优先于合成数据"""
+    recorded = RecordingDataSource(FakeDataSource(n_days=10, seed=1), str(tmp_path))
+    expected = recorded.stock_a_indicator_lg("600000")
+
+    replay = FakeDataSource(fixtures_dir=str(tmp_path), n_days=50, seed=2)
+    assert replay.stock_a_indicator_lg("600000").equals(expected)
+    assert len(replay.stock_a_indicator_lg("000001")) == 50
+
+def test_set_data_source():
+    """测试替换当前数据源"""
+    source = FakeDataSource()
+    set_data_source(source)
+    try:
+        assert get_data_source() is source
+    finally:
+        set_data_source(None)
@@ -0,0 +1,66 @@
+import os
+from datetime import date
+import numpy as np
+import pytest
+from app.db.session import SessionLocal
+from app.export.features import build_panel, export_panel, load_panel
+from app.models.stock import Stock
+from app.models.valuation import StockValuation
+
+CODES = ["980501", "980502"]
+
+def _valuation(code: str, day: date, pe_ttm):
+    return StockValuation(id=f"{code}_{day}", stock_code=code, date=day, pe_ttm=pe_ttm, pb=1.5)
+
+def test_build_panel_aligns_dates_by_month():
+    """测试同一月份首个交易日不同的股票对齐到同一行，每月取日期最晚的一行"""
+    rows = [
+        (CODES[1], date(2023, 1, 4), 20.0),
+        (CODES[0], date(2023, 1, 31), 11.0),
+        (CODES[0], date(2023, 1, 3), 10.0),
+        (CODES[1], date(2023, 2, 1), 21.0),
+    ]
+    panel = build_panel(rows, 1)
+    assert panel["codes"].tolist() == CODES
+    assert panel["dates"].tolist() == [date(2023, 1, 1), date(2023, 2, 1)]
+    assert panel["values"][0, 0].tolist() == [11.0, 20.0]
+    assert np.isnan(panel["values"][0, 1, 0]) and panel["values"][0, 1, 1] == 21.0
+
+def test_export_panel_maps_matrix_and_replaces_version(tmp_path):
+    """测试导出的矩阵按日期和股票对齐、以内存映射打开，重新导出不影响已打开的实例"""
+    db = SessionLocal()
+    directory = str(tmp_path)
+    try:
+        db.add_all([Stock(code=code, name=f"导出{code}", market="A股") for code in CODES])
+        db.add_all([
+            _valuation(CODES[0], date(2023, 1, 3), 10.0),
+            _valuation(CODES[0], date(2023, 2, 1), None),
+            _valuation(CODES[1], date(2023, 2, 1), 20.0),
+        ])
+        db.commit()
+
+        first = export_panel(db, "valuations", directory)
+        assert export_panel(db, "valuations", directory) is None
+        panel = load_panel("valuations", directory)
+        assert isinstance(panel.values, np.memmap)
+        assert panel.values.shape == (len(panel.metrics), 2, 2)
+        assert panel.dates.tolist() == [date(2023, 1, 1), date(2023, 2, 1)]
+        pe = panel.matrix("pe_ttm")
+        assert np.isnan(pe[:, panel.code_index(CODES[0])][1]) and pe[0, panel.code_index(CODES[0])] == 10.0
+        assert panel.frame("pb").loc["2023-02-01", CODES[1]] == 1.5
+        with pytest.raises(KeyError):
+            panel.code_index("000000")
+
+        db.add(_valuation(CODES[1], date(2023, 3, 1), 21.0))
+        db.commit()
+        second = export_panel(db, "valuations", directory)
+        third = export_panel(db, "valuations", directory, force=True)
+        assert load_panel("valuations", directory).dates.size == 3
+        # 只保留当前和上一个版本，已打开的实例仍可读取
+        assert not os.path.exists(first) and os.path.exists(second) and os.path.exists(third)
+        assert panel.matrix("pe_ttm")[1, panel.code_index(CODES[1])] == 20.0
+    finally:
+        db.query(StockValuation).filter(StockValuation.stock_code.in_(CODES)).delete(synchronize_session=False)
+        db.query(Stock).filter(Stock.code.in_(CODES)).delete(synchronize_session=False)
+        db.commit()
+        db.close()
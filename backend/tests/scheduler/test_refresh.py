@@ -0,0 +1,71 @@
+import time
+from datetime import datetime, timedelta
+from app.db.session import SessionLocal
+from app.datasources.base import set_data_source
+from app.datasources.fake import FakeDataSource
+from app.datasources.limits import RateLimiter
+from app.models.dividend import StockDividend, StockDividendYearly
+from app.models.financial import FinancialIndicator
+from app.models.job import DatasetRefresh
+from app.models.stock import Stock
+from app.models.valuation import StockValuation
+from app.scheduler.refresh import estimate_refresh, plan_refresh, run_refresh
+
+CODES = ["980401", "980402", "980403"]
+DATA_MODELS = [StockDividendYearly, StockDividend, StockValuation, FinancialIndicator]
+
+def test_rate_limiter_spaces_calls():
+    """测试令牌用完后按速率等待"""
+    limiter = RateLimiter(rate=50, burst=1)
+    start = time.perf_counter()
+    for _ in range(6):
+        limiter.acquire()
+    assert time.perf_counter() - start >= 0.09
+
+def test_refresh_industry_in_parallel_and_plan_stale_stocks():
+    """测试按行业并行刷新多个数据集，刷新后的股票不再被视为过期（按采集时间而不是数据行的更新时间判断）"""
+    db = SessionLocal()
+    source = FakeDataSource(n_periods=8, n_days=60)
+    set_data_source(source)
+    try:
+        db.add_all([
+            Stock(code=CODES[0], name="刷新一", industry="刷新测试", market="A股"),
+            Stock(code=CODES[1], name="刷新二", industry="刷新测试", market="A股"),
+            Stock(code=CODES[2], name="刷新三", industry="其他", market="A股"),
+        ])
+        db.commit()
+        datasets = ["financials", "valuations", "dividends"]
+
+        plan = plan_refresh(db, datasets, industry="刷新测试", stale_days=1)
+        assert plan == {name: CODES[:2] for name in datasets}
+        estimate = estimate_refresh(plan, sync_list=False, rate=2, concurrency=4, call_seconds=1.0)
+        assert estimate["calls"] == 6 and estimate["seconds"] == 3.0
+
+        result = run_refresh(datasets, concurrency=4, industry="刷新测试", rate=0)
+        assert result["datasets"] == {name: {"done": 2, "failed": 0} for name in datasets}
+        assert sum(result["calls"].values()) == 6
+        assert sum(source.calls.values()) == 6
+        for model in (FinancialIndicator, StockValuation):
+            assert {code for (code,) in db.query(model.stock_code).filter(model.stock_code.in_(CODES)).distinct()} == set(CODES[:2])
+
+        assert plan_refresh(db, datasets, codes=CODES, stale_days=1) == {name: CODES[2:] for name in datasets}
+
+        # 没有新数据时数据行的更新时间不变，不影响判断
+        old = datetime.utcnow() - timedelta(days=30)
+        for model in DATA_MODELS:
+            db.query(model).filter(model.stock_code.in_(CODES)).update({"updated_at": old}, synchronize_session=False)
+        db.commit()
+        assert plan_refresh(db, datasets, codes=CODES, stale_days=1) == {name: CODES[2:] for name in datasets}
+        db.query(DatasetRefresh).filter(
+            DatasetRefresh.dataset == "valuations", DatasetRefresh.stock_code == CODES[0]
+        ).update({"refreshed_at": old}, synchronize_session=False)
+        db.commit()
+        assert plan_refresh(db, ["valuations"], codes=CODES, stale_days=1) == {"valuations": [CODES[0], CODES[2]]}
+    finally:
+        set_data_source(None)
+        for model in DATA_MODELS:
+            db.query(model).filter(model.stock_code.in_(CODES)).delete(synchronize_session=False)
+        db.query(DatasetRefresh).filter(DatasetRefresh.stock_code.in_(CODES)).delete(synchronize_session=False)
+        db.query(Stock).filter(Stock.code.in_(CODES)).delete(synchronize_session=False)
+        db.commit()
+        db.close()
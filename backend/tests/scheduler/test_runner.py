@@ -0,0 +1,132 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from app.db.session import SessionLocal
+from app.datasources.base import set_data_source
+from app.datasources.fake import FakeDataSource, synthetic_codes
+from app.models.dividend import StockDividend, StockDividendYearly
+from app.models.financial import FinancialIndicator, FinancialValidity
+from app.models.job import CollectionCheckpoint, CollectionRun, DatasetRefresh, JobLock
+from app.models.stock import Stock
+from app.models.valuation import StockValuation
+from app.scheduler.jobs import JOBS, Job, register_job, resolve_order
+from app.scheduler.lock import acquire_lock
+from app.scheduler.runner import run_job, run_pipeline, COMPLETED, LOCKED
+
+@pytest.fixture
+def db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture
+def crashing_job():
+    """第一次处理到 c 时模拟进程崩溃的任务"""
+    processed = []
+    state = {"crashed": False}
+
+    async def list_items(db):
+        return ["a", "b", "c", "d"]
+
+    async def process_item(db, item):
+        if item == "c" and not state["crashed"]:
+            state["crashed"] = True
+            raise KeyboardInterrupt
+        processed.append(item)
+        return True
+
+    job = register_job(Job("test_crash", "测试任务", list_items, process_item))
+    yield job, processed
+    JOBS.pop(job.name)
+
+def test_resolve_order():
+    """测试任务按依赖顺序排列"""
+    assert resolve_order(["derived"]) == ["stock_list", "financials", "valuations", "derived"]
+    assert resolve_order(["valuations"], with_dependencies=False) == ["valuations"]
+    with pytest.raises(ValueError):
+        resolve_order(["unknown"])
+
+def test_interrupted_run_resumes_from_checkpoint(db, crashing_job):
+    """测试中断后从检查点继续，已完成条目不重复处理"""
+    job, processed = crashing_job
+    with pytest.raises(KeyboardInterrupt):
+        asyncio.run(run_job(job.name))
+    assert processed == ["a", "b"]
+
+    assert asyncio.run(run_job(job.name)) == COMPLETED
+    assert processed == ["a", "b", "c", "d"]
+
+    runs = db.query(CollectionRun).filter(CollectionRun.job_name == job.name).all()
+    assert len(runs) == 1
+    assert runs[0].status == COMPLETED
+
+def test_failed_items_are_retried_within_run(db):
+    """测试失败的条目在同一次运行中重试，达到最大尝试次数后不再处理"""
+    attempts = {}
+
+    async def list_items(db):
+        return ["flaky", "broken", "ok"]
+
+    async def process_item(db, item):
+        attempts[item] = attempts.get(item, 0) + 1
+        if item == "broken":
+            raise ValueError("数据源错误")
+        return item == "ok" or attempts[item] > 1
+
+    job = register_job(Job("test_retry", "测试任务", list_items, process_item))
+    try:
+        assert asyncio.run(run_job(job.name, max_attempts=3)) == COMPLETED
+        assert attempts == {"flaky": 2, "broken": 3, "ok": 1}
+        run = db.query(CollectionRun).filter(CollectionRun.job_name == job.name).one()
+        statuses = dict(db.query(CollectionCheckpoint.item, CollectionCheckpoint.status).filter(
+            CollectionCheckpoint.run_id == run.id
+        ).all())
+        assert statuses == {"flaky": "done", "broken": "failed", "ok": "done"}
+    finally:
+        JOBS.pop(job.name)
+
+def test_locked_job_is_skipped(db, crashing_job):
+    """测试任务锁阻止重叠运行，过期的锁可以被接管"""
+    job, processed = crashing_job
+    assert acquire_lock(db, job.name, "other", ttl=600)
+    assert asyncio.run(run_job(job.name)) == LOCKED
+    assert processed == []
+
+    db.query(JobLock).filter(JobLock.name == job.name).update(
+        {"expires_at": datetime.utcnow() - timedelta(seconds=1)}
+    )
+    db.commit()
+    assert acquire_lock(db, job.name, "another", ttl=600)
+    db.query(JobLock).filter(JobLock.name == job.name).delete()
+    db.commit()
+
+def test_pipeline_with_fake_source(db):
+    """测试使用离线数据源运行完整采集流程"""
+    set_data_source(FakeDataSource(n_stocks=3, n_periods=4, n_days=60, seed=7))
+    try:
+        results = asyncio.run(run_pipeline())
+    finally:
+        set_data_source(None)
+
+    names = ["stock_list", "financials", "valuations", "dividends", "derived", "series", "export"]
+    assert results == {name: COMPLETED for name in names}
+    series_run = db.query(CollectionRun).filter(CollectionRun.job_name == "series").order_by(CollectionRun.id.desc()).first()
+    assert {status for (status,) in db.query(CollectionCheckpoint.status).filter(
+        CollectionCheckpoint.run_id == series_run.id
+    )} == {"done"}
+    assert db.query(Stock).count() >= 3
+    assert db.query(StockValuation).filter(StockValuation.stock_code == "600000").count() > 0
+    assert db.query(StockDividendYearly).filter(StockDividendYearly.stock_code == "600000").count() > 0
+    assert db.query(DatasetRefresh).filter(
+        DatasetRefresh.dataset == "valuations", DatasetRefresh.stock_code == "600000"
+    ).count() == 1
+
+    # 清理写入的数据，避免影响其他测试
+    codes = synthetic_codes(3)
+    for model in (FinancialValidity, FinancialIndicator, StockValuation, StockDividend, StockDividendYearly):
+        db.query(model).filter(model.stock_code.in_(codes)).delete(synchronize_session=False)
+    db.query(DatasetRefresh).filter(DatasetRefresh.stock_code.in_(codes)).delete(synchronize_session=False)
+    db.query(Stock).filter(Stock.code.in_(codes)).delete(synchronize_session=False)
+    db.commit()
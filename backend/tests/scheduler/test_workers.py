@@ -0,0 +1,95 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from app.db.session import SessionLocal
+from app.models.job import CollectionCheckpoint
+from app.models.stock import Stock
+from app.models.valuation import StockValuation
+from app.scheduler.jobs import JOBS, Job, register_job
+from app.scheduler.runner import create_run, COMPLETED, DONE
+from app.scheduler.workers import shard_of, assign_shards, claim_batch, worker_loop, run_sharded
+
+@pytest.fixture
+def db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture
+def counting_job():
+    processed = []
+
+    async def list_items(db):
+        return [f"{i:06d}" for i in range(20)]
+
+    async def process_item(db, item):
+        processed.append(item)
+        await asyncio.sleep(0)
+        return True
+
+    job = register_job(Job("test_shard", "测试任务", list_items, process_item))
+    yield job, processed
+    JOBS.pop(job.name)
+
+def test_shard_of_is_stable():
+    """测试分片结果稳定且分布在范围内"""
+    assert shard_of("600000", 4) == shard_of("600000", 4)
+    assert {shard_of(f"{i:06d}", 4) for i in range(100)} == {0, 1, 2, 3}
+
+def test_concurrent_workers_process_each_item_once(db, counting_job):
+    """测试多个工作进程共享队列时每个条目只处理一次"""
+    job, processed = counting_job
+    run = asyncio.run(create_run(db, job))
+    assign_shards(db, run, 3)
+
+    async def run_workers():
+        return await asyncio.gather(*[
+            worker_loop(job.name, run.id, shard=shard, owner=f"worker-{shard}", batch_size=3)
+            for shard in range(3)
+        ])
+
+    stats = asyncio.run(run_workers())
+    assert sorted(processed) == [f"{i:06d}" for i in range(20)]
+    assert sum(item["done"] for item in stats) == 20
+    assert db.query(CollectionCheckpoint).filter(
+        CollectionCheckpoint.run_id == run.id, CollectionCheckpoint.status != DONE
+    ).count() == 0
+
+def test_expired_lease_is_reclaimed(db, counting_job):
+    """测试崩溃进程的租约过期后条目被重新领取"""
+    job, processed = counting_job
+    run = asyncio.run(create_run(db, job))
+
+    claimed = claim_batch(db, run.id, "dead", None, batch_size=5, lease_ttl=600, max_attempts=3)
+    assert len(claimed) == 5
+    assert claim_batch(db, run.id, "other", None, batch_size=20, lease_ttl=600, max_attempts=3) != []
+
+    db.query(CollectionCheckpoint).filter(CollectionCheckpoint.lease_owner == "dead").update(
+        {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}
+    )
+    db.query(CollectionCheckpoint).filter(CollectionCheckpoint.lease_owner == "other").update(
+        {"lease_owner": None, "lease_expires_at": None}
+    )
+    db.commit()
+
+    asyncio.run(worker_loop(job.name, run.id, owner="alive"))
+    assert sorted(processed) == [f"{i:06d}" for i in range(20)]
+
+def test_run_sharded_with_processes(db, monkeypatch):
+    """测试多进程分片采集（子进程使用离线数据源）"""
+    monkeypatch.setenv("DATA_SOURCE", "fake")
+    codes = ["600100", "600101", "000100", "000101"]
+    for code in codes:
+        db.add(Stock(code=code, name=f"测试{code}", market="A股"))
+    db.commit()
+    try:
+        assert asyncio.run(run_sharded("valuations", 2, resume=False)) == COMPLETED
+        assert db.query(StockValuation.stock_code).filter(
+            StockValuation.stock_code.in_(codes)
+        ).distinct().count() == 4
+    finally:
+        db.query(StockValuation).filter(StockValuation.stock_code.in_(codes)).delete(synchronize_session=False)
+        db.query(Stock).filter(Stock.code.in_(codes)).delete(synchronize_session=False)
+        db.commit()
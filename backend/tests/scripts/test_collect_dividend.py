@@ -0,0 +1,52 @@
+import asyncio
+from fastapi.testclient import TestClient
+from app.main import app
+from app.db.session import SessionLocal
+from app.datasources.base import set_data_source
+from app.datasources.fake import FakeDataSource
+from app.models.dividend import StockDividend, StockDividendYearly
+from app.models.stock import Stock
+from app.scripts.collect_dividend import collect_dividends
+
+CODES = ["980101", "980102", "980103"]
+
+def test_collect_dividends_and_screen_streak():
+    """测试分批并发采集分红，并通过预计算的统计筛选连续分红股票"""
+    db = SessionLocal()
+    source = FakeDataSource(fail_symbols=["980103"])
+    set_data_source(source)
+    try:
+        db.add_all([Stock(code=code, name=f"分红{code}", market="A股") for code in CODES])
+        db.commit()
+
+        stats = asyncio.run(collect_dividends(CODES, batch_size=2, concurrency=2))
+        assert stats["done"] == 2 and stats["failed"] == 1
+        # 重复采集更新已有记录，不产生重复数据
+        rows = db.query(StockDividend).filter(StockDividend.stock_code.in_(CODES)).count()
+        asyncio.run(collect_dividends(CODES[:2]))
+        assert db.query(StockDividend).filter(StockDividend.stock_code.in_(CODES)).count() == rows
+
+        yearly = db.query(StockDividendYearly).filter(StockDividendYearly.stock_code == CODES[0]).all()
+        best = max(item.streak for item in yearly)
+        latest = max(item.year for item in yearly)
+        current = next(item.streak for item in yearly if item.year == latest)
+
+        calls = source.calls["stock_history_dividend_detail"]
+        client = TestClient(app)
+        response = client.get("/api/screener/dividend-streak", params={"min_years": current, "year": latest})
+        assert response.status_code == 200
+        assert CODES[0] in [item["code"] for item in response.json()]
+        response = client.get("/api/screener/dividend-streak", params={"min_years": best + 100})
+        assert CODES[0] not in [item["code"] for item in response.json()]
+        assert source.calls["stock_history_dividend_detail"] == calls
+
+        response = client.get(f"/api/stock/{CODES[0]}/dividends/yearly")
+        assert [item["year"] for item in response.json()] == sorted((item.year for item in yearly), reverse=True)
+        assert len(client.get(f"/api/stock/{CODES[0]}/dividends").json()) > 0
+    finally:
+        set_data_source(None)
+        for model in (StockDividendYearly, StockDividend):
+            db.query(model).filter(model.stock_code.in_(CODES)).delete(synchronize_session=False)
+        db.query(Stock).filter(Stock.code.in_(CODES)).delete(synchronize_session=False)
+        db.commit()
+        db.close()
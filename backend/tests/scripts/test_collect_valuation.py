@@ -0,0 +1,49 @@
+import asyncio
+from datetime import date
+import numpy as np
+import pandas as pd
+from app.db.session import SessionLocal
+from app.datasources.base import set_data_source
+from app.datasources.fake import FakeDataSource
+from app.models.stock import Stock
+from app.models.valuation import StockValuation
+from app.scripts.collect_valuation import monthly_valuations, process_stock_valuation
+from app.utils.bulk import frame_to_rows
+
+def test_monthly_valuations_takes_first_valid_value_per_month():
+    """测试按月取第一个交易日，当天缺失的指标取当月第一个非空值"""
+    df = pd.DataFrame({
+        "trade_date": ["2024-02-01", "2024-01-03", "2024-01-02", "2024-02-02"],
+        "pe_ttm": [20.0, 11.0, np.nan, 21.0],
+        "pb": [2.0, 1.1, 1.0, 2.1],
+        "ps_ttm": [3.0, 1.3, 1.2, 3.1],
+        "dv_ttm": [np.nan, 0.5, 0.4, np.nan],
+    })
+    monthly = monthly_valuations(df)
+
+    assert list(monthly.columns) == ["date", "pe_ttm", "pb", "ps_ttm", "dividend_yield_ttm"]
+    assert list(monthly["date"]) == [date(2024, 1, 2), date(2024, 2, 1)]
+    assert list(monthly["pe_ttm"]) == [11.0, 20.0]
+    assert list(monthly["pb"]) == [1.0, 2.0]
+    assert frame_to_rows(monthly)[1]["dividend_yield_ttm"] is None
+
+def test_process_stock_valuation_skips_existing_rows():
+    """测试估值批量写入，重复采集不产生重复记录"""
+    db = SessionLocal()
+    set_data_source(FakeDataSource(n_days=90))
+    try:
+        stock = Stock(code="980001", name="测试估值", market="A股")
+        db.add(stock)
+        db.commit()
+
+        assert asyncio.run(process_stock_valuation(db, stock))
+        count = db.query(StockValuation).filter(StockValuation.stock_code == stock.code).count()
+        assert count >= 3
+        assert asyncio.run(process_stock_valuation(db, stock))
+        assert db.query(StockValuation).filter(StockValuation.stock_code == stock.code).count() == count
+    finally:
+        set_data_source(None)
+        db.query(StockValuation).filter(StockValuation.stock_code == "980001").delete()
+        db.query(Stock).filter(Stock.code == "980001").delete()
+        db.commit()
+        db.close()
@@ -0,0 +1,61 @@
+from datetime import date
+from fastapi.testclient import TestClient
+from app.main import app
+from app.db.session import SessionLocal
+from app.cache.bus import publish_invalidation
+from app.cache.series import decode_series, get_series_store
+from app.models.stock import Stock
+from app.models.valuation import StockValuation
+from app.services.chart_service import ChartService
+
+CODES = ["980301", "980302"]
+
+def _valuation(code: str, day: date, pe_ttm):
+    return StockValuation(id=f"{code}_{day}", stock_code=code, date=day, pe_ttm=pe_ttm, pb=1.0)
+
+def test_chart_series_aligns_stocks_and_follows_data_version():
+    """测试多只股票对齐到共同日期轴，序列存储在数据变化后重建"""
+    db = SessionLocal()
+    try:
+        db.add_all([Stock(code=code, name=f"图表{code}", market="A股") for code in CODES])
+        db.add_all([
+            _valuation(CODES[0], date(2023, 1, 31), 10.5),
+            _valuation(CODES[0], date(2023, 2, 28), None),
+            _valuation(CODES[0], date(2023, 3, 31), 12.0),
+            _valuation(CODES[1], date(2023, 2, 28), 20.0),
+            _valuation(CODES[1], date(2023, 4, 28), 21.5),
+        ])
+        db.commit()
+        ChartService(db).rebuild(CODES[0], ["valuations"])
+        assert get_series_store().get("valuations", CODES[0]) is not None
+
+        client = TestClient(app)
+        response = client.get("/api/chart/series", params={"codes": ",".join(CODES), "metrics": "pe_ttm"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["dates"] == ["2023-01-31", "2023-02-28", "2023-03-31", "2023-04-28"]
+        assert data["series"][CODES[0]]["pe_ttm"] == [10.5, None, 12.0, None]
+        assert data["series"][CODES[1]]["pe_ttm"] == [None, 20.0, None, 21.5]
+        # 未预先构建的股票在首次读取时写入存储
+        assert decode_series(get_series_store().get("valuations", CODES[1]))["dates"].size == 2
+
+        response = client.get("/api/chart/series", params={
+            "codes": ",".join(CODES), "metrics": "pe_ttm,pb", "start_date": "2023-02-01", "end_date": "2023-03-31",
+        })
+        assert response.json()["dates"] == ["2023-02-28", "2023-03-31"]
+        assert response.json()["series"][CODES[1]]["pb"] == [1.0, None]
+
+        # 数据变化后版本不一致，读取时重建
+        db.add(_valuation(CODES[1], date(2023, 5, 31), 22.0))
+        db.commit()
+        publish_invalidation(StockValuation.__tablename__, [CODES[1]])
+        data = client.get("/api/chart/series", params={"codes": CODES[1]}).json()
+        assert data["series"][CODES[1]]["pe_ttm"] == [20.0, 21.5, 22.0]
+
+        assert client.get("/api/chart/series", params={"codes": CODES[0], "metrics": "unknown"}).status_code == 400
+        assert client.get("/api/chart/series", params={"codes": ",".join(str(i) for i in range(100))}).status_code == 400
+    finally:
+        db.query(StockValuation).filter(StockValuation.stock_code.in_(CODES)).delete(synchronize_session=False)
+        db.query(Stock).filter(Stock.code.in_(CODES)).delete(synchronize_session=False)
+        db.commit()
+        db.close()
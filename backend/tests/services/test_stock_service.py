@@ -21,7 +21,7 @@ def stock_service(db):
 def test_execute_sql_basic(stock_service):
     """测试基本的 SQL 查询"""
     # 准备测试数据
-    sql = "SELECT * FROM stocks LIMIT 5"
+    sql = "SELECT * FROM stock_basic LIMIT 5"
     result = stock_service.execute_sql(sql)
     
     # 验证结果
@@ -35,7 +35,7 @@ def test_execute_sql_with_join(stock_service):
     """测试带 JOIN 的 SQL 查询"""
     sql = """
     SELECT s.code, s.name, v.pe_ttm, v.pb, v.date
-    FROM stocks s
+    FROM stock_basic s
     LEFT JOIN stock_valuations v ON s.code = v.stock_code
     WHERE s.code = '000001'
     ORDER BY v.date DESC
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+from app.utils.dividend import normalize_dividends, yearly_dividend_stats
+
+def test_normalize_dividends():
+    """测试分红明细列名与日期转换"""
+    df = pd.DataFrame({
+        "公告日期": ["2023-06-01", "2023-06-01", None],
+        "送股": [0, 0, 0],
+        "转增": [3, 3, 0],
+        "派息": [5.5, 5.5, 1.0],
+        "进度": ["实施", "实施", "预案"],
+        "除权除息日": ["2023-07-10", "2023-07-10", None],
+        "股权登记日": ["2023-07-09", "2023-07-09", None],
+        "红股上市日": [None, None, None],
+    })
+    dividends = normalize_dividends("600000", df)
+
+    assert len(dividends) == 1
+    assert dividends.loc[0, "id"] == "600000_2023-06-01"
+    assert dividends.loc[0, "ex_dividend_date"].isoformat() == "2023-07-10"
+    assert dividends.loc[0, "cash_dividend"] == 5.5
+
+def test_yearly_stats_count_sum_and_streak():
+    """测试年度分红次数、每股合计与连续年数（预案和不派现的方案不计入）"""
+    dividends = pd.DataFrame({
+        "stock_code": ["A", "A", "A", "A", "A", "A", "B"],
+        "ex_dividend_date": ["2019-07-01", "2020-07-01", "2020-12-01", "2021-07-01",
+                             "2023-07-01", "2024-07-01", "2024-07-01"],
+        "cash_dividend": [10.0, 5.0, 2.0, 0.0, 3.0, 4.0, 1.0],
+        "progress": ["实施", "实施", "实施", "实施", "实施", "预案", "实施"],
+    })
+    yearly = yearly_dividend_stats(dividends).set_index("id")
+
+    assert list(yearly.index) == ["A_2019", "A_2020", "A_2023", "B_2024"]
+    assert yearly.loc["A_2020", "payout_count"] == 2
+    assert np.isclose(yearly.loc["A_2020", "cash_per_share"], 0.7)
+    assert list(yearly["streak"]) == [1, 2, 1, 1]
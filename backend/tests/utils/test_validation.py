@@ -0,0 +1,92 @@
+import asyncio
+import numpy as np
+import pandas as pd
+from app.db.session import SessionLocal
+from app.datasources.base import set_data_source
+from app.datasources.fake import FakeDataSource
+from app.models.financial import FinancialIndicator, FinancialValidity
+from app.models.quarantine import DataQuarantine
+from app.models.stock import Stock
+from app.scripts.collect_data import process_stock_financial_indicators
+from app.utils.data_converter import convert_financial_data, convert_financial_series
+from app.utils.validation import split_financials
+
+CODE = "980201"
+
+def _abstract(n_periods: int = 12) -> pd.DataFrame:
+    periods = pd.date_range(end="2023-12-31", periods=n_periods, freq="Q")
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "报告期": periods.strftime("%Y-%m-%d"),
+        "净利润": [f"{value:.2f}亿" for value in rng.uniform(1, 2, n_periods)],
+        "基本每股收益": [f"{value:.3f}" for value in rng.uniform(0.9, 1.1, n_periods)],
+        "资产负债率": [f"{value:.2f}%" for value in rng.uniform(40, 60, n_periods)],
+        "营业周期": False,
+    })
+
+def test_convert_financial_series_matches_record_conversion():
+    """测试按列转换与逐条转换的单位处理一致，无法解析的单元格被标记"""
+    series = pd.Series(["1.5万亿", "-2.3亿", "15.2万", "12.5%", "0.85", False, "--", "abc"])
+    values, invalid = convert_financial_series(series)
+    expected = [convert_financial_data({"v": value})["v"] for value in series[:5]]
+    assert values[:5].tolist() == expected
+    assert values[5:].isna().all()
+    assert invalid.tolist() == [False] * 7 + [True]
+
+def test_split_financials_quarantines_bad_rows():
+    """测试类型、范围、离群和报告期检查只隔离有问题的记录"""
+    df = _abstract()
+    df.loc[2, "基本每股收益"] = "1.0O"
+    df.loc[4, "资产负债率"] = "120.5%"
+    df.loc[6, "基本每股收益"] = "98.5"
+    df.loc[8, "报告期"] = "2022-05-17"
+    df = df.drop(index=10)
+
+    valid, rejected, gaps = split_financials(CODE, df)
+    reasons = dict(zip(rejected["record_key"], rejected["reasons"]))
+    assert reasons == {
+        df.loc[2, "报告期"]: "type:eps",
+        df.loc[4, "报告期"]: "range:debt_ratio",
+        df.loc[6, "报告期"]: "outlier:eps",
+        "2022-05-17": "period",
+    }
+    assert len(valid) == len(df) - 4
+    assert valid["net_profit"].dtype == "Int64" and valid["operating_cycle"].isna().all()
+    assert gaps["missing"].sum() >= 1
+
+def test_process_financials_writes_valid_rows_and_quarantine():
+    """测试个别异常单元格不再导致整只股票写入失败，修正后隔离记录被移除"""
+    class MalformedSource(FakeDataSource):
+        malformed = True
+
+        def stock_financial_abstract_ths(self, symbol, indicator="按报告期"):
+            df = super().stock_financial_abstract_ths(symbol, indicator).copy()
+            if self.malformed:
+                df.loc[0, "每股净资产"] = "N/A元"
+            return df
+
+    db = SessionLocal()
+    source = MalformedSource(n_periods=8)
+    set_data_source(source)
+    try:
+        stock = Stock(code=CODE, name="校验测试", market="A股")
+        db.add(stock)
+        db.commit()
+
+        assert asyncio.run(process_stock_financial_indicators(db, stock))
+        assert db.query(FinancialIndicator).filter(FinancialIndicator.stock_code == CODE).count() == 7
+        quarantined = db.query(DataQuarantine).filter(DataQuarantine.stock_code == CODE).all()
+        assert [item.reasons for item in quarantined] == ["type:bps"]
+        assert "N/A元" in quarantined[0].raw
+
+        source.malformed = False
+        assert asyncio.run(process_stock_financial_indicators(db, stock))
+        assert db.query(FinancialIndicator).filter(FinancialIndicator.stock_code == CODE).count() == 8
+        assert db.query(DataQuarantine).filter(DataQuarantine.stock_code == CODE).count() == 0
+    finally:
+        set_data_source(None)
+        for model in (DataQuarantine, FinancialValidity, FinancialIndicator):
+            db.query(model).filter(model.stock_code == CODE).delete(synchronize_session=False)
+        db.query(Stock).filter(Stock.code == CODE).delete(synchronize_session=False)
+        db.commit()
+        db.close()